@@ -0,0 +1,13 @@
+#include <boost/circular_buffer.hpp>
+
+int main()
+{
+    boost::circular_buffer<int> buffer(1'000'000);
+    // Wrap around, so the buffer is split into two parts.
+    for (int i = 0; i < 1'500'000; ++i)
+    {
+        buffer.push_back(i);
+    }
+
+    return 0;  // break here
+}
@@ -0,0 +1,13 @@
+import testlib
+
+
+class BenchCircularBuffer(testlib.BenchmarkCase):
+    def runTest(self):
+        self.runToRegex("// break here")
+        self.benchContainer(
+            "buffer",
+            size=1_000_000,
+            enumerate_budget=120,
+            random_budget=2,
+            summary_budget=1,
+        )
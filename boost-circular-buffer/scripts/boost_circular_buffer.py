@@ -4,25 +4,29 @@ from lldb import (
     SBDebugger,
 )
 from nerix_common import (
+    ChildGroups,
+    define_category,
+    Hexdump,
+    is_byte_type,
     make_add_summary,
-    make_add_summary_string,
     make_add_synthetic,
-    numeric_index,
+    memory_cache,
 )
+from typing import Optional
 
 
 def __lldb_init_module(dbg: SBDebugger, internal_dict):
-    dbg.HandleCommand("type category define -e boost-circular-buffer -l c++")
+    define_category(dbg, "boost-circular-buffer")
 
     add_summary = make_add_summary(
         dbg, "boost-circular-buffer", __name__, include_own=False
     )
-    add_summary_string = make_add_summary_string(dbg, "boost-circular-buffer")
+    add_size_summary = make_add_summary(
+        dbg, "boost-circular-buffer", "nerix_common", include_own=False
+    )
     add_synthetic = make_add_synthetic(dbg, "boost-circular-buffer", __name__)
 
-    add_summary_string(
-        "^boost::circular_buffer(_space_optimized)?<.*>$", "size=${svar%#}", regex=True
-    )
+    add_size_summary("Size", regex="^boost::circular_buffer(_space_optimized)?<.*>$")
     add_synthetic(
         "CircularBuffer", regex="^boost::circular_buffer(_space_optimized)?<.*>$"
     )
@@ -40,6 +44,8 @@ class CircularBufferSyntheticProvider:
         self._m_first = 0
         self._m_end = 0
         self._m_buff = 0
+        self._groups = ChildGroups(valobj)
+        self._hexdump = Hexdump(valobj)
 
     def update(self):
         self._size = self._valobj.GetChildMemberWithName("m_size").GetValueAsUnsigned()
@@ -48,17 +54,41 @@ class CircularBufferSyntheticProvider:
         ).GetValueAsAddress()
         self._m_end = self._valobj.GetChildMemberWithName("m_end").GetValueAsAddress()
         self._m_buff = self._valobj.GetChildMemberWithName("m_buff").GetValueAsAddress()
+        self._groups.update(self._size)
+        if is_byte_type(self._ty):
+            self._hexdump.update(self._size, self._read)
         return False
 
     def num_children(self):
-        return self._size
+        if self._hexdump.enabled:
+            return self._hexdump.num_children()
+        return self._groups.num_children()
 
     def get_child_index(self, name: str):
-        return numeric_index(name)
+        if self._hexdump.enabled:
+            return self._hexdump.child_index(name)
+        return self._groups.child_index(name)
 
     def get_child_at_index(self, idx: int):
-        if idx < 0 or idx >= self._size:
+        if self._hexdump.enabled:
+            return self._hexdump.child_at_index(idx)
+        return self._groups.child_at_index(idx, self._element)
+
+    def _read(self, offset: int, n: int) -> Optional[bytes]:
+        # The bytes after m_first may wrap around to m_buff (elements are bytes).
+        mem = memory_cache(self._valobj.process)
+        first = self._m_end - self._m_first
+        if offset >= first:
+            return mem.read(self._m_buff + offset - first, n)
+        if offset + n <= first:
+            return mem.read(self._m_first + offset, n)
+        head = mem.read(self._m_first + offset, first - offset)
+        tail = mem.read(self._m_buff, n - (first - offset))
+        if head is None or tail is None:
             return None
+        return head + tail
+
+    def _element(self, idx: int) -> SBValue:
         # p = m_first
         # n = idx
         # p + (n < (m_end - p) ? n : n - (m_end - m_buff))
@@ -0,0 +1,21 @@
+#include <boost/json/array.hpp>
+
+#include <string>
+
+int main()
+{
+    boost::json::array ints;
+    for (int i = 0; i < 100'000; ++i)
+    {
+        ints.emplace_back(i);
+    }
+
+    boost::json::array strings;
+    for (int i = 0; i < 10'000; ++i)
+    {
+        strings.emplace_back("a-long-string-so-it's-allocated-" +
+                             std::to_string(i));
+    }
+
+    return 0;  // break here
+}
@@ -0,0 +1,20 @@
+import testlib
+
+
+class BenchArray(testlib.BenchmarkCase):
+    def runTest(self):
+        self.runToRegex("// break here")
+        self.benchContainer(
+            "ints",
+            size=100_000,
+            enumerate_budget=30,
+            random_budget=2,
+            summary_budget=1,
+        )
+        self.benchContainer(
+            "strings",
+            size=10_000,
+            enumerate_budget=10,
+            random_budget=2,
+            summary_budget=1,
+        )
@@ -6,28 +6,37 @@ from lldb import (
     SBDebugger,
 )
 from nerix_common import (
+    define_category,
+    enum_table,
+    enum_values,
     ArraySyntheticProvider,
+    char_array_summary,
     make_add_summary,
     make_add_summary_string,
     make_add_synthetic,
     numeric_index,
     ExpandingSyntheticProvider,
     DispatchedSynthetic,
+    target_local,
+    target_types,
 )
-from typing import Union, Optional
+from typing import Callable, Union, Optional
 
 
 def __lldb_init_module(dbg: SBDebugger, internal_dict):
-    dbg.HandleCommand("type category define -e boost-json -l c++")
+    define_category(dbg, "boost-json")
 
     add_summary = make_add_summary(dbg, "boost-json", __name__, include_own=False)
+    add_size_summary = make_add_summary(
+        dbg, "boost-json", "nerix_common", include_own=False
+    )
     add_summary_string = make_add_summary_string(dbg, "boost-json")
     add_synthetic = make_add_synthetic(dbg, "boost-json", __name__)
 
     add_summary("String", other_names=["boost::json::string"])
 
     add_synthetic("BArray", other_names=["boost::json::array"])
-    add_summary_string("boost::json::array", "[ size=${svar%#} ]")
+    add_size_summary("ArraySize", other_names=["boost::json::array"])
 
     add_synthetic("Value", other_names=["boost::json::value"])
     add_summary("Value", other_names=["boost::json::value"])
@@ -43,20 +52,8 @@ def StringSummaryProvider(
     valobj: SBValue, internal_dict: dict, options: lldb.SBTypeSummaryOptions
 ):
     impl: SBValue = valobj.GetChildMemberWithName("impl_")
-    ity: SBType = impl.GetType()
+    k_short, k_key = _string_kinds(valobj.GetTarget(), impl.GetType())
     impl = impl.GetChildAtIndex(0)
-    tgt = impl.GetTarget()
-    if hasattr(StringSummaryProvider, "k_short"):
-        k_short = StringSummaryProvider.k_short
-    else:
-        k_short = (
-            ity.GetStaticFieldWithName("short_string_")
-            .GetConstantValue(tgt)
-            .GetValueAsUnsigned()
-        )
-        if k_short == 0:
-            k_short = Kind.String | 0x80  # FIXME: bug in native PDB reader
-        StringSummaryProvider.k_short = k_short
 
     sbo: SBValue = impl.GetChildMemberWithName("s_")
     kind = sbo.GetChildMemberWithName("k").GetValueAsUnsigned()
@@ -68,40 +65,49 @@ def StringSummaryProvider(
             .GetSummary()
         )
 
-    if hasattr(StringSummaryProvider, "k_key"):
-        k_key = StringSummaryProvider.k_key
-    else:
-        k_key = (
-            ity.GetStaticFieldWithName("key_string_")
-            .GetConstantValue(tgt)
-            .GetValueAsUnsigned()
-        )
-        if k_key == 0:
-            k_key = Kind.String | 0x40  # FIXME: bug in native PDB reader
-        StringSummaryProvider.k_key = k_key
-
-    char = tgt.GetBasicType(lldb.eBasicTypeChar)
     if kind == k_key:
         k: SBValue = impl.GetChildMemberWithName("k_")
         n = k.GetChildMemberWithName("n").GetValueAsUnsigned()
         ptr = k.GetChildMemberWithName("s")
         if n == 0:
             return '""'
-        return ptr.Dereference().Cast(char.GetArrayType(n))
+        return char_array_summary(valobj, ptr.GetValueAsUnsigned(), n)
 
     t = impl.GetChildMemberWithName("p_").GetChildMemberWithName("t")
     n = t.GetChildMemberWithName("size").GetValueAsUnsigned()
     if n == 0:
         return '""'
-    return valobj.CreateValueFromAddress(
-        "", t.GetValueAsAddress() + 8, char.GetArrayType(n)
-    ).GetSummary()
+    return char_array_summary(valobj, t.GetValueAsAddress() + 8, n)
+
+
+def _string_kinds(tgt: SBTarget, impl_ty: SBType) -> tuple[int, int]:
+    """Get the kinds of short strings and key strings in `string_impl`."""
+
+    def build() -> tuple[int, int]:
+        string_kind = _kinds(tgt)["string"]
+        k_short = (
+            impl_ty.GetStaticFieldWithName("short_string_")
+            .GetConstantValue(tgt)
+            .GetValueAsUnsigned()
+        )
+        if k_short == 0:
+            k_short = string_kind | 0x80  # FIXME: bug in native PDB reader
+        k_key = (
+            impl_ty.GetStaticFieldWithName("key_string_")
+            .GetConstantValue(tgt)
+            .GetValueAsUnsigned()
+        )
+        if k_key == 0:
+            k_key = string_kind | 0x40  # FIXME: bug in native PDB reader
+        return k_short, k_key
+
+    return target_local(tgt, "string-kinds", build)
 
 
 class BArraySyntheticProvider(ArraySyntheticProvider):
     def __init__(self, valobj: SBValue, internal_dict):
         super().__init__(valobj, internal_dict)
-        self._value_ty = valobj.GetTarget().FindFirstType("boost::json::value")
+        self._value_ty = target_types(valobj.GetTarget()).find("boost::json::value")
 
     def _pointer_and_size(self, valobj: SBValue) -> tuple[Union[SBValue, int], int]:
         tbl: SBValue = valobj.GetChildMemberWithName("t_")
@@ -112,42 +118,21 @@ class BArraySyntheticProvider(ArraySyntheticProvider):
         return self._value_ty
 
 
-class Kind:
-    Null = 0
-    Bool = 1
-    Int64 = 2
-    Uint64 = 3
-    Double = 4
-    String = 5
-    Array = 6
-    Object = 7
-    _init = False
-
-    @staticmethod
-    def ensure_init(tgt: SBTarget):
-        if Kind._init:
-            return
-        Kind._init = True
-        k = tgt.FindFirstType("boost::json::kind").GetEnumMembers()
-        for it in k:
-            v = it.GetValueAsUnsigned()
-            name = it.GetName()
-            if name == "null":
-                Kind.Null = v
-            elif name == "bool_":
-                Kind.Bool = v
-            elif name == "int64":
-                Kind.Int64 = v
-            elif name == "uint64":
-                Kind.Uint64 = v
-            elif name == "double_":
-                Kind.Double = v
-            elif name == "string":
-                Kind.String = v
-            elif name == "array":
-                Kind.Array = v
-            elif name == "object":
-                Kind.Object = v
+_KIND_DEFAULTS = {
+    "null": 0,
+    "bool_": 1,
+    "int64": 2,
+    "uint64": 3,
+    "double_": 4,
+    "string": 5,
+    "array": 6,
+    "object": 7,
+}
+"""Values of `boost::json::kind` if it's not in the debug info."""
+
+
+def _kinds(tgt: SBTarget) -> dict[str, int]:
+    return enum_values(tgt, "boost::json::kind", _KIND_DEFAULTS)
 
 
 def ValueSummaryProvider(
@@ -167,7 +152,9 @@ class ValueSyntheticProvider(ExpandingSyntheticProvider):
 
     def __init__(self, valobj: SBValue, internal_dict):
         super().__init__(valobj, internal_dict)
-        Kind.ensure_init(valobj.GetTarget())
+        self._getters = enum_table(
+            valobj.GetTarget(), "boost::json::kind", _KIND_DEFAULTS, _VALUE_GETTERS
+        )
 
     def get_child_at_index(self, idx: int):
         if idx == self.VALUE_IDX:
@@ -178,34 +165,35 @@ class ValueSyntheticProvider(ExpandingSyntheticProvider):
         u: SBValue = valobj.GetChildAtIndex(0)
         sca: SBValue = u.GetChildMemberWithName("sca_")
         kind = sca.GetChildMemberWithName("k").GetValueAsUnsigned()
-        kind_tag = kind & 0xF
-        if kind_tag == Kind.Null:
+        getter = self._getters.get(kind & 0xF)
+        if getter is None:
             return None
-        elif kind_tag == Kind.Bool:
-            return sca.GetChildAtIndex(2).GetChildMemberWithName("b")
-        elif kind_tag == Kind.Int64:
-            return sca.GetChildAtIndex(2).GetChildMemberWithName("i")
-        elif kind_tag == Kind.Uint64:
-            return sca.GetChildAtIndex(2).GetChildMemberWithName("u")
-        elif kind_tag == Kind.Double:
-            return sca.GetChildAtIndex(2).GetChildMemberWithName("d")
-        elif kind_tag == Kind.String:
-            return u.GetChildMemberWithName("str_")
-        elif kind_tag == Kind.Array:
-            return u.GetChildMemberWithName("arr_").GetSyntheticValue()
-        elif kind_tag == Kind.Object:
-            return u.GetChildMemberWithName("obj_").GetSyntheticValue()
+        return getter(u, sca)
 
     def get_value(self):
         return self._val
 
 
+_VALUE_GETTERS: dict[str, Callable[[SBValue, SBValue], Optional[SBValue]]] = {
+    "null": lambda u, sca: None,
+    "bool_": lambda u, sca: sca.GetChildAtIndex(2).GetChildMemberWithName("b"),
+    "int64": lambda u, sca: sca.GetChildAtIndex(2).GetChildMemberWithName("i"),
+    "uint64": lambda u, sca: sca.GetChildAtIndex(2).GetChildMemberWithName("u"),
+    "double_": lambda u, sca: sca.GetChildAtIndex(2).GetChildMemberWithName("d"),
+    "string": lambda u, sca: u.GetChildMemberWithName("str_"),
+    "array": lambda u, sca: u.GetChildMemberWithName("arr_").GetSyntheticValue(),
+    "object": lambda u, sca: u.GetChildMemberWithName("obj_").GetSyntheticValue(),
+}
+"""Get the value of a `boost::json::value` from its union and scalar by kind."""
+
+
 class ObjectSyntheticProvider:
     def __init__(self, valobj: SBValue, internal_dict):
         self._valobj = valobj
         self._target = valobj.GetTarget()
-        self._kv_ty = self._target.FindFirstType("boost::json::key_value_pair")
-        self._char_ty = self._target.GetBasicType(lldb.eBasicTypeChar)
+        types = target_types(self._target)
+        self._kv_ty = types.find("boost::json::key_value_pair")
+        self._char_ty = types.find(lldb.eBasicTypeChar)
         self._kv_size = self._kv_ty.GetByteSize()
         self._size = 0
         self._base_addr = 0
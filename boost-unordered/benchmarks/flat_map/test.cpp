@@ -0,0 +1,12 @@
+#include <boost/unordered/unordered_flat_map.hpp>
+
+int main()
+{
+    boost::unordered_flat_map<int, int> map;
+    for (int i = 0; i < 100'000; ++i)
+    {
+        map.emplace(i, i);
+    }
+
+    return 0;  // break here
+}
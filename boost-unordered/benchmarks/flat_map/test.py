@@ -0,0 +1,13 @@
+import testlib
+
+
+class BenchFlatMap(testlib.BenchmarkCase):
+    def runTest(self):
+        self.runToRegex("// break here")
+        self.benchContainer(
+            "map",
+            size=100_000,
+            enumerate_budget=30,
+            random_budget=5,
+            summary_budget=1,
+        )
@@ -0,0 +1,13 @@
+import testlib
+
+
+class BenchUnorderedMap(testlib.BenchmarkCase):
+    def runTest(self):
+        self.runToRegex("// break here")
+        self.benchContainer(
+            "map",
+            size=100_000,
+            enumerate_budget=60,
+            random_budget=10,
+            summary_budget=1,
+        )
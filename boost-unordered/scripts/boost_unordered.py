@@ -11,7 +11,9 @@ from lldb import (
     SBDebugger,
 )
 from nerix_common import (
+    define_category,
     ExpandingSyntheticProvider,
+    memory_cache,
     make_add_summary,
     make_add_summary_string,
     make_add_synthetic,
@@ -21,7 +23,7 @@ from typing import Optional, Generator
 
 
 def __lldb_init_module(dbg: SBDebugger, internal_dict):
-    dbg.HandleCommand("type category define -e boost-unordered -l c++")
+    define_category(dbg, "boost-unordered")
 
     add_summary = make_add_summary(dbg, "boost-unordered", __name__, include_own=False)
     add_summary_string = make_add_summary_string(dbg, "boost-unordered")
@@ -122,13 +124,14 @@ class UnorderedMapSyntheticProvider(CachedGeneratorProvider):
             proc = buckets.GetProcess()
             base_bucket = buckets.GetValueAsAddress()
             ptr_size = buckets.GetTarget().GetAddressByteSize()
-            err = SBError()
             i = 0
             for bucket_idx in range(inner_size):
-                node_addr = proc.ReadPointerFromMemory(
-                    base_bucket + bucket_idx * ptr_size + next_off, err
+                # Buckets are read page-wise through the cache, one page
+                # covers 512 buckets on 64 bit.
+                node_addr = memory_cache(proc).read_pointer(
+                    base_bucket + bucket_idx * ptr_size + next_off
                 )
-                if err.Fail():
+                if node_addr is None:
                     return
                 if node_addr == 0:
                     continue
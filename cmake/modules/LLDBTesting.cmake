@@ -21,15 +21,27 @@ endif()
 message(STATUS "LLDB Python path: ${LLDB_PYTHON_PATH}")
 
 function(create_python_test)
-    set(_options AUTO_QT USE_ALL_SCRIPT)
+    set(_options AUTO_QT USE_ALL_SCRIPT LAZY_LOAD BENCHMARK)
     set(_one_val DIRECTORY TEST PREFIX)
     set(_multi_val LIBRARIES SCRIPTS)
     cmake_parse_arguments(PARSE_ARGV 0 arg "${_options}" "${_one_val}" "${_multi_val}")
 
-    set(_exe_name "${arg_PREFIX}-${arg_TEST}-bin")
-    set(_test_name "${arg_PREFIX}.${arg_TEST}")
+    if (arg_BENCHMARK)
+        set(_exe_name "${arg_PREFIX}-bench-${arg_TEST}-bin")
+        set(_test_name "${arg_PREFIX}.bench.${arg_TEST}")
+        set(_results "${CMAKE_BINARY_DIR}/benchmark-results/${_test_name}.json")
+        set(_extra_args --results "${_results}")
+    else()
+        set(_exe_name "${arg_PREFIX}-${arg_TEST}-bin")
+        set(_test_name "${arg_PREFIX}.${arg_TEST}")
+        set(_extra_args)
+    endif()
 
-    if (arg_USE_ALL_SCRIPT)
+    if (arg_USE_ALL_SCRIPT AND arg_LAZY_LOAD)
+        set(arg_SCRIPTS "-s ${_scripts_root}/all.py")
+        set(_exe_name "${_exe_name}-with-lazy-all-py")
+        set(_test_name "${_test_name}-with-lazy-all-py")
+    elseif (arg_USE_ALL_SCRIPT)
         set(arg_SCRIPTS "-s ${_scripts_root}/all.py")
         set(_exe_name "${_exe_name}-with-all-py")
         set(_test_name "${_test_name}-with-all-py")
@@ -57,7 +69,18 @@ function(create_python_test)
             -b $<TARGET_FILE:${_exe_name}>
             --lldb-py "${LLDB_PYTHON_PATH}"
             ${arg_SCRIPTS}
+            ${_extra_args}
     )
+    if (arg_LAZY_LOAD)
+        set_tests_properties("${_test_name}" PROPERTIES ENVIRONMENT "NERIX_LAZY_LOAD=1")
+    endif()
+    if (arg_BENCHMARK)
+        # Timings are only meaningful if nothing else runs at the same time.
+        set_tests_properties("${_test_name}" PROPERTIES
+            LABELS benchmark
+            RUN_SERIAL TRUE
+        )
+    endif()
 
     if(NOT TARGET "${arg_PREFIX}-all")
         add_custom_target("${arg_PREFIX}-all")
@@ -76,6 +99,18 @@ function(create_python_tests)
     list(GET arg_TESTS 0 _first_test)
     if(_first_test)
         create_python_test(TEST "${_first_test}" USE_ALL_SCRIPT ${arg_UNPARSED_ARGUMENTS})
+        create_python_test(
+            TEST "${_first_test}" USE_ALL_SCRIPT LAZY_LOAD ${arg_UNPARSED_ARGUMENTS}
+        )
     endif()
 endfunction()
 
+
+function(create_python_benchmarks)
+    set(_multi_val BENCHMARKS)
+    cmake_parse_arguments(PARSE_ARGV 0 arg "" "" "${_multi_val}")
+
+    foreach(bench ${arg_BENCHMARKS})
+        create_python_test(TEST "${bench}" BENCHMARK ${arg_UNPARSED_ARGUMENTS})
+    endforeach()
+endfunction()
@@ -0,0 +1,19 @@
+#include <QCborArray>
+#include <QString>
+
+int main()
+{
+    QCborArray ints;
+    for (qint64 i = 0; i < 100'000; ++i)
+    {
+        ints.append(i);
+    }
+
+    QCborArray strings;
+    for (int i = 0; i < 10'000; ++i)
+    {
+        strings.append(QString::number(i));
+    }
+
+    return 0;  // break here
+}
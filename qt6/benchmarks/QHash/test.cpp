@@ -0,0 +1,19 @@
+#include <QHash>
+#include <QString>
+
+int main()
+{
+    QHash<int, int> ints;
+    for (int i = 0; i < 100'000; ++i)
+    {
+        ints.insert(i, i);
+    }
+
+    QHash<QString, int> strings;
+    for (int i = 0; i < 10'000; ++i)
+    {
+        strings.insert(QString::number(i), i);
+    }
+
+    return 0;  // break here
+}
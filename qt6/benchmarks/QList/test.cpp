@@ -0,0 +1,21 @@
+#include <QList>
+#include <QString>
+
+int main()
+{
+    QList<int> ints;
+    ints.reserve(1'000'000);
+    for (int i = 0; i < 1'000'000; ++i)
+    {
+        ints.append(i);
+    }
+
+    QList<QString> strings;
+    strings.reserve(10'000);
+    for (int i = 0; i < 10'000; ++i)
+    {
+        strings.append(QString::number(i));
+    }
+
+    return 0;  // break here
+}
@@ -0,0 +1,20 @@
+import testlib
+
+
+class BenchQList(testlib.BenchmarkCase):
+    def runTest(self):
+        self.runToRegex("// break here")
+        self.benchContainer(
+            "ints",
+            size=1_000_000,
+            enumerate_budget=120,
+            random_budget=2,
+            summary_budget=1,
+        )
+        self.benchContainer(
+            "strings",
+            size=10_000,
+            enumerate_budget=10,
+            random_budget=2,
+            summary_budget=1,
+        )
@@ -0,0 +1,12 @@
+#include <QMap>
+
+int main()
+{
+    QMap<int, int> ints;
+    for (int i = 0; i < 100'000; ++i)
+    {
+        ints.insert(i, i);
+    }
+
+    return 0;  // break here
+}
@@ -8,7 +8,7 @@ from lldb import (
     SBDebugger,
     SBProcess,
 )
-from typing import Callable, Optional, Union
+from typing import Any, Callable, Iterator, NamedTuple, Optional, Union
 from qt_constants import (
     QDateTimeConstants,
     QHashConstants,
@@ -17,8 +17,39 @@ from qt_constants import (
     QCBORVALUE_NULL,
     QCBORVALUE_UNDEFINED,
 )
+from nerix_common import (
+    ChildGroups,
+    CommandParser,
+    char_array_summary,
+    char_array_value,
+    define_category,
+    enum_table,
+    enum_values,
+    evaluate_value,
+    Hexdump,
+    is_byte_type,
+    make_add_summary,
+    make_add_summary_string,
+    make_add_synthetic,
+    MemoryCache,
+    memory_cache,
+    process_local,
+    stop_local,
+    string_cache,
+    string_summary_limit,
+    StructLayout,
+    struct_layout,
+    target_types,
+    TypeRegistry,
+    TypeSpec,
+    utf8_prefix_length,
+)
+import bisect
 import datetime
+import fnmatch
 import re
+import shlex
+import struct
 
 MIN_LLDB_VERSION = (20, 0, 0)
 
@@ -27,37 +58,15 @@ UNICODE_STR_ARRAY_IS_LIMITED = False
 
 
 def __lldb_init_module(dbg: SBDebugger, internal_dict):
-    dbg.HandleCommand("type category define -e qt -l c++")
+    define_category(dbg, "qt")
 
     global UNICODE_STR_ARRAY_IS_LIMITED
     UNICODE_STR_ARRAY_IS_LIMITED = _get_lldb_version(dbg) >= (23, 0, 0)
 
-    def add_summary(
-        type_name: str,
-        *,
-        regex: Optional[str] = None,
-        other_names: list[str] = [],
-    ):
-        type_names = other_names + [type_name]
-        cmd = f"type summary add -w qt -F {__name__}.{type_name}SummaryProvider "
-        if regex:
-            cmd += f' -x "{regex}"'
-        else:
-            cmd += " ".join(map(lambda it: f'"{it}"', type_names))
-        dbg.HandleCommand(cmd)
-
-    def add_synthetic(
-        name: str,
-        *,
-        regex: Optional[str] = None,
-        other_names: list[str] = [],
-    ):
-        cmd = f"type synthetic add -w qt -l {__name__}.{name}SyntheticProvider"
-        if regex:
-            cmd += f' -x "{regex}"'
-        else:
-            cmd += f' "{name}" ' + " ".join(map(lambda it: f'"{it}"', other_names))
-        dbg.HandleCommand(cmd)
+    add_summary = make_add_summary(dbg, "qt", __name__)
+    add_size_summary = make_add_summary(dbg, "qt", "nerix_common", include_own=False)
+    add_summary_string = make_add_summary_string(dbg, "qt")
+    add_synthetic = make_add_synthetic(dbg, "qt", __name__)
 
     add_summary("QString")
     add_summary("QStringView")
@@ -80,47 +89,42 @@ def __lldb_init_module(dbg: SBDebugger, internal_dict):
     add_summary("QObject")
     add_summary("QUrl")
     add_summary("QGenericMatrix", regex="^QGenericMatrix<.*>$")
-    _add_summary_string(dbg, ["QPoint", "QPointF"], "(x: ${var.xp}, y: ${var.yp})")
-    _add_summary_string(dbg, ["QPolygon", "QPolygonF"], "size=${svar%#}")
-    _add_summary_string(dbg, "^QList<.*>$", "size=${svar%#}", regex=True)
-    _add_summary_string(dbg, "^Q(Multi)?Hash<.*>$", "size=${svar%#}", regex=True)
-    _add_summary_string(dbg, "^Q(Map|Set)<.*>$", "size=${svar%#}", regex=True)
-    _add_summary_string(dbg, "^QMultiMap<.*>$", "size=${svar%#}", regex=True)
-    _add_summary_string(dbg, "^QVarLengthArray<.*>$", "size=${svar%#}", regex=True)
-    _add_summary_string(dbg, "^QSpan<.*>$", "size=${svar%#}", regex=True)
-    _add_summary_string(
-        dbg, "^QHashPrivate::MultiNodeChain<.*>$", "size=${svar%#}", regex=True
+    add_summary_string(["QPoint", "QPointF"], "(x: ${var.xp}, y: ${var.yp})")
+    add_size_summary("Size", other_names=["QPolygon", "QPolygonF"])
+    add_size_summary("Size", regex="^QList<.*>$")
+    add_summary_string("^Q(Multi)?Hash<.*>$", "size=${svar%#}", regex=True)
+    add_summary_string("^Q(Map|Set)<.*>$", "size=${svar%#}", regex=True)
+    add_summary_string("^QMultiMap<.*>$", "size=${svar%#}", regex=True)
+    add_size_summary("Size", regex="^QVarLengthArray<.*>$")
+    add_size_summary("Size", regex="^QSpan<.*>$")
+    add_summary_string(
+        "^QHashPrivate::MultiNodeChain<.*>$", "size=${svar%#}", regex=True
     )
-    _add_summary_string(
-        dbg, "^QHashPrivate::Node<.*>$", "(${var.key}, ${var.value})", regex=True
+    add_summary_string(
+        "^QHashPrivate::Node<.*>$", "(${var.key}, ${var.value})", regex=True
     )
-    _add_summary_string(
-        dbg, "^QHashPrivate::Node<.*, QHashDummyValue>$", "${var.key}", regex=True
+    add_summary_string(
+        "^QHashPrivate::Node<.*, QHashDummyValue>$", "${var.key}", regex=True
     )
-    _add_summary_string(dbg, "^QHashPrivate::MultiNode<.*>$", "${var.key}", regex=True)
-    _add_summary_string(
-        dbg,
+    add_summary_string("^QHashPrivate::MultiNode<.*>$", "${var.key}", regex=True)
+    add_summary_string(
         ["QLine", "QLineF"],
         "(${var.pt1.xp}, ${var.pt1.yp}) -> (${var.pt2.xp}, ${var.pt2.yp})",
     )
-    _add_summary_string(
-        dbg, ["QSize", "QSizeF"], "(width: ${var.wd}, height: ${var.ht})"
-    )
-    _add_summary_string(
-        dbg,
+    add_summary_string(["QSize", "QSizeF"], "(width: ${var.wd}, height: ${var.ht})")
+    add_summary_string(
         "QRectF",
         "(x: ${var.xp}, y: ${var.yp}, width: ${var.w}, height: ${var.h})",
     )
-    _add_summary_string(
-        dbg,
+    add_summary_string(
         "QSizePolicy",
         "horizontal=${svar.HorizontalPolicy}, vertical=${svar.VerticalPolicy}",
     )
-    _add_summary_string(dbg, "QChar", "${var.ucs}")
-    _add_summary_string(dbg, ["QJsonObject", "QCborMap"], "\\{ size=${svar%#} \\}")
-    _add_summary_string(dbg, ["QJsonArray", "QCborArray"], "[ size=${svar%#} ]")
-    _add_summary_string(dbg, "^QPropertyData<.*>$", "${var.val}", regex=True)
-    _add_summary_string(dbg, "^QObjectCompatProperty<.*>$", "${var.val}", regex=True)
+    add_summary_string("QChar", "${var.ucs}")
+    add_summary_string(["QJsonObject", "QCborMap"], "\\{ size=${svar%#} \\}")
+    add_summary_string(["QJsonArray", "QCborArray"], "[ size=${svar%#} ]")
+    add_summary_string("^QPropertyData<.*>$", "${var.val}", regex=True)
+    add_summary_string("^QObjectCompatProperty<.*>$", "${var.val}", regex=True)
 
     add_synthetic("QCheckedInt", regex="^QtPrivate::QCheckedIntegers::QCheckedInt<.*>$")
     add_synthetic("QBasicAtomicInteger", regex="^QBasicAtomic(Integer|Pointer)<.*>$")
@@ -161,20 +165,11 @@ def __lldb_init_module(dbg: SBDebugger, internal_dict):
     add_synthetic("QSpan", regex="^QSpan<.*>$")
     add_synthetic("QUrl")
 
-
-def _add_summary_string(
-    dbg: SBDebugger,
-    type_names: Union[str, list[str]],
-    summary: str,
-    *,
-    regex=False,
-    no_value=False,
-):
-    if isinstance(type_names, str):
-        type_names = [type_names]
-    cmd = f"type summary add -w qt --summary-string '{summary}' {'-x' if regex else ''} {'-v' if no_value else ''} "
-    cmd += " ".join(map(lambda it: f'"{it}"', type_names))
-    dbg.HandleCommand(cmd)
+    if not dbg.GetCommandInterpreter().CommandExists("qt"):
+        dbg.HandleCommand('command container add -h "Qt formatter commands" qt')
+    dbg.HandleCommand(f"command script add -o -c {__name__}.MapFindCommand qt map-find")
+    dbg.HandleCommand(f"command script add -o -c {__name__}.JsonGetCommand qt json-get")
+    dbg.HandleCommand(f"command script add -o -c {__name__}.ObjTreeCommand qt objtree")
 
 
 def _get_lldb_version(dbg: SBDebugger) -> tuple[int, int, int]:
@@ -203,37 +198,61 @@ def _qarraydata_summary(valobj: SBValue, ty, prefix: str):
     size = d_obj.GetChildMemberWithName("size").GetValueAsUnsigned()
     if not ptr_obj.IsValid():
         return None
-    if ptr_obj.GetValueAsUnsigned() == 0:
+    addr = ptr_obj.GetValueAsUnsigned()
+    if addr == 0:
         return prefix + '"" (null)'
     if size == 0:
         return prefix + '""'
 
     if ty == lldb.eBasicTypeChar16:
-        return _make_utf16_valobj(ptr_obj, size).GetSummary()
-    array_type = valobj.target.GetBasicType(ty).GetArrayType(size)
-    return ptr_obj.deref.Cast(array_type).GetSummary()
+        return _utf16_summary(ptr_obj, addr, size)
+    return char_array_summary(ptr_obj, addr, size)
 
 
-def _make_utf16_valobj(ptr: SBValue, size: int):
-    tgt = ptr.GetTarget()
+def _utf16_summary(source: SBValue, addr: int, size: int) -> Optional[str]:
+    made = _utf16_value(source, addr, size)
+    if made is None:
+        return None
+    value, truncated = made
+    summary = value.GetSummary()
+    if summary is not None and truncated:
+        summary += f"... (size={size})"
+    return summary
+
+
+def _utf16_value(
+    source: SBValue, addr: int, size: int
+) -> Optional[tuple[SBValue, bool]]:
+    """Create a string from `size` UTF-16 code units at `addr`.
+
+    At most `string_summary_limit()` characters are read, without splitting a
+    surrogate pair. Also returns whether the string was truncated.
+    """
+    tgt = source.GetTarget()
+    limit = string_summary_limit(tgt)
+    n = min(size, limit)
+    if 0 < n < size:
+        last = memory_cache(source.GetProcess()).read_unsigned(addr + (n - 1) * 2, 2)
+        if last is not None and 0xD800 <= last < 0xDC00:
+            n -= 1  # high surrogate
+    text = string_cache(source.GetProcess()).get(addr, n * 2, "utf-16le")
+    if text is None:
+        return None
+    truncated = n < size
     if UNICODE_STR_ARRAY_IS_LIMITED:
-        ty = tgt.GetBasicType(lldb.eBasicTypeChar16).GetArrayType(size)
-        return ptr.Dereference().Cast(ty)
-
-    limit_obj = tgt.GetDebugger().GetSetting("target.max-string-summary-length")
-    if limit_obj:
-        size = min(size, limit_obj.GetUnsignedIntegerValue())
-
-    process = ptr.GetProcess()
-    s = process.ReadMemory(ptr.GetValueAsAddress(), size * 2, SBError()) or bytes()
-    try:
-        s = s.decode("utf-16le").encode("utf-8")
-    except BaseException as _:
-        pass
+        s = text.encode("utf-16le")
+        ty = tgt.GetBasicType(lldb.eBasicTypeChar16).GetArrayType(len(s) // 2)
+    else:
+        s = text.encode("utf-8")
+        # LLDB limits the summary of the UTF-8 array to `limit` bytes.
+        if len(s) > limit:
+            s = s[: utf8_prefix_length(s[:limit])]
+            truncated = True
+        ty = tgt.GetBasicType(lldb.eBasicTypeChar).GetArrayType(len(s))
     data = SBData()
-    data.SetData(SBError(), s, lldb.eByteOrderLittle, 8)
-    ty = tgt.GetBasicType(lldb.eBasicTypeChar).GetArrayType(len(s))
-    return ptr.CreateValueFromData("", data, ty)
+    # An empty array needs a terminator. Otherwise, LLDB would look for one.
+    data.SetData(SBError(), s or b"\0\0", lldb.eByteOrderLittle, 8)
+    return source.CreateValueFromData("", data, ty), truncated
 
 
 def QStringViewSummaryProvider(
@@ -244,7 +263,7 @@ def QStringViewSummaryProvider(
     size = valobj.GetChildMemberWithName("m_size").GetValueAsUnsigned()
     if size == 0:
         return 'u""'
-    return _make_utf16_valobj(ptr, size).GetSummary()
+    return _utf16_summary(ptr, ptr.GetValueAsUnsigned(), size)
 
 
 def QUuidSummaryProvider(
@@ -322,10 +341,6 @@ def QDateTimeSummaryProvider(
     return dt.strftime(f"%Y-%m-%d %X{ms_part} %Z")
 
 
-def get_sizet_ptr(target: SBTarget) -> SBType:
-    return target.GetBasicType(lldb.eBasicTypeLongLong).GetPointerType()
-
-
 def QCborValueSummaryProvider(
     valobj: SBValue, internal_dict: dict, options: lldb.SBTypeSummaryOptions
 ) -> Optional[str]:
@@ -480,26 +495,419 @@ class QPolygonSyntheticProvider(_ExpandingSyntheticProvider):
         return valobj.GetChildAtIndex(0).GetSyntheticValue()  # QList<QPoint>
 
 
-class QMapSyntheticProvider(_ExpandingSyntheticProvider):
-    def _get_value(self, valobj: SBValue) -> SBValue:
-        return (
-            valobj.GetChildAtIndex(0)
-            .GetChildAtIndex(0)
-            .GetChildAtIndex(0)
-            .GetChildMemberWithName("m")
-            .GetSyntheticValue()
+class QMapSyntheticProvider:
+    LOOKUP_INDEX = 1 << 31
+    """Children at and above this index are values that were looked up by key."""
+
+    def __init__(self, valobj: SBValue, internal_dict):
+        self._valobj = valobj
+        self._tree: Optional[_RbTree] = None
+        self._nodes: Optional[list[int]] = None
+        self._lookups: list[SBValue] = []
+        self._lookup_indices: dict[str, int] = {}
+        """Indices of `_lookups` by the name they were looked up with."""
+
+    def num_children(self):
+        if self._tree is None:
+            return 0
+        return self._tree.size
+
+    def get_child_index(self, name: str):
+        idx = _numeric_index(name)
+        if idx is not None or self._tree is None:
+            return idx
+        # map["key"]
+        idx = self._lookup_indices.get(name)
+        if idx is not None:
+            return self.LOOKUP_INDEX + idx
+        key = name.removeprefix("[").removesuffix("]")
+        value = _qmap_find(self._valobj, self._tree, _unquote(key))
+        if value is None:
+            return None
+        idx = len(self._lookups)
+        self._lookups.append(value.Clone(name))
+        self._lookup_indices[name] = idx
+        return self.LOOKUP_INDEX + idx
+
+    def get_child_at_index(self, idx: int):
+        if self._tree is None or idx < 0:
+            return None
+        if idx >= self.LOOKUP_INDEX:
+            idx -= self.LOOKUP_INDEX
+            return self._lookups[idx] if idx < len(self._lookups) else None
+        if self._nodes is None:
+            self._nodes = _rb_tree_nodes(self._valobj.process, self._tree)
+        if idx >= len(self._nodes):
+            return None
+        return self._valobj.CreateValueFromAddress(
+            f"[{idx}]",
+            self._nodes[idx] + self._tree.value_offset,
+            self._tree.value_type,
         )
 
+    def update(self):
+        self._nodes = None
+        self._lookups = []
+        self._lookup_indices = {}
+        self._tree = _qmap_tree(self._valobj)
+        return False
 
-class QMultiMapSyntheticProvider(_ExpandingSyntheticProvider):
-    def _get_value(self, valobj: SBValue) -> SBValue:
-        return (
-            valobj.GetChildAtIndex(0)
-            .GetChildAtIndex(0)
-            .GetChildAtIndex(0)
-            .GetChildMemberWithName("m")
-            .GetSyntheticValue()
+    def has_children(self):
+        return True
+
+
+class QMultiMapSyntheticProvider(QMapSyntheticProvider):
+    pass
+
+
+class MapFindCommand:
+    def __init__(self, debugger: SBDebugger, internal_dict):
+        self._parser = CommandParser(
+            prog="qt map-find",
+            description=(
+                "Look up a key in a QMap or QMultiMap without expanding it. "
+                "Integer, enum, QString and QByteArray keys are supported."
+            ),
+        )
+        self._parser.add_argument("map", help="variable path or expression of the map")
+        self._parser.add_argument("key", help="key to look up")
+
+    def get_short_help(self):
+        return "Find the value for a key in a QMap."
+
+    def get_long_help(self):
+        return self._parser.format_help()
+
+    def __call__(
+        self,
+        debugger: SBDebugger,
+        command: str,
+        exe_ctx: lldb.SBExecutionContext,
+        result: lldb.SBCommandReturnObject,
+    ):
+        try:
+            args = self._parser.parse_args(shlex.split(command))
+            value = evaluate_value(exe_ctx, args.map)
+        except ValueError as e:
+            result.SetError(str(e))
+            return
+
+        raw = value.GetNonSyntheticValue()
+        name = raw.GetType().GetUnqualifiedType().GetCanonicalType().GetName()
+        if not re.match(r"^Q(Multi)?Map<", name):
+            result.SetError(f"'{args.map}' is a {name}, not a QMap")
+            return
+        tree = _qmap_tree(raw)
+        found = _qmap_find(raw, tree, args.key) if tree else None
+        if found is None:
+            result.SetError(f"key {args.key} not found")
+            return
+        result.AppendMessage(str(found).rstrip())
+
+
+class _RbTree(NamedTuple):
+    """The red-black tree of an `std::map` or `std::multimap`."""
+
+    root: int
+    nil: int
+    """Address of the node that marks missing children (MSVC's head node or null)."""
+    size: int
+    left: int
+    """Offset of the left child pointer in a node."""
+    right: int
+    """Offset of the right child pointer in a node."""
+    value_offset: int
+    value_type: SBType
+
+
+def _qmap_tree(valobj: SBValue) -> Optional[_RbTree]:
+    m: SBValue = (
+        valobj.GetChildAtIndex(0)
+        .GetChildAtIndex(0)
+        .GetChildAtIndex(0)
+        .GetChildMemberWithName("m")
+    )
+    if not m:
+        return None
+    return _std_map_tree(m.GetNonSyntheticValue())
+
+
+def _qmap_find(valobj: SBValue, tree: _RbTree, key_text: str) -> Optional[SBValue]:
+    """Find the value for the key `key_text` by descending the tree of a `QMap`.
+
+    Returns `None` if there's no such key or the key type isn't supported.
+    """
+    first = _type_field(tree.value_type, "first")
+    second = _type_field(tree.value_type, "second")
+    if not first or not second:
+        return None
+    codec = _map_key_codec(valobj.target, first.GetType())
+    if codec is None:
+        return None
+    read_key, parse_key = codec
+    try:
+        key = parse_key(key_text)
+    except ValueError:
+        return None
+    node = _rb_tree_lower_bound(
+        valobj.process, tree, tree.value_offset + first.GetOffsetInBytes(), read_key, key
+    )
+    if node is None:
+        return None
+    return valobj.CreateValueFromAddress(
+        f"[{key_text}]",
+        node + tree.value_offset + second.GetOffsetInBytes(),
+        second.GetType(),
+    )
+
+
+_MapKeyCodec = tuple[Callable[[SBProcess, int], Any], Callable[[str], Any]]
+"""Reads a key from memory and parses a key from text into comparable values."""
+
+_QARRAYDATA_FIELDS = (
+    ("ptr", "d.ptr", "P"),
+    ("size", "d.size", "n"),
+)
+# offsetof(QString/QByteArray, d.ptr/d.size) on 32-bit and 64-bit targets
+_QARRAYDATA_OFFSETS = {4: (4, 8), 8: (8, 16)}
+
+
+def _map_key_codec(target: SBTarget, key_type: SBType) -> Optional[_MapKeyCodec]:
+    """Support lookups for integer, enum, `QString` and `QByteArray` keys."""
+    ty = key_type.GetUnqualifiedType().GetCanonicalType()
+    name = ty.GetName()
+    if name in ("QString", "QByteArray"):
+        layout = struct_layout(target, name, _QARRAYDATA_FIELDS, _QARRAYDATA_OFFSETS)
+        if layout is None:
+            return None
+
+        def read_array(process: SBProcess, addr: int):
+            d = layout.read(process, addr)
+            if d is None:
+                return None
+            if d.size <= 0:
+                return b""
+            if name == "QByteArray":
+                return memory_cache(process).read(d.ptr, d.size)
+            text = string_cache(process).get(d.ptr, d.size * 2, "utf-16le")
+            # QString compares UTF-16 code units.
+            return None if text is None else text.encode("utf-16-be")
+
+        if name == "QByteArray":
+            return read_array, lambda text: text.encode("utf-8")
+        return read_array, lambda text: text.encode("utf-16-be")
+
+    enumerators: dict[str, int] = {}
+    if ty.GetTypeFlags() & lldb.eTypeIsEnumeration:
+        members: lldb.SBTypeEnumMemberList = ty.GetEnumMembers()
+        for i in range(members.GetSize()):
+            member: lldb.SBTypeEnumMember = members.GetTypeEnumMemberAtIndex(i)
+            enumerators[member.GetName()] = member.GetValueAsSigned()
+        ty = ty.GetEnumerationIntegerType()
+    if not ty.GetTypeFlags() & lldb.eTypeIsInteger:
+        return None
+    size = ty.GetByteSize()
+    signed = bool(ty.GetTypeFlags() & lldb.eTypeIsSigned)
+
+    def read_int(process: SBProcess, addr: int):
+        mem = memory_cache(process)
+        if signed:
+            return mem.read_signed(addr, size)
+        return mem.read_unsigned(addr, size)
+
+    def parse_int(text: str):
+        value = enumerators.get(text.rpartition("::")[2])
+        if value is None:
+            value = int(text, 0)
+        if not signed:
+            value &= (1 << (size * 8)) - 1
+        return value
+
+    return read_int, parse_int
+
+
+def _unquote(text: str) -> str:
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    return text
+
+
+def _std_map_tree(m: SBValue) -> Optional[_RbTree]:
+    """Find the tree of `m` in libstdc++, libc++ or MSVC's STL."""
+    ptr_size = m.process.GetAddressByteSize()
+    mem = memory_cache(m.process)
+
+    # libstdc++
+    # struct _Rb_tree_node_base {
+    #   _Rb_tree_color _M_color;
+    #   _Base_ptr _M_parent, _M_left, _M_right;
+    # };
+    tree = m.GetChildMemberWithName("_M_t")
+    if tree:
+        impl = tree.GetChildMemberWithName("_M_impl")
+        header = impl.GetChildMemberWithName("_M_header")
+        value_type = tree.GetType().GetCanonicalType().GetTemplateArgumentType(1)
+        node_type = target_types(m.target).find(
+            f"std::_Rb_tree_node<{value_type.GetName()}>"
+        )
+        storage = _type_field(node_type, "_M_storage")
+        return _RbTree(
+            root=header.GetChildMemberWithName("_M_parent").GetValueAsAddress(),
+            nil=0,
+            size=impl.GetChildMemberWithName("_M_node_count").GetValueAsUnsigned(),
+            left=2 * ptr_size,
+            right=3 * ptr_size,
+            value_offset=storage.GetOffsetInBytes() if storage else 4 * ptr_size,
+            value_type=value_type,
+        )
+
+    # libc++
+    # struct __tree_end_node { pointer __left_; };
+    # struct __tree_node_base : __tree_end_node {
+    #   pointer __right_;
+    #   __parent_pointer __parent_;
+    #   bool __is_black_;
+    # };
+    tree = m.GetChildMemberWithName("__tree_")
+    if tree:
+        end_node = tree.GetChildMemberWithName("__end_node_")
+        if not end_node:
+            end_node = tree.GetChildMemberWithName("__pair1_")
+        size_obj = tree.GetChildMemberWithName("__size_")
+        if size_obj:
+            size = size_obj.GetValueAsUnsigned()
+        else:
+            pair3 = tree.GetChildMemberWithName("__pair3_")
+            size = mem.read_pointer(pair3.GetLoadAddress()) or 0
+        # __value_type<K, V> wraps the pair in `__cc_`
+        value_type = tree.GetType().GetCanonicalType().GetTemplateArgumentType(0)
+        cc = _type_field(value_type, "__cc_")
+        return _RbTree(
+            root=mem.read_pointer(end_node.GetLoadAddress()) or 0,  # __left_
+            nil=0,
+            size=size,
+            left=0,
+            right=ptr_size,
+            value_offset=4 * ptr_size,
+            value_type=cc.GetType() if cc else value_type,
+        )
+
+    # MSVC
+    # struct _Tree_node {
+    #   _Nodeptr _Left, _Parent, _Right;
+    #   char _Color, _Isnil;
+    #   value_type _Myval;
+    # };
+    val = (
+        m.GetChildMemberWithName("_Mypair")
+        .GetChildMemberWithName("_Myval2")
+        .GetChildMemberWithName("_Myval2")
+    )
+    if val:
+        head_obj = val.GetChildMemberWithName("_Myhead")
+        head = head_obj.GetValueAsAddress()
+        myval = _type_field(head_obj.GetType().GetPointeeType(), "_Myval")
+        if not head or not myval:
+            return None
+        return _RbTree(
+            root=mem.read_pointer(head + ptr_size) or head,  # _Myhead->_Parent
+            nil=head,
+            size=val.GetChildMemberWithName("_Mysize").GetValueAsUnsigned(),
+            left=0,
+            right=2 * ptr_size,
+            value_offset=myval.GetOffsetInBytes(),
+            value_type=myval.GetType(),
         )
+    return None
+
+
+def _type_field(ty: SBType, name: str) -> Optional[lldb.SBTypeMember]:
+    ty = ty.GetCanonicalType()
+    for i in range(ty.GetNumberOfFields()):
+        field = ty.GetFieldAtIndex(i)
+        if field.GetName() == name:
+            return field
+    return None
+
+
+def _rb_tree_nodes(process: SBProcess, tree: _RbTree) -> list[int]:
+    """In-order node addresses of `tree` (cached until the process resumes)."""
+    trees = stop_local(process, "rb-trees", dict)
+    key = (tree.root, tree.size)
+    nodes = trees.get(key)
+    if nodes is None:
+        nodes = _walk_rb_tree(memory_cache(process), tree)
+        trees[key] = nodes
+    return nodes
+
+
+def _rb_node_header(mem: MemoryCache, tree: _RbTree) -> tuple[struct.Struct, int, int]:
+    """Get a decoder for the header of a node and the indices of the children in it."""
+    ptr_size = mem.pointer_size
+    # The first four pointers of each node contain both children.
+    header = struct.Struct(
+        ("<" if mem.byte_order == "little" else ">")
+        + ("4Q" if ptr_size == 8 else "4I")
+    )
+    return header, tree.left // ptr_size, tree.right // ptr_size
+
+
+def _rb_tree_lower_bound(
+    process: SBProcess,
+    tree: _RbTree,
+    key_offset: int,
+    read_key: Callable[[SBProcess, int], Any],
+    key: Any,
+) -> Optional[int]:
+    """Find the first node whose key (at `key_offset` in the node) equals `key`."""
+    mem = memory_cache(process)
+    header, left, right = _rb_node_header(mem, tree)
+    found = None
+    node = tree.root
+    # A red-black tree with n nodes is at most 2*log2(n + 1) deep.
+    for _ in range(2 * max(tree.size, 1).bit_length() + 2):
+        if not node or node == tree.nil:
+            break
+        node_key = read_key(process, node + key_offset)
+        data = mem.read(node, header.size)
+        if node_key is None or data is None or len(data) != header.size:
+            return None
+        words = header.unpack(data)
+        if node_key < key:
+            node = words[right]
+        else:
+            if not key < node_key:
+                found = node
+            node = words[left]
+    return found
+
+
+def _walk_rb_tree(mem: MemoryCache, tree: _RbTree) -> list[int]:
+    header, left, right = _rb_node_header(mem, tree)
+
+    nodes: list[int] = []
+    # Nodes whose left subtree is being visited and their right child.
+    stack: list[tuple[int, int]] = []
+    node = tree.root
+    seen: set[int] = set()
+    while len(nodes) < tree.size:
+        while node and node != tree.nil:
+            # A corrupted tree could have cycles.
+            if node in seen or len(seen) == tree.size:
+                return nodes
+            data = mem.read(node, header.size)
+            if data is None or len(data) != header.size:
+                return nodes
+            words = header.unpack(data)
+            stack.append((node, words[right]))
+            seen.add(node)
+            node = words[left]
+        if not stack:
+            break
+        node, right_child = stack.pop()
+        nodes.append(node)
+        node = right_child
+    return nodes
 
 
 class QSetSyntheticProvider(_ExpandingSyntheticProvider):
@@ -510,7 +918,7 @@ class QSetSyntheticProvider(_ExpandingSyntheticProvider):
 class QJsonDocumentSyntheticProvider(_ExpandingSyntheticProvider):
     def __init__(self, valobj: SBValue, internal_dict):
         super().__init__(valobj, internal_dict)
-        self._cbor_ptr = valobj.GetTarget().FindFirstType("QCborValue").GetPointerType()
+        self._cbor_ptr = target_types(valobj.GetTarget()).pointer("QCborValue")
 
     def _get_value(self, valobj: SBValue) -> SBValue:
         d_ptr: SBValue = valobj.GetChildAtIndex(0).Cast(self._cbor_ptr)
@@ -519,31 +927,116 @@ class QJsonDocumentSyntheticProvider(_ExpandingSyntheticProvider):
         return d_ptr.Dereference().GetSyntheticValue()
 
 
+_TRIVIAL_QT_TYPES = {
+    "QChar",
+    "QLine",
+    "QLineF",
+    "QMargins",
+    "QMarginsF",
+    "QPoint",
+    "QPointF",
+    "QRect",
+    "QRectF",
+    "QSize",
+    "QSizeF",
+}
+"""Trivially copyable Qt types that can be formatted from a copy of their bytes."""
+
+
+def _is_trivially_copyable(ty: SBType) -> bool:
+    ty = ty.GetUnqualifiedType().GetCanonicalType()
+    if ty.GetTypeFlags() & (
+        lldb.eTypeIsScalar | lldb.eTypeIsEnumeration | lldb.eTypeIsPointer
+    ):
+        return True
+    return ty.GetName() in _TRIVIAL_QT_TYPES
+
+
 class _ArraySyntheticProvider:
     def __init__(self, valobj: SBValue, internal_dict):
         self._backend = valobj
         self._size = 0
         self._val: Optional[SBValue] = None
+        self._groups = ChildGroups(valobj)
+        self._base_addr = 0
+        self._element_type: Optional[SBType] = None
+        """Set if elements are created from a buffer (see `_element_from_window`)."""
+        self._window: Optional[tuple[int, Optional[bytes]]] = None
+        """Index of the first element in the window and its bytes."""
+        self._hexdump = Hexdump(valobj)
 
     def num_children(self):
-        return self._size
+        if self._hexdump.enabled:
+            return self._hexdump.num_children()
+        return self._groups.num_children()
 
     def get_child_index(self, name: str):
-        return _numeric_index(name)
+        if self._hexdump.enabled:
+            return self._hexdump.child_index(name)
+        return self._groups.child_index(name)
 
     def get_child_at_index(self, idx: int):
-        if idx < 0 or idx >= self._size or not self._val:
+        if not self._val:
             return None
+        if self._hexdump.enabled:
+            return self._hexdump.child_at_index(idx)
+        return self._groups.child_at_index(idx, self._element)
+
+    def _element(self, idx: int) -> SBValue:
+        if self._element_type is not None:
+            v = self._element_from_window(idx)
+            if v is not None:
+                return v
         return self._val.GetChildAtIndex(idx).Clone(f"[{idx}]")
 
+    def _element_from_window(self, idx: int) -> Optional[SBValue]:
+        # Read the elements LLDB shows at once (max-children-count) in one go.
+        assert self._element_type is not None
+        elem_size = self._element_type.GetByteSize()
+        window_len = max(self._backend.target.GetMaximumNumberOfChildrenToDisplay(), 1)
+        start = idx - idx % window_len
+        if self._window is None or self._window[0] != start:
+            n_bytes = min(window_len, self._size - start) * elem_size
+            data = memory_cache(self._backend.process).read(
+                self._base_addr + start * elem_size, n_bytes
+            )
+            if data is not None and len(data) != n_bytes:
+                data = None
+            self._window = (start, data)
+        data = self._window[1]
+        if data is None:
+            return None
+        offset = (idx - start) * elem_size
+        sb_data = SBData()
+        sb_data.SetData(
+            SBError(),
+            data[offset : offset + elem_size],
+            self._backend.process.GetByteOrder(),
+            self._backend.process.GetAddressByteSize(),
+        )
+        return self._backend.CreateValueFromData(
+            f"[{idx}]", sb_data, self._element_type
+        )
+
     def has_children(self):
         return self._val is not None
 
     def update(self):
         ptr, size = self._pointer_and_size(self._backend)
         self._size = size
-        array_type = self._array_type(ptr).GetArrayType(self._size)
-        self._val = ptr.deref.Cast(array_type)
+        element_type = self._array_type(ptr)
+        self._val = ptr.deref.Cast(element_type.GetArrayType(self._size))
+        self._groups.update(size)
+        self._window = None
+        self._base_addr = ptr.GetValueAsAddress()
+        if _is_trivially_copyable(element_type) and element_type.GetByteSize() > 0:
+            self._element_type = element_type
+        else:
+            self._element_type = None
+        if is_byte_type(element_type):
+            mem = memory_cache(self._backend.process)
+            base = self._base_addr
+            self._hexdump.update(size, lambda offset, n: mem.read(base + offset, n))
         return False
 
     def _pointer_and_size(self, valobj: SBValue) -> tuple[SBValue, int]:
@@ -601,7 +1094,7 @@ class QByteArraySyntheticProvider(_ArraySyntheticProvider):
         return (ptr_obj, size)
 
     def _array_type(self, valobj: SBValue):
-        return valobj.target.GetBasicType(lldb.eBasicTypeChar16)
+        return valobj.target.GetBasicType(lldb.eBasicTypeChar)
 
 
 class QStringViewSyntheticProvider(_ArraySyntheticProvider):
@@ -727,8 +1220,9 @@ class QRectFSyntheticProvider(_DispatchedSynthetic):
 class QSizePolicySyntheticProvider(_DispatchedSynthetic):
     def __init__(self, valobj: SBValue, internal_dict):
         super().__init__(valobj, internal_dict)
-        self._policy = valobj.GetTarget().FindFirstType("QSizePolicy::Policy")
-        self._control = valobj.GetTarget().FindFirstType("QSizePolicy::ControlType")
+        types = target_types(valobj.GetTarget())
+        self._policy = types.find("QSizePolicy::Policy")
+        self._control = types.find("QSizePolicy::ControlType")
 
     def update(self):
         self._bits: SBValue = self._valobj.GetChildAtIndex(0).GetChildMemberWithName(
@@ -942,12 +1436,35 @@ class QDateTimeSyntheticProvider:
         return True
 
 
+# struct QHashPrivate::Span<Node> {
+#   unsigned char offsets[SpanConstants::NEntries];
+#   Entry *entries;
+#   unsigned char allocated;
+#   unsigned char nextFree;
+# };
+_QHASH_SPAN_FIELDS = (
+    ("offsets", "offsets", f"{QHashConstants.N_ENTRIES}s"),
+    ("entries", "entries", "P"),
+    ("allocated", "allocated", "B"),
+    ("next_free", "nextFree", "B"),
+)
+# offsetof(Span, ...) on 32-bit and 64-bit targets
+_QHASH_SPAN_OFFSETS = {4: (0, 128, 132, 133), 8: (0, 128, 136, 137)}
+
+
 class QHashSyntheticProvider:
     def __init__(self, valobj: SBValue, internal_dict):
         self._size = 0
         self._num_buckets = 0
-        self._last_bucket: Optional[tuple[int, int]] = None
         self._valobj = valobj
+        self._spans_addr = 0
+        self._span_layout: Optional[StructLayout] = None
+        self._span_offsets: list[bytes] = []
+        self._span_entries: list[int] = []
+        self._span_prefix: Optional[list[int]] = None
+        """Number of occupied entries before each span (and the total at the end)."""
+        self._last_span: Optional[tuple[int, bytes]] = None
+        """Index of the last accessed span and the entry offsets of its occupied buckets."""
 
     def num_children(self):
         return self._size
@@ -956,72 +1473,73 @@ class QHashSyntheticProvider:
         return _numeric_index(name)
 
     def get_child_at_index(self, idx: int):
-        if idx < 0 or idx >= self._size:
+        if idx < 0 or idx >= self._size or not self._spans_addr:
             return None
-        cur_idx = -1
-        cur_bucket = 0
-        if self._last_bucket is not None and self._last_bucket[0] <= idx:
-            cur_idx = self._last_bucket[0] - 1
-            cur_bucket = self._last_bucket[1]
-
-        proc: SBProcess = self._valobj.process
-        err = SBError()
-        span_obj = None
-        # go through each span
-        while cur_idx != idx and cur_bucket < self._num_buckets:
-            span_idx = cur_bucket >> QHashConstants.SPAN_SHIFT
-            last_bucket = min(
-                (span_idx + 1) << QHashConstants.SPAN_SHIFT, self._num_buckets
-            )
-            span_obj = self._spans.CreateChildAtOffset(
-                "", span_idx * self._span_size, self._span_type
-            )
-            offsets = span_obj.GetChildAtIndex(self._span_offsets_idx)
-            buf = proc.ReadMemory(offsets.load_addr, QHashConstants.N_ENTRIES, err)
-            if err.Fail() or buf is None:
-                return None
-            # go through each entry
-            while cur_bucket < last_bucket:
-                el_idx = cur_bucket & QHashConstants.ELEMENT_MASK
-                if buf[el_idx] != 0xFF:
-                    cur_idx += 1
-                    offset = buf[el_idx]
-                    if cur_idx == idx:
-                        break
-                cur_bucket += 1
-        if cur_idx != idx or not span_obj:
-            return None  # nothing found
-        self._last_bucket = (idx, cur_bucket)
-
-        entries_obj = span_obj.GetChildAtIndex(self._span_entries_idx)
-        entry_obj = entries_obj.CreateChildAtOffset(
-            "", offset * self._entry_size, self._entry_type
-        )
-        return (
-            entry_obj.GetChildMemberWithName("storage")
-            .GetChildAtIndex(0)
-            .Cast(self._node_ty)
-            .Clone(f"[{idx}]")
+        if self._span_prefix is None:
+            self._build_index()
+        assert self._span_prefix is not None
+        if idx >= self._span_prefix[-1]:
+            return None  # The spans couldn't be read or the hash changed.
+
+        span_idx = bisect.bisect_right(self._span_prefix, idx) - 1
+        if self._last_span is None or self._last_span[0] != span_idx:
+            unused = bytes([QHashConstants.UNUSED_ENTRY])
+            occupied = self._span_offsets[span_idx].replace(unused, b"")
+            self._last_span = (span_idx, occupied)
+        offset = self._last_span[1][idx - self._span_prefix[span_idx]]
+        return self._valobj.CreateValueFromAddress(
+            f"[{idx}]",
+            self._span_entries[span_idx] + offset * self._entry_size,
+            self._node_ty,
         )
 
+    def _build_index(self):
+        self._span_prefix = [0]
+        self._span_offsets = []
+        self._span_entries = []
+        if self._span_layout is None:
+            return
+        n_spans = (
+            self._num_buckets + QHashConstants.N_ENTRIES - 1
+        ) >> QHashConstants.SPAN_SHIFT
+        # Read all spans at once and only keep what's needed to find entries.
+        mem = memory_cache(self._valobj.process)
+        data = mem.read(self._spans_addr, n_spans * self._span_size)
+        if data is None:
+            return
+        unused = bytes([QHashConstants.UNUSED_ENTRY])
+        total = 0
+        for span in self._span_layout.unpack_array(data, self._span_size):
+            total += QHashConstants.N_ENTRIES - span.offsets.count(unused)
+            self._span_prefix.append(total)
+            self._span_offsets.append(span.offsets)
+            self._span_entries.append(span.entries)
+
     def update(self):
+        self._span_prefix = None
+        self._span_offsets = []
+        self._span_entries = []
+        self._last_span = None
+        self._spans_addr = 0
         d: SBValue = self._valobj.GetChildMemberWithName("d")
         self._node_ty = self._valobj.type.FindDirectNestedType("Node")
         if not self._node_ty:
             self._node_ty = d.GetType().GetPointeeType().GetCanonicalType().GetTemplateArgumentType(0)
         self._size = d.GetChildMemberWithName("size").unsigned
         self._num_buckets = d.GetChildMemberWithName("numBuckets").unsigned
-        self._spans: SBValue = d.GetChildMemberWithName("spans")
-        self._span_type: SBType = self._spans.type.GetPointeeType()
-        if not self._spans:
+        spans: SBValue = d.GetChildMemberWithName("spans")
+        if not spans:
             return
-        self._span_size = self._span_type.GetByteSize()
-        self._span_offsets_idx = self._spans.GetIndexOfChildWithName("offsets")
-        self._span_entries_idx = self._spans.GetIndexOfChildWithName("entries")
-        self._entry_type = self._spans.GetChildAtIndex(
-            self._span_entries_idx
-        ).type.GetPointeeType()
-        self._entry_size = self._entry_type.GetByteSize()
+        span_type: SBType = spans.type.GetPointeeType()
+        self._spans_addr = spans.GetValueAsAddress()
+        self._span_size = span_type.GetByteSize()
+        self._entry_size = self._node_ty.GetByteSize()
+        self._span_layout = struct_layout(
+            self._valobj.GetTarget(),
+            span_type.GetName(),
+            _QHASH_SPAN_FIELDS,
+            _QHASH_SPAN_OFFSETS,
+        )
         return
 
     def has_children(self):
@@ -1030,45 +1548,55 @@ class QHashSyntheticProvider:
 
 class QHashPrivateMultiChainSyntheticProvider:
     def __init__(self, valobj: SBValue, internal_dict):
-        self._size = None
         self._valobj = valobj
-        self._next_idx = valobj.GetIndexOfChildWithName("next")
+        self._nodes: Optional[list[int]] = None
+        """Addresses of the nodes after the head (which is `valobj` itself)."""
 
     def num_children(self):
-        if self._size is None:
-            self._calc_size()
-        return self._size
-
-    def _calc_size(self):
-        self._size = 0
-        vo = self._valobj
-        max_idx = vo.target.GetMaximumNumberOfChildrenToDisplay()
-        while self._size < max_idx:
-            vo = vo.GetChildAtIndex(self._next_idx)
-            self._size += 1
-            if vo.GetValueAsAddress() == 0:
-                break
+        if self._nodes is None:
+            self._walk()
+        assert self._nodes is not None
+        return 1 + len(self._nodes)
+
+    def _walk(self):
+        # struct MultiNodeChain { T value; MultiNodeChain *next; };
+        self._nodes = []
+        next_obj = self._valobj.GetChildMemberWithName("next")
+        if not next_obj:
+            return
+        next_offset = next_obj.GetByteOffset()
+        mem = memory_cache(self._valobj.process)
+        max_nodes = self._valobj.target.GetMaximumNumberOfChildrenToDisplay() - 1
+        # The chain is usually referenced through a pointer (`MultiNode::value`).
+        if self._valobj.TypeIsPointerType():
+            seen = {self._valobj.GetValueAsAddress()}
+        else:
+            seen = {self._valobj.GetLoadAddress()}
+        addr = next_obj.GetValueAsAddress()
+        # Stop at a cycle or the display limit, so a corrupted chain can't hang.
+        while addr and addr not in seen and len(self._nodes) < max_nodes:
+            seen.add(addr)
+            self._nodes.append(addr)
+            addr = mem.read_pointer(addr + next_offset)
 
     def get_child_index(self, name: str):
         return _numeric_index(name)
 
     def get_child_at_index(self, idx: int):
-        if idx < 0:
-            return None
-        cur = 0
-        vo = self._valobj
-        max_idx = vo.target.GetMaximumNumberOfChildrenToDisplay()
-        while cur != idx and cur < max_idx:
-            vo = vo.GetChildAtIndex(self._next_idx)
-            if vo.GetValueAsAddress() == 0:
-                break
-            cur += 1
-        if cur != idx:
+        if idx < 0 or idx >= self.num_children():
             return None
-        return vo.GetChildMemberWithName("value").Clone(f"[{idx}]")
+        value = self._valobj.GetChildMemberWithName("value")
+        if idx == 0:
+            return value.Clone("[0]")
+        assert self._nodes is not None
+        return self._valobj.CreateValueFromAddress(
+            f"[{idx}]",
+            self._nodes[idx - 1] + value.GetByteOffset(),
+            value.GetType(),
+        )
 
     def update(self):
-        self._size = None
+        self._nodes = None
 
     def has_children(self):
         return True
@@ -1108,21 +1636,6 @@ class QHashPrivateNodeSyntheticProvider:
         return None
 
 
-class LazyType:
-    def __init__(self, tgt: SBTarget, names: Union[str, tuple[str, ...]]):
-        self.tgt = tgt
-        self.names = (names,) if isinstance(names, str) else names
-        self.ty = None
-
-    def __call__(self) -> SBType:
-        if self.ty is None:
-            for n in self.names:
-                self.ty = self.tgt.FindFirstType(n)
-                if self.ty:
-                    break
-        return self.ty  # type: ignore
-
-
 # struct QtCbor::Element {
 #   union {
 #     qint64 value;
@@ -1139,7 +1652,16 @@ class LazyType:
 # };
 
 
+_CBOR_ELEMENT_SIZE = 16
+"""`sizeof(QtCbor::Element)` (the union contains a `qint64`)."""
+_CBOR_ELEMENT_FORMAT = "qII"
+_CBOR_MAX_HEADER_SPAN = 1 << 20
+"""Maximum number of bytes of `data` that are read at once for string sizes."""
+
+
 class _CborContainerSyntheticProviderBase:
+    ELEMENTS_PER_CHILD = 1
+
     def __init__(self, valobj: SBValue, internal_dict):
         self._valobj = valobj
         self._size = 0
@@ -1147,12 +1669,21 @@ class _CborContainerSyntheticProviderBase:
         self._process: SBProcess = valobj.process
         self._elements_ptr = 0
         self._data_ptr = 0
-        self._sizet_ptr = get_sizet_ptr(self._target)
+        self._data_size = 0
+        self._types = target_types(self._target)
+        self._sizet_ptr = self._types.pointer(lldb.eBasicTypeLongLong)
         self._pointer_size = self._process.GetAddressByteSize()
-        self._array_ty = LazyType(self._target, ("QJsonArray", "QCborArray"))
-        self._map_ty = LazyType(self._target, ("QJsonObject", "QCborMap"))
-        self._barray_ty = LazyType(self._target, "QByteArray")
-        self._qcborval_ty = LazyType(self._target, ("QCborValue", "QJsonValue"))
+        order = ">" if self._process.GetByteOrder() == lldb.eByteOrderBig else "<"
+        self._element_struct = struct.Struct(order + _CBOR_ELEMENT_FORMAT)
+        self._size_struct = struct.Struct(
+            order + ("q" if self._pointer_size == 8 else "i")
+        )
+        self._window: Optional[
+            tuple[int, Optional[bytes], list[tuple[int, int, int]]]
+        ] = None
+        """Index of the first element in the window, its bytes and its elements."""
+        self._string_sizes: dict[int, int] = {}
+        """Sizes of the strings in `data` by their offset."""
 
     def num_children(self):
         return self._size
@@ -1160,36 +1691,99 @@ class _CborContainerSyntheticProviderBase:
     def get_child_index(self, name: str):
         return _numeric_index(name)
 
-    def value_at_index(self, idx: int):
+    def _element(self, idx: int) -> Optional[tuple[int, int, int, bytes]]:
+        """Get the value, type, flags and raw value bytes of element `idx`."""
+        window_len = max(self._target.GetMaximumNumberOfChildrenToDisplay(), 1)
+        window_len *= self.ELEMENTS_PER_CHILD
+        start = idx - idx % window_len
+        if self._window is None or self._window[0] != start:
+            n = min(window_len, self._size - start)
+            self._window = self._read_window(start, n)
+        _, data, elements = self._window
+        if data is None:
+            return None
+        value, ty, flags = elements[idx - start]
+        offset = (idx - start) * _CBOR_ELEMENT_SIZE
+        return value, ty, flags, data[offset : offset + 8]
+
+    def _read_window(
+        self, start: int, n: int
+    ) -> tuple[int, Optional[bytes], list[tuple[int, int, int]]]:
+        # Decode all elements of the window from one read.
+        mem = memory_cache(self._process)
+        n_bytes = n * _CBOR_ELEMENT_SIZE
+        data = mem.read(self._elements_ptr + start * _CBOR_ELEMENT_SIZE, n_bytes)
+        if data is None or len(data) != n_bytes:
+            return (start, None, [])
+        elements = list(self._element_struct.iter_unpack(data))
+
+        # Get the sizes of all strings in the window from one read of `data`.
+        offsets = [
+            value
+            for value, ty, _ in elements
+            if ty == QCborValueType.ByteArray or ty == QCborValueType.String
+        ]
+        offsets = [
+            off
+            for off in offsets
+            if 0 <= off <= self._data_size - self._pointer_size
+            and off not in self._string_sizes
+        ]
+        if offsets:
+            lo = min(offsets)
+            hi = max(offsets) + self._pointer_size
+            if hi - lo <= _CBOR_MAX_HEADER_SPAN:
+                headers = mem.read(self._data_ptr + lo, hi - lo)
+                if headers is not None and len(headers) == hi - lo:
+                    for off in offsets:
+                        (size,) = self._size_struct.unpack_from(headers, off - lo)
+                        self._string_sizes[off] = size
+        return (start, data, elements)
+
+    def _string_size(self, offset: int) -> Optional[int]:
+        size = self._string_sizes.get(offset)
+        if size is None:
+            # The headers were too far apart to read them at once.
+            size = memory_cache(self._process).read_pointer(self._data_ptr + offset)
+        return size
+
+    def _value_from_bytes(self, data: bytes, ty: SBType) -> SBValue:
+        sb_data = SBData()
+        sb_data.SetData(
+            SBError(), data, self._process.GetByteOrder(), self._pointer_size
+        )
+        return self._valobj.CreateValueFromData("", sb_data, ty)
+
+    def _single_element(self, idx: int) -> Optional[tuple[int, int, int, bytes]]:
+        """Like `_element()`, but only reads element `idx`."""
+        _, data, elements = self._read_window(idx, 1)
+        if data is None:
+            return None
+        value, ty, flags = elements[0]
+        return value, ty, flags, data[:8]
+
+    def value_at_index(self, idx: int, *, windowed=True):
         if idx < 0 or idx >= self._size:
             return
 
-        element_ptr = self._elements_ptr + (self._pointer_size * 2) * idx
-        err = SBError()
-        ty_and_flags = self._process.ReadUnsignedFromMemory(
-            element_ptr + self._pointer_size, 8, err
-        )
-        if err.Fail():
+        element = self._element(idx) if windowed else self._single_element(idx)
+        if element is None:
             return
-        ty = ty_and_flags & 0xFFFFFFFF
-        flags = ty_and_flags >> 32
+        value, ty, flags, raw = element
+        element_ptr = self._elements_ptr + _CBOR_ELEMENT_SIZE * idx
         if ty == QCborValueType.Integer:
-            return self._valobj.CreateValueFromAddress(
-                "", element_ptr, self._target.GetBasicType(lldb.eBasicTypeLongLong)
+            return self._value_from_bytes(
+                raw, self._types.find(lldb.eBasicTypeLongLong)
             )
         elif ty == QCborValueType.ByteArray or ty == QCborValueType.String:
-            offset = self._process.ReadPointerFromMemory(element_ptr, err)
-            if err.Fail():
-                return
-            size = self._process.ReadPointerFromMemory(self._data_ptr + offset, err)
-            if err.Fail():
+            offset = value
+            size = self._string_size(offset)
+            if size is None:
                 return
             if flags & QtCborElementValueFlag.StringIsUtf16:
-                ty = self._target.GetBasicType(lldb.eBasicTypeChar16).GetArrayType(
-                    size // 2
-                )
+                ty = self._types.array(lldb.eBasicTypeChar16, size // 2)
             else:
-                ty = self._target.GetBasicType(lldb.eBasicTypeChar).GetArrayType(size)
+                ty = self._types.array(lldb.eBasicTypeChar, size)
             addr = self._data_ptr + offset + self._pointer_size
             if size == 0:
                 # Use fixed data for an empty string.
@@ -1198,30 +1792,22 @@ class _CborContainerSyntheticProviderBase:
                 data.SetData(SBError(), b"\0\0", lldb.eByteOrderLittle, 8)
                 v = self._valobj.CreateValueFromData("", data, ty)
             else:
-                if (
-                    flags & QtCborElementValueFlag.StringIsUtf16
-                    and not UNICODE_STR_ARRAY_IS_LIMITED
-                ):
-                    s = self._process.ReadMemory(addr, size, SBError()) or bytes()
-                    try:
-                        s = s.decode("utf-16le").encode("utf-8")
-                    except BaseException as _:
-                        pass
-                    data = SBData()
-                    data.SetData(SBError(), s, lldb.eByteOrderLittle, 8)
-                    ty = self._target.GetBasicType(lldb.eBasicTypeChar).GetArrayType(
-                        len(s)
-                    )
-                    v = self._valobj.CreateValueFromData("", data, ty)
+                if flags & QtCborElementValueFlag.StringIsUtf16:
+                    made = _utf16_value(self._valobj, addr, size // 2)
                 else:
-                    v = self._valobj.CreateValueFromAddress("", addr, ty)
+                    made = char_array_value(self._valobj, addr, size)
+                if made is None:
+                    return None
+                v = made[0]
             return v
         elif ty == QCborValueType.Array:
             return self._valobj.CreateValueFromAddress(
-                "", element_ptr, self._array_ty()
+                "", element_ptr, self._types.find(("QJsonArray", "QCborArray"))
             )
         elif ty == QCborValueType.Map:
-            return self._valobj.CreateValueFromAddress("", element_ptr, self._map_ty())
+            return self._valobj.CreateValueFromAddress(
+                "", element_ptr, self._types.find(("QJsonObject", "QCborMap"))
+            )
         elif ty == QCborValueType.Tag:
             return _valobj_from_str(self._valobj, "Unsupported Tag")
         elif ty == QCborValueType.CFalse:
@@ -1232,15 +1818,19 @@ class _CborContainerSyntheticProviderBase:
             data = SBData()
             # Fixed buffer that contains a null value.
             data.SetData(SBError(), QCBORVALUE_NULL, lldb.eByteOrderLittle, 8)
-            return self._valobj.CreateValueFromData("", data, self._qcborval_ty())
+            return self._valobj.CreateValueFromData(
+                "", data, self._types.find(("QCborValue", "QJsonValue"))
+            )
         elif ty == QCborValueType.Undefined:
             data = SBData()
             # Fixed buffer that contains an undefined value.
             data.SetData(SBError(), QCBORVALUE_UNDEFINED, lldb.eByteOrderLittle, 8)
-            return self._valobj.CreateValueFromData("", data, self._qcborval_ty())
+            return self._valobj.CreateValueFromData(
+                "", data, self._types.find(("QCborValue", "QJsonValue"))
+            )
         elif ty == QCborValueType.Double:
-            return self._valobj.CreateValueFromAddress(
-                "", element_ptr, self._target.GetBasicType(lldb.eBasicTypeDouble)
+            return self._value_from_bytes(
+                raw, self._types.find(lldb.eBasicTypeDouble)
             )
         elif ty == QCborValueType.DateTime:
             return _valobj_from_str(self._valobj, "Unsupported DateTime")
@@ -1255,6 +1845,8 @@ class _CborContainerSyntheticProviderBase:
 
     def update(self):
         self._size = 0
+        self._window = None
+        self._string_sizes.clear()
         # Always get the first child to make sure we cast the pointer.
         # The pointer is wrapped in a struct, but we might not have debug info for that struct.
         vo = self._valobj
@@ -1275,29 +1867,24 @@ class _CborContainerSyntheticProviderBase:
         # Find the data pointer (pointer to the string data)
         # `data` is at offset sizeof(qsizetype)
         barray: SBValue = self._valobj.CreateValueFromAddress(
-            "", st_ptr + self._pointer_size, self._barray_ty()
+            "", st_ptr + self._pointer_size, self._types.find("QByteArray")
         ).GetNonSyntheticValue()
-        self._data_ptr = (
-            barray.GetChildMemberWithName("d")
-            .GetChildMemberWithName("ptr")
-            .GetValueAsAddress()
-        )
+        barray_d = barray.GetChildMemberWithName("d")
+        self._data_ptr = barray_d.GetChildMemberWithName("ptr").GetValueAsAddress()
+        self._data_size = barray_d.GetChildMemberWithName("size").GetValueAsUnsigned()
 
         # Find the element count and the element data
-        error = SBError()
-        self._size = self._process.ReadPointerFromMemory(
-            st_ptr + offsetof_qcborvalue_elements + offsetof_qarrdata_size, error
+        mem = memory_cache(self._process)
+        size = mem.read_pointer(
+            st_ptr + offsetof_qcborvalue_elements + offsetof_qarrdata_size
         )
-        if error.Fail():
-            self._size = 0
-            return False
-
-        self._elements_ptr = self._process.ReadPointerFromMemory(
-            st_ptr + offsetof_qcborvalue_elements + offsetof_qarrdata_ptr, error
+        elements_ptr = mem.read_pointer(
+            st_ptr + offsetof_qcborvalue_elements + offsetof_qarrdata_ptr
         )
-        if error.Fail():
-            self._size = 0
+        if size is None or elements_ptr is None:
             return False
+        self._size = size
+        self._elements_ptr = elements_ptr
 
         return False
 
@@ -1312,8 +1899,7 @@ class QCborValueSyntheticProvider:
     def __init__(self, valobj: SBValue, internal_dict):
         self._valobj = valobj
         self._target: SBTarget = valobj.GetTarget()
-        self._arr_ty = LazyType(self._target, ("QJsonArray", "QCborArray"))
-        self._map_ty = LazyType(self._target, ("QJsonObject", "QCborMap"))
+        self._types = target_types(self._target)
         self._forwarder: Optional[SBValue] = None
         self._synth_val: Optional[SBValue] = None
         self._ty = QCborValueType.Undefined
@@ -1347,7 +1933,7 @@ class QCborValueSyntheticProvider:
     def _make_forwarder_array(self) -> SBValue:
         self._forwarder = (
             self._valobj.GetChildMemberWithName("container")
-            .Cast(self._arr_ty())
+            .Cast(self._types.find(("QJsonArray", "QCborArray")))
             .GetSyntheticValue()
         )
         return self._forwarder  # type: ignore
@@ -1355,7 +1941,7 @@ class QCborValueSyntheticProvider:
     def _make_forwarder_map(self) -> SBValue:
         self._forwarder = (
             self._valobj.GetChildMemberWithName("container")
-            .Cast(self._map_ty())
+            .Cast(self._types.find(("QJsonObject", "QCborMap")))
             .GetSyntheticValue()
         )
         return self._forwarder  # type: ignore
@@ -1375,7 +1961,7 @@ class QCborValueSyntheticProvider:
                 # If the index doesn't exist, it's an empty string.
                 data = SBData()
                 data.SetData(SBError(), b"\0", lldb.eByteOrderLittle, 8)
-                ty = self._target.GetBasicType(lldb.eBasicTypeChar).GetArrayType(0)
+                ty = self._types.array(lldb.eBasicTypeChar, 0)
                 self._synth_val = self._valobj.CreateValueFromData("", data, ty)
         elif self._ty == QCborValueType.Array:
             self._make_forwarder_array()
@@ -1397,12 +1983,81 @@ class QCborValueSyntheticProvider:
 
 
 class QCborMapSyntheticProvider(_CborContainerSyntheticProviderBase):
+    ELEMENTS_PER_CHILD = 2
+    KEY_CHUNK = 4096
+    """Number of elements that are read at once when indexing the keys."""
+
     def __init__(self, valobj: SBValue, internal_dict):
         super().__init__(valobj, internal_dict)
+        self._keys: Optional[dict[str, int]] = None
+        """Child index by key, built on the first lookup by name."""
+
+    def update(self):
+        self._keys = None
+        return super().update()
 
     def num_children(self):
         return super().num_children() // 2
 
+    def get_child_index(self, name: str):
+        idx = _numeric_index(name)
+        if idx is not None:
+            return idx
+        # obj["key"]
+        key = name.removeprefix("[").removesuffix("]")
+        if key.startswith('u"'):
+            key = key[1:]
+        return self.key_index(_unquote(key))
+
+    def key_index(self, key: str) -> Optional[int]:
+        """Get the index of the child with the string key `key`."""
+        if self._keys is None:
+            self._keys = self._index_keys()
+        return self._keys.get(key)
+
+    def _index_keys(self) -> dict[str, int]:
+        keys: dict[str, int] = {}
+        mem = memory_cache(self._process)
+        for start in range(0, self._size, self.KEY_CHUNK):
+            _, data, elements = self._read_window(
+                start, min(self.KEY_CHUNK, self._size - start)
+            )
+            if data is None:
+                break
+            # (child index, offset in `data`, size, flags) of the string keys
+            strings = []
+            for i, (value, ty, flags) in enumerate(elements[::2]):
+                if ty != QCborValueType.String and ty != QCborValueType.ByteArray:
+                    continue
+                size = self._string_size(value)
+                if size is not None:
+                    strings.append((start // 2 + i, value, size, flags))
+            if not strings:
+                continue
+
+            # Read all keys of the chunk at once if they're close together.
+            lo = min(off for _, off, _, _ in strings)
+            hi = max(off + self._pointer_size + size for _, off, size, _ in strings)
+            buf = None
+            if hi - lo <= _CBOR_MAX_HEADER_SPAN:
+                buf = mem.read(self._data_ptr + lo, hi - lo)
+                if buf is not None and len(buf) != hi - lo:
+                    buf = None
+            for idx, off, size, flags in strings:
+                addr = off + self._pointer_size
+                if buf is not None:
+                    raw = buf[addr - lo : addr - lo + size]
+                else:
+                    raw = mem.read(self._data_ptr + addr, size)
+                    if raw is None:
+                        continue
+                if flags & QtCborElementValueFlag.StringIsUtf16:
+                    key = raw.decode("utf-16le", errors="replace")
+                else:
+                    key = raw.decode("utf-8", errors="replace")
+                keys.setdefault(key, idx)
+        return keys
+
     def get_child_at_index(self, idx: int):
         key = self.value_at_index(idx * 2)
         val = self.value_at_index(idx * 2 + 1)
@@ -1425,6 +2080,118 @@ class QCborArraySyntheticProvider(_CborContainerSyntheticProviderBase):
         return val.Clone(f"[{idx}]")
 
 
+class JsonGetCommand:
+    def __init__(self, debugger: SBDebugger, internal_dict):
+        self._parser = CommandParser(
+            prog="qt json-get",
+            description=(
+                "Get the value at a JSON pointer (e.g. /servers/0/name) in a "
+                "QJsonDocument, QJsonValue, QJsonObject, QJsonArray or their "
+                "QCbor counterparts. Only the keys and elements on the path are read."
+            ),
+        )
+        self._parser.add_argument(
+            "value", help="variable path or expression of the document"
+        )
+        self._parser.add_argument("pointer", help="JSON pointer to the value")
+
+    def get_short_help(self):
+        return "Get a value in a JSON document by its JSON pointer."
+
+    def get_long_help(self):
+        return self._parser.format_help()
+
+    def __call__(
+        self,
+        debugger: SBDebugger,
+        command: str,
+        exe_ctx: lldb.SBExecutionContext,
+        result: lldb.SBCommandReturnObject,
+    ):
+        try:
+            args = self._parser.parse_args(shlex.split(command))
+            value = evaluate_value(exe_ctx, args.value)
+            found = _json_get(value.GetNonSyntheticValue(), args.pointer)
+        except ValueError as e:
+            result.SetError(str(e))
+            return
+        result.AppendMessage(str(found.Clone(args.pointer)).rstrip())
+
+
+def _json_pointer(pointer: str) -> list[str]:
+    if not pointer:
+        return []
+    if not pointer.startswith("/"):
+        raise ValueError(f"'{pointer}' is not a JSON pointer (it must start with /)")
+    return [
+        token.replace("~1", "/").replace("~0", "~")
+        for token in pointer[1:].split("/")
+    ]
+
+
+def _json_get(value: SBValue, pointer: str) -> SBValue:
+    """Find the value at the JSON pointer `pointer` in `value`.
+
+    Maps and arrays are decoded by the container providers, but only the
+    elements on the path (and the keys of maps on the path) are read. Raises
+    `ValueError` if the path doesn't exist.
+    """
+    types = target_types(value.target)
+    node = _json_node(value, types)
+    path = ""
+    for token in _json_pointer(pointer):
+        node = node.GetNonSyntheticValue()
+        name = node.GetType().GetUnqualifiedType().GetCanonicalType().GetName()
+        if name in ("QJsonObject", "QCborMap"):
+            provider = QCborMapSyntheticProvider(node, {})
+            provider.update()
+            idx = provider.key_index(token)
+            if idx is None:
+                raise ValueError(f"{path or '/'} has no key '{token}'")
+            child = provider.value_at_index(idx * 2 + 1, windowed=False)
+        elif name in ("QJsonArray", "QCborArray"):
+            provider = QCborArraySyntheticProvider(node, {})
+            provider.update()
+            idx = _numeric_index(token)
+            if idx is None or not 0 <= idx < provider.num_children():
+                raise ValueError(f"{path or '/'} has no index '{token}'")
+            child = provider.value_at_index(idx, windowed=False)
+        else:
+            raise ValueError(f"{path or '/'} is neither an object nor an array")
+        if child is None:
+            raise ValueError(f"can't read {path}/{token}")
+        node = child
+        path += "/" + token
+    synthetic = node.GetSyntheticValue()
+    return synthetic if synthetic.IsValid() else node
+
+
+def _json_node(value: SBValue, types: TypeRegistry) -> SBValue:
+    """Get the object, array or value in a JSON document or value."""
+    name = value.GetType().GetUnqualifiedType().GetCanonicalType().GetName()
+    if name == "QJsonDocument":
+        d_ptr = value.GetChildAtIndex(0).Cast(types.pointer("QCborValue"))
+        if d_ptr.GetValueAsAddress() == 0:
+            raise ValueError("the document is empty")
+        value = d_ptr.Dereference()
+        name = "QCborValue"
+    if name == "QJsonValue":
+        value = value.GetChildAtIndex(0)
+        name = "QCborValue"
+    if name != "QCborValue":
+        if name not in ("QJsonObject", "QCborMap", "QJsonArray", "QCborArray"):
+            raise ValueError(f"{name} is not a JSON or CBOR type")
+        return value
+    ty = value.GetChildMemberWithName("t").GetValueAsUnsigned()
+    container = value.GetChildMemberWithName("container")
+    if ty == QCborValueType.Array:
+        return container.Cast(types.find(("QJsonArray", "QCborArray")))
+    if ty == QCborValueType.Map:
+        return container.Cast(types.find(("QJsonObject", "QCborMap")))
+    synthetic = value.GetSyntheticValue()
+    return synthetic if synthetic.IsValid() else value
+
+
 class QJsonValueSyntheticProvider(_ExpandingSyntheticProvider):
     def __init__(self, valobj: SBValue, internal_dict):
         super().__init__(valobj, internal_dict)
@@ -1500,24 +2267,11 @@ class QVariantType:
     BFloat16 = 62
     Float16 = 63
 
-    _is_init = False
 
-    @staticmethod
-    def enusure_init(tgt: SBTarget):
-        if QVariantType._is_init:
-            return
-        QVariantType._is_init = True
-        ty: SBType = tgt.FindFirstType("QMetaType::Type")
-        if not ty:
-            print("Failed to find QMetaType::Type")
-            return
-        members: lldb.SBTypeEnumMemberList = ty.GetEnumMembers()
-        for i in range(members.GetSize()):
-            member: lldb.SBTypeEnumMember = members.GetTypeEnumMemberAtIndex(i)
-            n: str = member.GetName()
-            v = member.GetValueAsUnsigned()
-            if not n.startswith("_") and n != "ensure_init":
-                setattr(QVariantType, n, v)
+def _meta_type_ids(target: SBTarget) -> dict[str, int]:
+    """Values of `QMetaType::Type` in `target` (falling back to `QVariantType`)."""
+    defaults = {k: v for k, v in vars(QVariantType).items() if not k.startswith("_")}
+    return enum_values(target, "QMetaType::Type", defaults)
 
 
 class QVariantFlag:
@@ -1574,11 +2328,7 @@ class QVariantSyntheticProvider:
         self._ty = QCborValueType.Undefined
         self._type = QVariantType.Unknown
         self._type_obj: Optional[SBValue] = None
-        self._ty_interface = self._target.FindFirstType("QtPrivate::QMetaTypeInterface")
-        self._char_arr_ty = self._target.GetBasicType(lldb.eBasicTypeChar).GetArrayType(
-            0
-        )
-        QVariantType.enusure_init(self._target)
+        self._types = target_types(self._target)
 
     def num_children(self):
         return 2
@@ -1623,134 +2373,152 @@ class QVariantSyntheticProvider:
             data_addr = data_union.GetChildMemberWithName("data").GetLoadAddress()
 
         ty_addr = d.GetChildMemberWithName("packedType").GetValueAsUnsigned() << 2
-        ty_intf: SBValue = self._valobj.CreateValueFromAddress(
-            "", ty_addr, self._ty_interface
-        )
-        self._type_obj = (
-            ty_intf.GetChildMemberWithName("name")
-            .Dereference()
-            .Cast(self._char_arr_ty)
-            .Clone("[Type]")
-        )
-        self._type_obj.SetFormat(lldb.eFormatCharArray)  # type: ignore
-        self._type = (
-            ty_intf.GetChildMemberWithName("typeId")
-            .GetSyntheticValue()
-            .GetValueAsUnsigned()
+        meta = _qmetatype(self._process, ty_addr)
+        if meta is None:
+            return
+        self._type = meta.type_id
+        name = meta.name.encode("utf-8")
+        data = SBData()
+        data.SetData(SBError(), name or b"\0", lldb.eByteOrderLittle, 8)
+        self._type_obj = self._valobj.CreateValueFromData(
+            "[Type]", data, self._types.array(lldb.eBasicTypeChar, len(name))
         )
-        flags = ty_intf.GetChildMemberWithName("flags").GetValueAsUnsigned()
-        ty = self._lookup_type(self._type, flags, self._type_obj)  # type: ignore
+        ty = None
+        if meta.spec is not None:
+            if meta.is_pointer:
+                ty = self._types.pointer(meta.spec)
+            else:
+                ty = self._types.find(meta.spec)
         if ty:
             self._value_obj = self._valobj.CreateValueFromAddress(
                 "[Value]", data_addr, ty
             )
         else:
             # Hacky workaround to get a void* here.
-            char = self._target.GetBasicType(lldb.eBasicTypeChar)
-            void = self._target.GetBasicType(lldb.eBasicTypeVoid)
+            char = self._types.find(lldb.eBasicTypeChar)
             self._value_obj = (
                 self._valobj.CreateValueFromAddress("", data_addr, char)
                 .AddressOf()
-                .Cast(void.GetPointerType())
+                .Cast(self._types.pointer(lldb.eBasicTypeVoid))
                 .Clone("[Value]")
             )
 
     def get_value(self):
         return self._value_obj
 
-    def _lookup_type(self, id: int, flags: int, name_obj: SBValue):
-        if id == QVariantType.Unknown:
-            return None
-        elif id == QVariantType.Bool:
-            return self._target.GetBasicType(lldb.eBasicTypeBool)
-        elif id == QVariantType.Int:
-            return self._target.GetBasicType(lldb.eBasicTypeInt)
-        elif id == QVariantType.UInt:
-            return self._target.GetBasicType(lldb.eBasicTypeUnsignedInt)
-        elif id == QVariantType.LongLong:
-            return self._target.GetBasicType(lldb.eBasicTypeLongLong)
-        elif id == QVariantType.ULongLong:
-            return self._target.GetBasicType(lldb.eBasicTypeUnsignedLongLong)
-        elif id == QVariantType.Double:
-            return self._target.GetBasicType(lldb.eBasicTypeDouble)
-        elif id == QVariantType.Long:
-            return self._target.GetBasicType(lldb.eBasicTypeLong)
-        elif id == QVariantType.Short:
-            return self._target.GetBasicType(lldb.eBasicTypeShort)
-        elif id == QVariantType.Char:
-            return self._target.GetBasicType(lldb.eBasicTypeChar)
-        elif id == QVariantType.ULong:
-            return self._target.GetBasicType(lldb.eBasicTypeUnsignedLong)
-        elif id == QVariantType.UShort:
-            return self._target.GetBasicType(lldb.eBasicTypeUnsignedShort)
-        elif id == QVariantType.UChar:
-            return self._target.GetBasicType(lldb.eBasicTypeUnsignedChar)
-        elif id == QVariantType.Float:
-            return self._target.GetBasicType(lldb.eBasicTypeFloat)
-        elif id == QVariantType.VoidStar:
-            return self._target.GetBasicType(lldb.eBasicTypeVoid).GetPointerType()
-        elif id == QVariantType.QStringList:
-            return self._target.FindFirstType("QList<QString>")
-        elif id == QVariantType.QVariant:
-            return self._valobj.GetType()
-        elif id == QVariantType.QByteArrayList:
-            return self._target.FindFirstType("QList<QByteArray>")
-        elif id == QVariantType.QObjectStar:
-            return self._target.FindFirstType("QObject").GetPointerType()
-        elif id == QVariantType.SChar:
-            return self._target.GetBasicType(lldb.eBasicTypeSignedChar)
-        elif id == QVariantType.Void:
-            return self._target.GetBasicType(lldb.eBasicTypeVoid)
-        elif id == QVariantType.Nullptr:
-            return self._target.GetBasicType(lldb.eBasicTypeNullPtr)
-        elif id == QVariantType.QVariantMap:
-            # Sometimes it's with a space and sometimes without
-            return self._target.FindFirstType(
-                "QMap<QString, QVariant>"
-            ) or self._target.FindFirstType("QMap<QString,QVariant>")
-        elif id == QVariantType.QVariantList:
-            return self._target.FindFirstType("QList<QVariant>")
-        elif id == QVariantType.QVariantHash:
-            # Sometimes it's with a space and sometimes without
-            return self._target.FindFirstType(
-                "QHash<QString, QVariant>"
-            ) or self._target.FindFirstType("QHash<QString,QVariant>")
-        elif id == QVariantType.QVariantPair:
-            return self._target.FindFirstType("QPair<QVariant>")
-        elif id == QVariantType.Char16:
-            return self._target.GetBasicType(lldb.eBasicTypeChar16)
-        elif id == QVariantType.Char32:
-            return self._target.GetBasicType(lldb.eBasicTypeChar32)
-        elif id == QVariantType.Int128:
-            return self._target.GetBasicType(lldb.eBasicTypeInt128)
-        elif id == QVariantType.UInt128:
-            return self._target.GetBasicType(lldb.eBasicTypeUnsignedInt128)
-        elif id == QVariantType.Float128:
-            return self._target.GetBasicType(lldb.eBasicTypeFloat128)
-        elif id == QVariantType.BFloat16:
-            pass
-        elif id == QVariantType.Float16:
-            pass
-        # Lookup the type by name
-        name_addr = name_obj.GetLoadAddress()
-        proc: SBProcess = self._target.GetProcess()
-        err = SBError()
-        name: str = proc.ReadCStringFromMemory(name_addr, 2048, err)
-        if err.Fail():
-            return None
-        is_pointer = flags & QVariantFlag.IsPointer
-        is_const = flags & QVariantFlag.IsConst
-        if is_pointer:
-            name = name.removesuffix("*")
-        if is_const:
-            name.removeprefix("const")
-        name = name.strip()
-        ty = self._target.FindFirstType(name)
-        if not ty:
-            return None
-        if is_pointer:
-            ty = ty.GetPointerType()
-        return ty
+
+class _QMetaType(NamedTuple):
+    """A `QMetaTypeInterface` and the type of the values it describes."""
+
+    type_id: int
+    name: str
+    spec: Optional[TypeSpec]
+    """The value type (or its pointee if `is_pointer`), `None` if it's unknown."""
+    is_pointer: bool
+
+
+_QMETATYPE_INTERFACE_FIELDS = (
+    ("flags", "flags", "I"),
+    ("type_id", "typeId", "i"),
+    ("name", "name", "P"),
+)
+# offsetof(QtPrivate::QMetaTypeInterface, ...) on 32-bit and 64-bit targets
+_QMETATYPE_INTERFACE_OFFSETS = {4: (8, 12, 20), 8: (8, 12, 24)}
+
+
+def _qmetatype(process: SBProcess, addr: int) -> Optional[_QMetaType]:
+    """Get the (cached) meta type of the `QMetaTypeInterface` at `addr`.
+
+    Interfaces are static, so they're only read once per process.
+    """
+    cache = process_local(process, "qmetatypes", dict)
+    meta = cache.get(addr)
+    if meta is None:
+        meta = _read_qmetatype(process, addr)
+        if meta is not None:
+            cache[addr] = meta
+    return meta
+
+
+def _read_qmetatype(process: SBProcess, addr: int) -> Optional[_QMetaType]:
+    layout = struct_layout(
+        process.GetTarget(),
+        "QtPrivate::QMetaTypeInterface",
+        _QMETATYPE_INTERFACE_FIELDS,
+        _QMETATYPE_INTERFACE_OFFSETS,
+    )
+    if layout is None:
+        return None
+    iface = layout.read(process, addr)
+    if iface is None:
+        return None
+    err = SBError()
+    name: str = process.ReadCStringFromMemory(iface.name, 2048, err)
+    if err.Fail():
+        return None
+    if iface.type_id == QVariantType.Unknown:
+        return _QMetaType(iface.type_id, name, None, False)
+    builtin = _builtin_meta_types(process.GetTarget()).get(iface.type_id)
+    if builtin is not None:
+        return _QMetaType(iface.type_id, name, *builtin)
+
+    # Lookup the type by name
+    is_pointer = bool(iface.flags & QVariantFlag.IsPointer)
+    spec = name
+    if is_pointer:
+        spec = spec.removesuffix("*")
+    if iface.flags & QVariantFlag.IsConst:
+        spec = spec.removeprefix("const")
+    return _QMetaType(iface.type_id, name, spec.strip(), is_pointer)
+
+
+_BUILTIN_META_TYPES: dict[str, tuple[TypeSpec, bool]] = {
+    "Bool": (lldb.eBasicTypeBool, False),
+    "Int": (lldb.eBasicTypeInt, False),
+    "UInt": (lldb.eBasicTypeUnsignedInt, False),
+    "LongLong": (lldb.eBasicTypeLongLong, False),
+    "ULongLong": (lldb.eBasicTypeUnsignedLongLong, False),
+    "Double": (lldb.eBasicTypeDouble, False),
+    "Long": (lldb.eBasicTypeLong, False),
+    "Short": (lldb.eBasicTypeShort, False),
+    "Char": (lldb.eBasicTypeChar, False),
+    "ULong": (lldb.eBasicTypeUnsignedLong, False),
+    "UShort": (lldb.eBasicTypeUnsignedShort, False),
+    "UChar": (lldb.eBasicTypeUnsignedChar, False),
+    "Float": (lldb.eBasicTypeFloat, False),
+    "VoidStar": (lldb.eBasicTypeVoid, True),
+    "QStringList": ("QList<QString>", False),
+    "QVariant": ("QVariant", False),
+    "QByteArrayList": ("QList<QByteArray>", False),
+    "QObjectStar": ("QObject", True),
+    "SChar": (lldb.eBasicTypeSignedChar, False),
+    "Void": (lldb.eBasicTypeVoid, False),
+    "Nullptr": (lldb.eBasicTypeNullPtr, False),
+    # Sometimes it's with a space and sometimes without
+    "QVariantMap": (
+        ("QMap<QString, QVariant>", "QMap<QString,QVariant>"),
+        False,
+    ),
+    "QVariantList": ("QList<QVariant>", False),
+    "QVariantHash": (
+        ("QHash<QString, QVariant>", "QHash<QString,QVariant>"),
+        False,
+    ),
+    "QVariantPair": ("QPair<QVariant>", False),
+    "Char16": (lldb.eBasicTypeChar16, False),
+    "Char32": (lldb.eBasicTypeChar32, False),
+    "Int128": (lldb.eBasicTypeInt128, False),
+    "UInt128": (lldb.eBasicTypeUnsignedInt128, False),
+    "Float128": (lldb.eBasicTypeFloat128, False),
+    # BFloat16 and Float16 are looked up by name
+}
+"""Types of builtin `QMetaType::Type`s as `(type, is_pointer)`."""
+
+
+def _builtin_meta_types(target: SBTarget) -> dict[int, tuple[TypeSpec, bool]]:
+    return enum_table(
+        target, "QMetaType::Type", _meta_type_ids(target), _BUILTIN_META_TYPES
+    )
 
 
 def QDirSummaryProvider(
@@ -1770,10 +2538,11 @@ class QDirSyntheticProvider:
         self._target: SBTarget = valobj.GetTarget()
         self._d_ptr: Optional[SBValue] = None
         self._name_val: Optional[SBValue] = None
-        self._qstring_ty = self._target.FindFirstType("QString")
-        self._qdirp_ty = self._target.FindFirstType("QDirPrivate").GetPointerType()
+        types = target_types(self._target)
+        self._qstring_ty = types.find("QString")
+        self._qdirp_ty = types.pointer("QDirPrivate")
         self._has_priv = bool(self._qdirp_ty)
-        self._void_ptr = self._target.GetBasicType(lldb.eBasicTypeVoid).GetPointerType()
+        self._void_ptr = types.pointer(lldb.eBasicTypeVoid)
         self._is_64bit = self._target.GetAddressByteSize() == 8
 
     def num_children(self):
@@ -1831,10 +2600,11 @@ class QFileSyntheticProvider:
         self._process: SBProcess = valobj.GetProcess()
         self._d_ptr: Optional[SBValue] = None
         self._name_val: Optional[SBValue] = None
-        self._qstring_ty = self._target.FindFirstType("QString")
-        self._qfilep_ty = self._target.FindFirstType("QFilePrivate")
+        types = target_types(self._target)
+        self._qstring_ty = types.find("QString")
+        self._qfilep_ty = types.find("QFilePrivate")
         self._has_priv = bool(self._qfilep_ty)
-        self._void_ptr = self._target.GetBasicType(lldb.eBasicTypeVoid).GetPointerType()
+        self._void_ptr = types.pointer(lldb.eBasicTypeVoid)
         self._addr_bytes = self._target.GetAddressByteSize()
 
     def num_children(self):
@@ -1895,10 +2665,11 @@ class QFileInfoSyntheticProvider:
         self._target: SBTarget = valobj.GetTarget()
         self._d_ptr: Optional[SBValue] = None
         self._name_val: Optional[SBValue] = None
-        self._qstring_ty = self._target.FindFirstType("QString")
-        self._qfip_ty = self._target.FindFirstType("QFileInfoPrivate").GetPointerType()
+        types = target_types(self._target)
+        self._qstring_ty = types.find("QString")
+        self._qfip_ty = types.pointer("QFileInfoPrivate")
         self._has_priv = bool(self._qfip_ty)
-        self._void_ptr = self._target.GetBasicType(lldb.eBasicTypeVoid).GetPointerType()
+        self._void_ptr = types.pointer(lldb.eBasicTypeVoid)
         self._is_64bit = self._target.GetAddressByteSize() == 8
 
     def num_children(self):
@@ -2037,9 +2808,10 @@ class QHostAddressSyntheticProvider:
         self._valobj = valobj
         tgt = self._valobj.GetTarget()
         self._process: SBProcess = valobj.GetProcess()
-        self._void_ptr = tgt.GetBasicType(lldb.eBasicTypeVoid).GetPointerType()
-        self._proto_ty = tgt.FindFirstType("QAbstractSocket::NetworkLayerProtocol")
-        self._qstring_ty = tgt.FindFirstType("QString")
+        types = target_types(tgt)
+        self._void_ptr = types.pointer(lldb.eBasicTypeVoid)
+        self._proto_ty = types.find("QAbstractSocket::NetworkLayerProtocol")
+        self._qstring_ty = types.find("QString")
         self._scope_id = None
         self._proto = None
 
@@ -2084,6 +2856,19 @@ def QImageSummaryProvider(
     return f"{w}x{h}"
 
 
+_QIMAGEDATA_FIELDS = (
+    ("width", "width", "i"),
+    ("height", "height", "i"),
+    ("nbytes", "nbytes", "q"),
+    ("dpr", "devicePixelRatio", "d"),
+    ("data", "data", "P"),
+    ("format", "format", "I"),
+    ("bytes_per_line", "bytes_per_line", "q"),
+)
+# offsetof(QImageData, ...) on 64-bit targets
+_QIMAGEDATA_OFFSETS_64 = (4, 8, 16, 24, 56, 64, 72)
+
+
 class QImageSyntheticProvider:
     WIDTH_INDEX = 0
     HEIGHT_INDEX = 1
@@ -2097,12 +2882,11 @@ class QImageSyntheticProvider:
         self._valobj = valobj
         self._target = self._valobj.GetTarget()
         self._process: SBProcess = valobj.GetProcess()
-        self._int = self._target.GetBasicType(lldb.eBasicTypeInt)
-        self._format_ty = self._target.FindFirstType("QImage::Format")
-        self._uchar_ptr = self._target.GetBasicType(
-            lldb.eBasicTypeUnsignedChar
-        ).GetPointerType()
-        self._priv_ty = self._target.FindFirstType("QImageData").GetPointerType()
+        self._types = target_types(self._target)
+        self._int = self._types.find(lldb.eBasicTypeInt)
+        self._format_ty = self._types.find("QImage::Format")
+        self._uchar_ptr = self._types.pointer(lldb.eBasicTypeUnsignedChar)
+        self._priv_ty = self._types.pointer("QImageData")
         self._has_priv = bool(self._priv_ty)
         self._is_64bit = self._target.GetAddressByteSize() == 8
 
@@ -2192,54 +2976,80 @@ class QImageSyntheticProvider:
                 "[DevicePixelRatio]"
             )
         elif self._is_64bit:
-            width_off = 4  # offsetof(QImageData, width)
-            height_off = 8  # offsetof(QImageData, height)
-            nbytes_off = 16  # offsetof(QImageData, nbytes)
-            dpr_off = 24  # offsetof(QImageData, devicePixelRatio)
-            data_off = 56  # offsetof(QImageData, data)
-            format_off = 64  # offsetof(QImageData, format)
-            stride_off = 72  # offsetof(QImageData, bytes_per_line)
-
-            qsizetype = self._target.GetBasicType(lldb.eBasicTypeLongLong)
-            uchar_ptr = self._target.GetBasicType(
-                lldb.eBasicTypeUnsignedChar
-            ).GetPointerType()
-            self._width = self._valobj.CreateValueFromAddress(
-                "[Width]", d_addr + width_off, self._int
-            )
-            self._height = self._valobj.CreateValueFromAddress(
-                "[Height]", d_addr + height_off, self._int
-            )
-            self._n_bytes = self._valobj.CreateValueFromAddress(
-                "[ByteSize]",
-                d_addr + nbytes_off,
-                qsizetype,
-            )
-            self._dpr = self._valobj.CreateValueFromAddress(
-                "[DevicePixelRatio]",
-                d_addr + dpr_off,
-                self._target.GetBasicType(lldb.eBasicTypeDouble),
-            )
-            self._data = self._valobj.CreateValueFromAddress(
-                "[Data]",
-                d_addr + data_off,
-                uchar_ptr,
-            )
-            self._format = self._valobj.CreateValueFromAddress(
-                "[Format]", d_addr + format_off, self._format_ty
-            )
-            self._stride = self._valobj.CreateValueFromAddress(
-                "[Stride]", d_addr + stride_off, qsizetype
+            layout = struct_layout(
+                self._target,
+                "QImageData",
+                _QIMAGEDATA_FIELDS,
+                {8: _QIMAGEDATA_OFFSETS_64},
             )
+            if layout is None:
+                return
+            data = layout.read_bytes(self._process, d_addr)
+            if data is None:
+                return
+
+            qsizetype = self._types.find(lldb.eBasicTypeLongLong)
+            double = self._types.find(lldb.eBasicTypeDouble)
+
+            def value(field: str, name: str, ty: SBType):
+                return layout.value(self._valobj, data, field, name, ty)
+
+            self._width = value("width", "[Width]", self._int)
+            self._height = value("height", "[Height]", self._int)
+            self._n_bytes = value("nbytes", "[ByteSize]", qsizetype)
+            self._dpr = value("dpr", "[DevicePixelRatio]", double)
+            self._data = value("data", "[Data]", self._uchar_ptr)
+            self._format = value("format", "[Format]", self._format_ty)
+            self._stride = value("bytes_per_line", "[Stride]", qsizetype)
 
 
 def QObjectSummaryProvider(
     valobj: SBValue, internal_dict: dict, options: lldb.SBTypeSummaryOptions
 ) -> Optional[str]:
+    if valobj.TypeIsPointerType():
+        addr = valobj.GetValueAsAddress()
+    else:
+        addr = valobj.GetLoadAddress()
+    class_name = None
+    if addr and addr != lldb.LLDB_INVALID_ADDRESS:
+        class_name = _qobject_class_name(valobj.GetProcess(), addr)
+
     v = valobj.GetChildAtIndex(QObjectSyntheticProvider.NAME_INDEX)
-    if not v:
-        return ""
-    return v.GetSummary()
+    name = v.GetSummary() if v else None
+    # Skip empty names (u"" and u"" (null))
+    if name and name.lstrip("u").startswith('""'):
+        name = None
+    return " ".join(part for part in (class_name, name) if part)
+
+
+_QOBJECTPRIVATE_FIELDS = (
+    ("parent", "parent", "P"),
+    # XXX: This changes in Qt7 - [ptr, size, d]; Qt6: [d, ptr, size]
+    ("children_ptr", "children.d.ptr", "P"),
+    ("children_size", "children.d.size", "n"),
+    ("extra_data", "extraData", "P"),
+)
+# offsetof(QObjectPrivate, ...) on 64-bit targets
+_QOBJECTPRIVATE_OFFSETS_64 = (16, 32, 40, 80)
+
+_QOBJECT_EXTRADATA_FIELDS = (
+    ("name_ptr", "objectName.val.d.ptr", "P"),
+    ("name_size", "objectName.val.d.size", "n"),
+)
+# offsetof(QObjectPrivate::ExtraData, objectName.val.d.ptr/size) on 64-bit targets
+_QOBJECT_EXTRADATA_OFFSETS_64 = (104, 112)
+
+
+_QOBJECTLIST_NAMES = ("QList<QObject*>", "QList<QObject *>", "QObjectList")
+
+
+def _qobject_private_layout(target: SBTarget) -> Optional[StructLayout]:
+    return struct_layout(
+        target,
+        "QObjectPrivate",
+        _QOBJECTPRIVATE_FIELDS,
+        {8: _QOBJECTPRIVATE_OFFSETS_64},
+    )
 
 
 class QObjectSyntheticProvider:
@@ -2247,18 +3057,17 @@ class QObjectSyntheticProvider:
     NAME_INDEX = 1
     PROP_NAMES_INDEX = 2
     PROP_VALUES_INDEX = 3
+    CHILDREN_INDEX = 4
 
     def __init__(self, valobj: SBValue, internal_dict):
         self._valobj = valobj
         self._target = self._valobj.GetTarget()
         self._process: SBProcess = valobj.GetProcess()
-        self._void_ptr = self._target.GetBasicType(lldb.eBasicTypeVoid).GetPointerType()
+        self._types = target_types(self._target)
+        self._void_ptr = self._types.pointer(lldb.eBasicTypeVoid)
         self._qobj_ptr = self._valobj.GetType().GetPointerType()
-        self._qstr_ty = LazyType(self._target, "QString")
-        self._qbalist_ty = LazyType(self._target, "QList<QByteArray>")
-        self._qvlist_ty = LazyType(self._target, "QList<QVariant>")
 
-        self._qpriv = self._target.FindFirstType("QObjectPrivate")
+        self._qpriv = self._types.find("QObjectPrivate")
         self._has_priv = bool(self._qpriv)
         self._ptr_size = self._target.GetAddressByteSize()
 
@@ -2266,6 +3075,7 @@ class QObjectSyntheticProvider:
         self._parent = None
         self._prop_names = None
         self._prop_values = None
+        self._children = None
 
     def num_children(self):
         return 5
@@ -2280,6 +3090,8 @@ class QObjectSyntheticProvider:
             return self.PROP_NAMES_INDEX
         elif name == "PropertyValues":
             return self.PROP_VALUES_INDEX
+        elif name == "Children":
+            return self.CHILDREN_INDEX
 
     def get_child_at_index(self, idx: int):
         if idx == self.NAME_INDEX:
@@ -2290,6 +3102,8 @@ class QObjectSyntheticProvider:
             return self._prop_names
         elif idx == self.PROP_VALUES_INDEX:
             return self._prop_values
+        elif idx == self.CHILDREN_INDEX:
+            return self._children
 
     def has_children(self):
         return True
@@ -2299,6 +3113,7 @@ class QObjectSyntheticProvider:
         self._parent = None
         self._prop_names = None
         self._prop_values = None
+        self._children = None
 
         d_addr_addr = self._valobj.GetLoadAddress() + self._ptr_size  # skip vtable
         err = SBError()
@@ -2310,8 +3125,8 @@ class QObjectSyntheticProvider:
 
         if self._has_priv:
             d: SBValue = self._valobj.CreateValueFromAddress("", d_addr, self._qpriv)
-            # FIXME: Add children
             self._parent = d.GetChildMemberWithName("parent").Clone("[Parent]")
+            self._children = d.GetChildMemberWithName("children").Clone("[Children]")
             ed: SBValue = d.GetChildMemberWithName("extraData")
             if ed.GetValueAsAddress() != 0:
                 self._name = ed.GetChildMemberWithName("objectName").Clone("[Name]")
@@ -2323,30 +3138,297 @@ class QObjectSyntheticProvider:
                 )
             # pass
         elif self._ptr_size == 8:
-            parent_off = 16  # offsetof(QObjectPrivate, parent)
-            # children_off = 24  # offsetof(QObjectPrivate, children)
-            ed_off = 80  # offsetof(QObjectPrivate, extraData)
             obj_name_off = 96  # offsetof(QObjectPrivate::ExtraData, objectName)
             prop_names_off = 0  # offsetof(QObjectPrivate::ExtraData, propertyNames)
             prop_values_off = 24  # offsetof(QObjectPrivate::ExtraData, propertyValues)
 
-            self._parent = self._valobj.CreateValueFromAddress(
-                "[Parent]", d_addr + parent_off, self._qobj_ptr
+            layout = _qobject_private_layout(self._target)
+            if layout is None:
+                return
+            data = layout.read_bytes(self._process, d_addr)
+            if data is None:
+                return
+            self._parent = layout.value(
+                self._valobj, data, "parent", "[Parent]", self._qobj_ptr
             )
-            ed_addr = self._process.ReadPointerFromMemory(d_addr + ed_off, err)
-            if err.Fail() or ed_addr == 0:
+            # The list starts with its d pointer.
+            self._children = self._valobj.CreateValueFromAddress(
+                "[Children]",
+                d_addr + layout.offsets["children_ptr"] - self._ptr_size,
+                self._types.find(_QOBJECTLIST_NAMES),
+            )
+            ed_addr = layout.unpack(data).extra_data
+            if ed_addr == 0:
                 return
             self._name = self._valobj.CreateValueFromAddress(
-                "[Name]", ed_addr + obj_name_off, self._qstr_ty()
+                "[Name]", ed_addr + obj_name_off, self._types.find("QString")
             )
             self._prop_names = self._valobj.CreateValueFromAddress(
-                "[PropertyNames]", ed_addr + prop_names_off, self._qbalist_ty()
+                "[PropertyNames]",
+                ed_addr + prop_names_off,
+                self._types.find("QList<QByteArray>"),
             )
             self._prop_values = self._valobj.CreateValueFromAddress(
-                "[PropertyValues]", ed_addr + prop_values_off, self._qvlist_ty()
+                "[PropertyValues]",
+                ed_addr + prop_values_off,
+                self._types.find("QList<QVariant>"),
             )
 
 
+class ObjTreeCommand:
+    PROGRESS_INTERVAL = 1000
+    """Number of objects between progress updates."""
+
+    def __init__(self, debugger: SBDebugger, internal_dict):
+        self._parser = CommandParser(
+            prog="qt objtree",
+            description=(
+                "Print the QObject hierarchy below an object, level by level. "
+                "Objects are read directly from memory."
+            ),
+        )
+        self._parser.add_argument(
+            "-d",
+            "--depth",
+            type=int,
+            default=0,
+            help="don't descend deeper than this (default: unlimited)",
+        )
+        self._parser.add_argument(
+            "-f",
+            "--filter",
+            help="only print objects whose class matches this pattern (e.g. 'QPush*')",
+        )
+        self._parser.add_argument(
+            "object", nargs="+", help="variable path or expression of the root object"
+        )
+
+    def get_short_help(self):
+        return "Print the tree of QObjects below an object."
+
+    def get_long_help(self):
+        return self._parser.format_help()
+
+    def __call__(
+        self,
+        debugger: SBDebugger,
+        command: str,
+        exe_ctx: lldb.SBExecutionContext,
+        result: lldb.SBCommandReturnObject,
+    ):
+        try:
+            args = self._parser.parse_args(shlex.split(command))
+            value = evaluate_value(exe_ctx, " ".join(args.object))
+        except ValueError as e:
+            result.SetError(str(e))
+            return
+
+        raw = value.GetNonSyntheticValue()
+        if raw.TypeIsPointerType():
+            root = raw.GetValueAsAddress()
+        else:
+            root = raw.GetLoadAddress()
+        if root in (0, lldb.LLDB_INVALID_ADDRESS):
+            result.SetError("the object is null")
+            return
+
+        # Print the tree while it's walked.
+        result.SetImmediateOutputFile(debugger.GetOutputFile())
+        process = value.GetProcess()
+        progress = lldb.SBProgress("qt objtree", f"{root:#x}", debugger)
+        count = 0
+        stopped = None
+        for obj in _walk_qobjects(process, root, args.depth):
+            if debugger.InterruptRequested():
+                stopped = "interrupted"
+                break
+            count += 1
+            if count % self.PROGRESS_INTERVAL == 0:
+                progress.Increment(self.PROGRESS_INTERVAL, f"{count} objects")
+            class_name = _qobject_class_name(process, obj.addr) or "?"
+            if args.filter and not fnmatch.fnmatchcase(class_name, args.filter):
+                continue
+            line = f"{'  ' * obj.depth}{obj.addr:#x} {class_name}"
+            if obj.name:
+                line += f' "{obj.name}"'
+            if obj.depth > 0:
+                line += f" (parent {obj.parent:#x})"
+            result.AppendMessage(line)
+
+        message = f"{count} objects"
+        if stopped:
+            message += f" (stopped: {stopped})"
+        result.AppendMessage(message)
+
+
+class _QObjectNode(NamedTuple):
+    addr: int
+    parent: int
+    depth: int
+    name: str
+
+
+def _walk_qobjects(
+    process: SBProcess, root: int, max_depth: int
+) -> Iterator[_QObjectNode]:
+    """Walk the children of the QObject at `root` breadth-first.
+
+    Objects are read level by level. Each object that was already visited is
+    skipped, so corrupted trees with cycles terminate.
+    """
+    target = process.GetTarget()
+    layout = _qobject_private_layout(target)
+    extra_layout = struct_layout(
+        target,
+        "QObjectPrivate::ExtraData",
+        _QOBJECT_EXTRADATA_FIELDS,
+        {8: _QOBJECT_EXTRADATA_OFFSETS_64},
+    )
+    if layout is None:
+        return
+    mem = memory_cache(process)
+    strings = string_cache(process)
+    ptr_size = process.GetAddressByteSize()
+    ptr_format = ("<" if process.GetByteOrder() != lldb.eByteOrderBig else ">") + (
+        "Q" if ptr_size == 8 else "I"
+    )
+
+    seen = {root}
+    level = [(root, 0)]
+    depth = 0
+    while level:
+        next_level = []
+        for addr, parent in level:
+            d_addr = mem.read_pointer(addr + ptr_size)  # skip vtable
+            d = layout.read(process, d_addr) if d_addr else None
+            name = ""
+            if d is not None and d.extra_data and extra_layout is not None:
+                extra = extra_layout.read(process, d.extra_data)
+                if extra is not None and 0 < extra.name_size <= 1024:
+                    name = strings.get(extra.name_ptr, extra.name_size * 2, "utf-16le")
+            yield _QObjectNode(addr, parent, depth, name or "")
+
+            if d is None or (max_depth and depth >= max_depth):
+                continue
+            if not 0 < d.children_size <= 1 << 20:
+                continue
+            data = mem.read(d.children_ptr, d.children_size * ptr_size)
+            if data is None:
+                continue
+            for (child,) in struct.iter_unpack(ptr_format, data):
+                if child and child not in seen:
+                    seen.add(child)
+                    next_level.append((child, addr))
+        level = next_level
+        depth += 1
+
+
+_VTABLE_SYMBOL = re.compile(
+    r"^(?:vtable for (?P<itanium>.+)|const (?P<msvc>.+)::`vftable'.*)$"
+)
+"""Demangled name of a vtable (Itanium or MSVC ABI)."""
+
+_METAOBJECT_FUNCTION = re.compile(r"(?:^|[\s*&])(?P<cls>[^\s*&]+)::metaObject\(")
+"""Demangled name of an implementation of `QObject::metaObject()`."""
+
+_QMETAOBJECT_FIELDS = (
+    ("stringdata", "d.stringdata", "P"),
+    ("data", "d.data", "P"),
+)
+# offsetof(QMetaObject, d.stringdata/d.data) on 32-bit and 64-bit targets
+_QMETAOBJECT_OFFSETS = {4: (4, 8), 8: (8, 16)}
+
+
+def _qobject_class_name(process: SBProcess, addr: int) -> Optional[str]:
+    """Get the class of the QObject at `addr` like `metaObject()->className()`.
+
+    The first entry of the vtable is `metaObject()`, whose symbol names the
+    class that declares the `staticMetaObject`. If that can't be decoded, the
+    class of the vtable is used. Both are cached per vtable, so objects of the
+    same class only cost one pointer read.
+    """
+    vtable = memory_cache(process).read_pointer(addr)
+    if not vtable:
+        return None
+    target = process.GetTarget()
+    cache = process_local(process, "qobject-classes", dict)
+    if vtable in cache:
+        return cache[vtable]
+    name = _meta_class_name(process, vtable) or _vtable_class_name(target, vtable)
+    cache[vtable] = name
+    return name
+
+
+def _vtable_class_name(target: SBTarget, vtable: int) -> Optional[str]:
+    symbol = target.ResolveLoadAddress(vtable).GetSymbol()
+    m = _VTABLE_SYMBOL.match(symbol.GetName() or "") if symbol else None
+    return (m["itanium"] or m["msvc"]) if m else None
+
+
+def _meta_class_name(process: SBProcess, vtable: int) -> Optional[str]:
+    """Get the class name from the `staticMetaObject` that the vtable refers to."""
+    target = process.GetTarget()
+    function = memory_cache(process).read_pointer(vtable)
+    if not function:
+        return None
+    symbol = target.ResolveLoadAddress(function).GetSymbol()
+    m = _METAOBJECT_FUNCTION.search(symbol.GetName() or "") if symbol else None
+    if not m:
+        return None
+    meta_object = _static_meta_object(target, m["cls"])
+    if meta_object is None:
+        return None
+
+    # Several vtables (e.g. of classes without Q_OBJECT) share a meta object.
+    cache = process_local(process, "qmetaobjects", dict)
+    if meta_object not in cache:
+        cache[meta_object] = _read_meta_class_name(process, meta_object)
+    return cache[meta_object]
+
+
+def _static_meta_object(target: SBTarget, class_name: str) -> Optional[int]:
+    name = f"{class_name}::staticMetaObject"
+    for ctx in target.FindSymbols(name, lldb.eSymbolTypeData):
+        addr = ctx.GetSymbol().GetStartAddress().GetLoadAddress(target)
+        if addr != lldb.LLDB_INVALID_ADDRESS:
+            return addr
+    found = target.FindGlobalVariables(name, 1)
+    if found.GetSize() > 0:
+        addr = found.GetValueAtIndex(0).GetLoadAddress()
+        if addr != lldb.LLDB_INVALID_ADDRESS:
+            return addr
+    return None
+
+
+def _read_meta_class_name(process: SBProcess, meta_object: int) -> Optional[str]:
+    """Decode the class name from the string table of the `QMetaObject`.
+
+    In Qt 6, `d.stringdata` starts with (offset, length) pairs of `uint`s
+    followed by the characters, and `d.data[1]` is the index of the class name.
+    """
+    layout = struct_layout(
+        process.GetTarget(), "QMetaObject", _QMETAOBJECT_FIELDS, _QMETAOBJECT_OFFSETS
+    )
+    if layout is None:
+        return None
+    mo = layout.read(process, meta_object)
+    if mo is None or not mo.stringdata or not mo.data:
+        return None
+    mem = memory_cache(process)
+    index = mem.read_unsigned(mo.data + 4, 4)
+    if index is None:
+        return None
+    entry = mem.read(mo.stringdata + index * 8, 8)
+    if entry is None or len(entry) != 8:
+        return None
+    offset = int.from_bytes(entry[:4], mem.byte_order)  # type: ignore
+    length = int.from_bytes(entry[4:], mem.byte_order)  # type: ignore
+    data = mem.read(mo.stringdata + offset, length)
+    if data is None or len(data) != length:
+        return None
+    return data.decode("utf-8", errors="replace")
+
+
 def QUrlSummaryProvider(
     valobj: SBValue, internal_dict: dict, options: lldb.SBTypeSummaryOptions
 ) -> Optional[str]:
@@ -2356,6 +3438,39 @@ def QUrlSummaryProvider(
     return v.GetSummary()
 
 
+# class QUrlPrivate {
+#   QAtomicInt ref;
+#   int port;
+#   QString scheme, userName, password, host, path, query, fragment;
+#   std::unique_ptr<QUrlErrorPrivate> error;
+#   uchar sectionIsPresent;
+#   uchar flags;
+# };
+_QURL_STRINGS = ("scheme", "userName", "password", "host", "path", "query", "fragment")
+# XXX: This changes in Qt7 - [ptr, size, d]; Qt6: [d, ptr, size]
+_QURL_FIELDS = (
+    ("port", "port", "i"),
+    *(
+        field
+        for name in _QURL_STRINGS
+        for field in (
+            (name + "_ptr", name + ".d.ptr", "P"),
+            (name + "_size", name + ".d.size", "n"),
+        )
+    ),
+    ("flags", "flags", "B"),
+)
+
+
+def _qurl_offsets(ptr_size: int) -> tuple[int, ...]:
+    strings = (
+        off
+        for nth in range(len(_QURL_STRINGS))
+        for off in (8 + (3 * nth + 1) * ptr_size, 8 + (3 * nth + 2) * ptr_size)
+    )
+    return (4, *strings, 8 + 22 * ptr_size + 1)
+
+
 class QUrlSyntheticProvider:
     SCHEME_INDEX = 0
     USERNAME_INDEX = 1
@@ -2371,9 +3486,16 @@ class QUrlSyntheticProvider:
         self._valobj = valobj
         self._target = self._valobj.GetTarget()
         self._process: SBProcess = valobj.GetProcess()
-        self._void_ptr = self._target.GetBasicType(lldb.eBasicTypeVoid).GetPointerType()
-        self._qstring_ty = self._target.FindFirstType("QString")
+        self._types = target_types(self._target)
+        self._void_ptr = self._types.pointer(lldb.eBasicTypeVoid)
+        self._qstring_ty = self._types.find("QString")
         self._ptr_size = self._target.GetAddressByteSize()
+        self._layout = struct_layout(
+            self._target,
+            "QUrlPrivate",
+            _QURL_FIELDS,
+            {4: _qurl_offsets(4), 8: _qurl_offsets(8)},
+        )
 
         self._scheme = None
         self._user = None
@@ -2450,31 +3572,33 @@ class QUrlSyntheticProvider:
         self._combined = None
 
         d_addr = QUrlSyntheticProvider._get_d_address(self._valobj)
-        if d_addr == 0:
+        if d_addr == 0 or self._layout is None:
             return
+        data = self._layout.read_bytes(self._process, d_addr)
+        if data is None:
+            return
+        d = self._layout.unpack(data)
 
-        self._port = self._valobj.CreateValueFromAddress(
-            "[Port]", d_addr + 4, self._target.GetBasicType(lldb.eBasicTypeInt)
-        )
-        port = self._port.GetValueAsSigned()
-        self._scheme = self._make_nth("[Scheme]", d_addr, 0)
-        scheme = self._str_at(d_addr, 0)
-        self._user = self._make_nth("[Username]", d_addr, 1)
-        user = self._str_at(d_addr, 1)
-        self._pass = self._make_nth("[Password]", d_addr, 2)
-        _pass = self._str_at(d_addr, 2)
-        self._host = self._make_nth("[Host]", d_addr, 3)
-        host = self._str_at(d_addr, 3)
-        self._path = self._make_nth("[Path]", d_addr, 4)
-        path = self._str_at(d_addr, 4)
-        self._query = self._make_nth("[Query]", d_addr, 5)
-        query = self._str_at(d_addr, 5)
-        self._fragment = self._make_nth("[Fragment]", d_addr, 6)
-        fragment = self._str_at(d_addr, 6)
-
-        flags = self._process.ReadUnsignedFromMemory(
-            d_addr + 2 * 4 + 7 * 3 * self._ptr_size + self._ptr_size + 1, 1, SBError()
+        self._port = self._layout.value(
+            self._valobj, data, "port", "[Port]", self._types.find(lldb.eBasicTypeInt)
         )
+        port = d.port
+        self._scheme = self._make_nth("[Scheme]", d_addr, "scheme")
+        scheme = self._str_at(d.scheme_ptr, d.scheme_size)
+        self._user = self._make_nth("[Username]", d_addr, "userName")
+        user = self._str_at(d.userName_ptr, d.userName_size)
+        self._pass = self._make_nth("[Password]", d_addr, "password")
+        _pass = self._str_at(d.password_ptr, d.password_size)
+        self._host = self._make_nth("[Host]", d_addr, "host")
+        host = self._str_at(d.host_ptr, d.host_size)
+        self._path = self._make_nth("[Path]", d_addr, "path")
+        path = self._str_at(d.path_ptr, d.path_size)
+        self._query = self._make_nth("[Query]", d_addr, "query")
+        query = self._str_at(d.query_ptr, d.query_size)
+        self._fragment = self._make_nth("[Fragment]", d_addr, "fragment")
+        fragment = self._str_at(d.fragment_ptr, d.fragment_size)
+
+        flags = d.flags
 
         url = ""
         if scheme:
@@ -2503,26 +3627,15 @@ class QUrlSyntheticProvider:
 
         self._combined = _valobj_from_str(self._valobj, url)
 
-    def _make_nth(self, name: str, base: int, nth: int):
-        return self._valobj.CreateValueFromAddress(
-            name, base + 2 * 4 + nth * 3 * self._ptr_size, self._qstring_ty
-        )
+    def _make_nth(self, name: str, base: int, field: str):
+        # The QString starts at its `d` pointer, one pointer before `ptr`.
+        off = self._layout.offsets[field + "_ptr"] - self._ptr_size  # type: ignore
+        return self._valobj.CreateValueFromAddress(name, base + off, self._qstring_ty)
 
-    def _str_at(self, base: int, nth: int) -> str:
-        # XXX: This changes in Qt7 - [ptr, size, d]; Qt6: [d, ptr, size]
-        err = SBError()
-        base_ptr = base + 2 * 4 + nth * 3 * self._ptr_size
-        sz = self._process.ReadUnsignedFromMemory(base_ptr + 2 * self._ptr_size, 8, err)
-        if sz == 0:
-            return ""
-        addr = self._process.ReadPointerFromMemory(base_ptr + self._ptr_size, err)
-        if addr == 0:
-            return ""
-        s = self._process.ReadMemory(addr, sz * 2, err) or bytes()
-        try:
-            return s.decode("utf-16le")
-        except BaseException as _:
+    def _str_at(self, addr: int, sz: int) -> str:
+        if sz <= 0 or not addr:
             return ""
+        return string_cache(self._process).get(addr, sz * 2, "utf-16le") or ""
 
 
 def _valobj_from_signed(source: SBValue, val: int, name="") -> SBValue:
@@ -2552,10 +3665,23 @@ def _numeric_index(name: str) -> Optional[int]:
         return None
 
 
+# class QDateTimePrivate : public QSharedData {
+#   Status m_status;
+#   qint64 m_msecs;
+#   int m_offsetFromUtc;
+#   QTimeZone m_timeZone;
+# };
+_QDATETIMEPRIVATE_FIELDS = (
+    ("status", "m_status", "I"),
+    ("msecs", "m_msecs", "q"),
+    ("offset_from_utc", "m_offsetFromUtc", "i"),
+)
+_QDATETIMEPRIVATE_OFFSETS = (4, 8, 16)
+
+
 def _qdatetime_data(valobj: SBValue) -> Optional[tuple[datetime.datetime, bool]]:
     tgt: SBTarget = valobj.GetTarget()
-    ptr_size: int = tgt.GetAddressByteSize()
-    void_ptr = tgt.GetBasicType(lldb.eBasicTypeVoid).GetPointerType()
+    void_ptr = target_types(tgt).pointer(lldb.eBasicTypeVoid)
     if valobj.TypeIsPointerType():
         valobj = valobj.Dereference()
     d_val: int = valobj.Cast(void_ptr).GetValueAsAddress()
@@ -2572,34 +3698,22 @@ def _qdatetime_data(valobj: SBValue) -> Optional[tuple[datetime.datetime, bool]]
         dt = datetime.datetime.fromtimestamp(msec / 1000.0, datetime.UTC)
         return dt, is_local
 
-    process: SBProcess = valobj.GetProcess()
-    # class QDateTimePrivate : public QSharedData {
-    #   Status m_status;
-    #   qint64 m_msecs;
-    #   int m_offsetFromUtc;
-    #   QTimeZone m_timeZone;
-    # };
-    status_addr = d_val + 4
-    msecs_addr = d_val + ptr_size
-    offset_from_utc_addr = d_val + 16
-
-    err = SBError()
-    status = process.ReadUnsignedFromMemory(status_addr, 4, err)
-    if err.Fail():
+    layout = struct_layout(
+        tgt,
+        "QDateTimePrivate",
+        _QDATETIMEPRIVATE_FIELDS,
+        {4: _QDATETIMEPRIVATE_OFFSETS, 8: _QDATETIMEPRIVATE_OFFSETS},
+    )
+    if layout is None:
         return None
-
-    if (status & QDateTimeConstants.STATUS_VALID_DATETIME_MASK) == 0:
+    d = layout.read(valobj.GetProcess(), d_val)
+    if d is None:
         return None
 
-    msec = process.ReadUnsignedFromMemory(msecs_addr, 8, err)
-    msec = _uint64_to_int64(msec)
-    if err.Fail():
-        return None
-
-    offset = process.ReadUnsignedFromMemory(offset_from_utc_addr, 4, err)
-    offset = _uint32_to_int32(offset)
-    if err.Fail():
+    if (d.status & QDateTimeConstants.STATUS_VALID_DATETIME_MASK) == 0:
         return None
+    msec = d.msecs
+    offset = d.offset_from_utc
 
     # datetime expects a UTC timestamp
     try:
@@ -2611,12 +3725,3 @@ def _qdatetime_data(valobj: SBValue) -> Optional[tuple[datetime.datetime, bool]]
     except BaseException as e:
         print(e)
 
-
-def _uint32_to_int32(n):
-    n = n & 0xFFFF_FFFF
-    return (n ^ 0x8000_0000) - 0x8000_0000
-
-
-def _uint64_to_int64(n):
-    n = n & 0xFFFF_FFFF_FFFF_FFFF
-    return (n ^ 0x8000_0000_0000_0000) - 0x8000_0000_0000_0000
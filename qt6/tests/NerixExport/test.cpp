@@ -0,0 +1,10 @@
+#include <QList>
+#include <QString>
+
+int main()
+{
+    QList<QString> strings{QString(u"a"), QString(u"b"), QString(u"c")};
+    QList<QList<int>> nested{{1, 2}, {3}};
+
+    return 0;  // break here
+}
@@ -0,0 +1,39 @@
+import testlib
+import json
+import os
+import re
+import tempfile
+
+
+class TestNerixExport(testlib.TestCase):
+    def runTest(self):
+        self.runToRegex("// break here")
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, "strings.jsonl")
+            self.runCmd(f"nerix export -o {out} strings")
+            self.assertIn("Wrote 4 values", self.res.GetOutput())
+            with open(out, encoding="utf-8") as f:
+                records = [json.loads(line) for line in f]
+            self.assertEqual(
+                [r["path"] for r in records],
+                ["strings", "strings[0]", "strings[1]", "strings[2]"],
+            )
+            self.assertEqual(records[0]["summary"], "size=3")
+            self.assertRegex(records[2]["summary"], re.compile(r'^u?"b"$'))
+
+            out = os.path.join(tmp, "nested.json")
+            self.runCmd(f"nerix export -f json -o {out} nested")
+            with open(out, encoding="utf-8") as f:
+                root = json.load(f)
+            self.assertEqual(
+                [[c["value"] for c in l["children"]] for l in root["children"]],
+                [["1", "2"], ["3"]],
+            )
+
+            out = os.path.join(tmp, "limited.json")
+            self.runCmd(f"nerix export -f json -c 2 -o {out} nested")
+            self.assertIn("stopped: reached --max-count 2", self.res.GetOutput())
+            with open(out, encoding="utf-8") as f:
+                root = json.load(f)
+            self.assertEqual(len(root["children"]), 1)
+            self.assertNotIn("children", root["children"][0])
@@ -0,0 +1,12 @@
+#include <QList>
+
+int main()
+{
+    QList<int> list;
+    for (int i = 0; i < 25; ++i)
+    {
+        list.append(i);
+    }
+
+    return 0;  // break here
+}
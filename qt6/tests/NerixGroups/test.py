@@ -0,0 +1,40 @@
+import testlib
+from testlib import ValueCheck
+
+
+class TestNerixGroups(testlib.TestCase):
+    def runTest(self):
+        self.runCmd("nerix set group-threshold 10")
+        self.runToRegex("// break here")
+        self.assertVarPath(
+            "list",
+            ValueCheck(
+                summary="size=25",
+                children=[
+                    ValueCheck(name="[0..9]", summary="size=10"),
+                    ValueCheck(
+                        name="[10..19]",
+                        summary="size=10",
+                        children=[
+                            ValueCheck(name=f"[{i}]", value=str(i))
+                            for i in range(10, 20)
+                        ],
+                    ),
+                    ValueCheck(
+                        name="[20..24]",
+                        summary="size=5",
+                        children=[
+                            ValueCheck(name=f"[{i}]", value=str(i))
+                            for i in range(20, 25)
+                        ],
+                    ),
+                ],
+            ),
+        )
+        # Grouped elements can still be found by their index
+        grouped = self.frame().FindVariable("list")
+        ValueCheck(name="[15]", value="15").check(
+            self, grouped.GetChildMemberWithName("[15]")
+        )
+        self.assertFalse(grouped.GetChildMemberWithName("[25]").IsValid())
+        self.runCmd("nerix set group-threshold 0")
@@ -0,0 +1,12 @@
+#include <QByteArray>
+#include <QSpan>
+
+#include <cstddef>
+
+int main()
+{
+    QByteArray data("Hello, world!\n0123456789");
+    QSpan<const std::byte> bytes = as_bytes(QSpan(data));
+
+    return 0;  // break here
+}
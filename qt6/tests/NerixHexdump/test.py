@@ -0,0 +1,29 @@
+import testlib
+from testlib import ValueCheck
+
+ROWS = [
+    ValueCheck(
+        name="[0x00000000]",
+        summary='"48 65 6c 6c 6f 2c 20 77  6f 72 6c 64 21 0a 30 31  |Hello, world!.01|"',
+    ),
+    ValueCheck(
+        name="[0x00000010]",
+        summary='"32 33 34 35 36 37 38 39' + " " * 27 + '|23456789|"',
+    ),
+]
+
+
+class TestNerixHexdump(testlib.TestCase):
+    def runTest(self):
+        self.runToRegex("// break here")
+        self.runCmd("nerix view hexdump data")
+        self.runCmd("nerix view hexdump bytes")
+        self.assertVarPath(
+            "data", ValueCheck(summary='"Hello, world!\\n0123456789"', children=ROWS)
+        )
+        self.assertVarPath("bytes", ValueCheck(summary="size=24", children=ROWS))
+        # Views are refreshed through the categories of the formatters
+        self.assertFalse(self.dbg.GetCategory("nerix").IsValid())
+
+        self.runCmd("nerix view elements data")
+        self.assertVarPath("data[0]", ValueCheck(value="'H'"))
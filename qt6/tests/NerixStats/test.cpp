@@ -0,0 +1,10 @@
+#include <QList>
+#include <QString>
+
+int main()
+{
+    QString str(u"hello");
+    QList<int> list{1, 2, 3};
+
+    return 0;  // break here
+}
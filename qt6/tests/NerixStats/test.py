@@ -0,0 +1,26 @@
+import testlib
+from testlib import ValueCheck
+import json
+import re
+
+
+class TestNerixStats(testlib.TestCase):
+    def runTest(self):
+        self.runCmd("nerix stats --enable")
+        self.runToRegex("// break here")
+        self.assertVarPath("str", ValueCheck(summary=re.compile(r'^u?"hello"$')))
+        self.assertVarPath("list", ValueCheck(summary="size=3"))
+
+        self.runCmd("nerix stats --json")
+        rows = json.loads(self.res.GetOutput())
+        calls = {(row["provider"], row["method"]): row["calls"] for row in rows}
+        self.assertGreater(calls.get(("qt6.QStringSummaryProvider", "summary"), 0), 0)
+        self.assertGreater(calls.get(("qt6.QListSyntheticProvider", "update"), 0), 0)
+
+        self.runCmd("nerix stats")
+        self.assertIn("qt6.QListSyntheticProvider", self.res.GetOutput())
+
+        self.runCmd("nerix stats --reset")
+        self.runCmd("nerix stats --disable")
+        self.runCmd("nerix stats --json")
+        self.assertEqual(json.loads(self.res.GetOutput()), [])
@@ -7,6 +7,8 @@ int main()
     QByteArray oneChar("a");
     QByteArray emojis("🪐🪐🪐");
     auto notNullTerminated = QByteArray::fromRawData("abc", 2);
+    QByteArray truncated(2000, 'x');
+    QByteArray splitEmoji = QByteArray(1022, 'x') + emojis;
 
     return 0;  // break here
 }
@@ -10,3 +10,13 @@ class TestQByteArray(testlib.TestCase):
         self.assertVarPath("oneChar", ValueCheck(summary='"a"'))
         self.assertVarPath("emojis", ValueCheck(summary='"🪐🪐🪐"'))
         self.assertVarPath("notNullTerminated", ValueCheck(summary='"ab"'))
+        # Only `target.max-string-summary-length` (1024) bytes are read
+        self.assertVarPath(
+            "truncated",
+            ValueCheck(summary='"' + "x" * 1024 + '"... (size=2000)'),
+        )
+        # The UTF-8 sequence at the limit isn't split
+        self.assertVarPath(
+            "splitEmoji",
+            ValueCheck(summary='"' + "x" * 1022 + '"... (size=1034)'),
+        )
@@ -1,5 +1,6 @@
+import nerix_common
 import testlib
-from lldb import SBValue
+from lldb import SBType, SBValue
 from testlib import ValueCheck
 
 
@@ -37,3 +38,18 @@ class TestQHash(testlib.TestCase):
 
         exp = {str(i): str(i * 2) for i in range(1, 11)}
         self.assertEqual(exp, got)
+
+        # Layouts of templated types (the spans are Span<Node<int, int> >)
+        spans = many.GetNonSyntheticValue().GetValueForExpressionPath(".d->spans")
+        span_type: SBType = spans.GetType().GetPointeeType()
+        self.assertIn("<", span_type.GetName())
+        layout = nerix_common.struct_layout(
+            self.target(),
+            span_type.GetName(),
+            (("entries", "entries", "P"), ("next_free", "nextFree", "B")),
+            {},
+        )
+        self.assertIsNotNone(layout)
+        span = layout.read(self.process(), spans.GetValueAsAddress())
+        self.assertIsNotNone(span)
+        self.assertNotEqual(span.entries, 0)
@@ -107,3 +107,10 @@ class TestQJsonDocument(testlib.TestCase):
                 ],
             ),
         )
+
+        self.runCmd('qt json-get docObject "/an object/abc/abc"')
+        self.assertIn('"def"', self.res.GetOutput())
+        self.runCmd("qt json-get docArray /7/def/4")
+        self.assertIn("42.5", self.res.GetOutput())
+        self.ci.HandleCommand("qt json-get docObject /missing", self.res)
+        self.assertFalse(self.res.Succeeded())
@@ -86,3 +86,16 @@ class TestQJsonObject(testlib.TestCase):
                 ],
             ),
         )
+
+        # Lookup by key
+        all_types = self.frame().GetValueForVariablePath("allTypes")
+        ValueCheck(name='["int"]', value="1234567890").check(
+            self, all_types.GetChildMemberWithName('["int"]')
+        )
+        ValueCheck(summary="{ size=1 }").check(
+            self, all_types.GetChildMemberWithName('["object"]')
+        )
+        ValueCheck(summary='""').check(
+            self, all_types.GetChildMemberWithName('["stringKeyUtf16🐛"]')
+        )
+        self.assertFalse(all_types.GetChildMemberWithName('["missing"]').IsValid())
@@ -1,4 +1,5 @@
 #include <QMap>
+#include <QString>
 
 int main()
 {
@@ -10,6 +11,11 @@ int main()
         {1, 2},  {2, 4},  {3, 6},  {4, 8},  {5, 10},
         {6, 12}, {7, 14}, {8, 16}, {9, 18}, {10, 20},
     };
+    QMap<QString, int> byName{
+        {QString(u"one"), 1},
+        {QString(u"two"), 2},
+        {QString(u"three"), 3},
+    };
 
     return 0;  // break here
 }
@@ -37,3 +37,20 @@ class TestQMap(testlib.TestCase):
                 ],
             ),
         )
+
+        # Lookup by key
+        by_name = self.frame().GetValueForVariablePath("byName")
+        ValueCheck(name='["two"]', value="2").check(
+            self, by_name.GetChildMemberWithName('["two"]')
+        )
+        self.assertFalse(by_name.GetChildMemberWithName('["four"]').IsValid())
+        # Repeated lookups reuse the child
+        self.assertEqual(
+            by_name.GetIndexOfChildWithName('["two"]'),
+            by_name.GetIndexOfChildWithName('["two"]'),
+        )
+
+        self.runCmd("qt map-find many 7")
+        self.assertIn("= 14", self.res.GetOutput())
+        self.runCmd('qt map-find byName "three"')
+        self.assertIn("= 3", self.res.GetOutput())
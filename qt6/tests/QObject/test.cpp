@@ -1,4 +1,5 @@
 #include <QObject>
+#include <QTimer>
 #include <QVariant>
 
 int main()
@@ -15,6 +16,8 @@ int main()
     level2a->setProperty("prop", false);
     level2a->setProperty("something", 123);
 
+    QObject *timer = new QTimer;
+
     // Ensure clang generates debug info for these types.
     QList<QByteArray> ensureBa;
     QList<QVariant> ensureV;
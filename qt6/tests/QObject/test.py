@@ -11,7 +11,7 @@ class TestQObject(testlib.TestCase):
         self.assertVarPath(
             "root",
             ValueCheck(
-                summary=re.compile(r'^u?"root"$'),
+                summary=re.compile(r'^QObject u?"root"$'),
                 children=[
                     ValueCheck(name="[Parent]", value=re.compile(r"^0x0+$")),
                     ValueCheck(name="[Name]", value=re.compile(r'^u"root"$')),
@@ -29,6 +29,7 @@ class TestQObject(testlib.TestCase):
         self.assertVarPath(
             "level1b",
             ValueCheck(
+                summary="QObject",
                 children=[
                     ValueCheck(name="[Parent]", value=f"{root_addr:#x}"),
                 ],
@@ -37,7 +38,7 @@ class TestQObject(testlib.TestCase):
         self.assertVarPath(
             "level2a",
             ValueCheck(
-                summary=re.compile(r'^u?"object"$'),
+                summary=re.compile(r'^QObject u?"object"$'),
                 children=[
                     ValueCheck(name="[Parent]", value=f"{level1a_addr:#x}"),
                     ValueCheck(name="[Name]", value=re.compile(r'^u"object"$')),
@@ -60,3 +61,22 @@ class TestQObject(testlib.TestCase):
                 ],
             ),
         )
+
+        self.assertVarPath("timer", ValueCheck(summary="QTimer"))
+
+        root = self.frame().FindValue("root")
+        ValueCheck(
+            summary="size=2",
+            children=[
+                ValueCheck(value=f"{level1a_addr:#x}"),
+                ValueCheck(value=self.frame().FindValue("level1b").GetValue()),
+            ],
+        ).check(self, root.GetChildMemberWithName("[Children]"))
+
+        self.runCmd("qt objtree root")
+        output = self.res.GetOutput()
+        self.assertIn(f"{root_addr:#x} QObject", output)
+        self.assertIn(f"(parent {level1a_addr:#x})", output)
+        self.assertIn("4 objects", output)
+        self.runCmd("qt objtree --depth 1 root")
+        self.assertIn("3 objects", self.res.GetOutput())
@@ -7,6 +7,10 @@ int main()
     QString oneChar(u"a");
     QString emojis(u"🪐🪐🪐");
     auto notNullTerminated = QString::fromRawData(u"abc", 2);
+    QString shared = emojis;
+    auto prefix = QString::fromRawData(emojis.constData(), 2);
+    QString truncated(2000, u'x');
+    QString splitEmoji = QString(1023, u'x') + emojis;
 
     return 0;  // break here
 }
@@ -14,3 +14,17 @@ class TestQString(testlib.TestCase):
             "notNullTerminated",
             ValueCheck(summary=re.compile(r'^u?"ab"$')),
         )
+        # Shares its data with `emojis`
+        self.assertVarPath("shared", ValueCheck(summary=re.compile(r'u?"🪐🪐🪐"')))
+        # Same data pointer as `emojis`, but a different size
+        self.assertVarPath("prefix", ValueCheck(summary=re.compile(r'^u?"🪐"$')))
+        # Only `target.max-string-summary-length` (1024) characters are read
+        self.assertVarPath(
+            "truncated",
+            ValueCheck(summary=re.compile(r'^u?"x{1024}"\.\.\. \(size=2000\)$')),
+        )
+        # The surrogate pair at the limit isn't split
+        self.assertVarPath(
+            "splitEmoji",
+            ValueCheck(summary=re.compile(r'^u?"x{1023}"\.\.\. \(size=1029\)$')),
+        )
@@ -0,0 +1,24 @@
+#include <rapidjson/document.h>
+#include <rapidjson/rapidjson.h>
+
+int main()
+{
+    rapidjson::MemoryPoolAllocator<> alloc;
+    rapidjson::Value ints(rapidjson::kArrayType);
+    for (int i = 0; i < 100'000; ++i)
+    {
+        ints.PushBack(i, alloc);
+    }
+
+    rapidjson::Value objects(rapidjson::kArrayType);
+    for (int i = 0; i < 10'000; ++i)
+    {
+        rapidjson::Value obj(rapidjson::kObjectType);
+        obj.AddMember("index", i, alloc);
+        obj.AddMember("name", "quite a long string that has to be allocated",
+                      alloc);
+        objects.PushBack(obj, alloc);
+    }
+
+    return 0;  // break here
+}
@@ -4,6 +4,7 @@ from lldb import (
     SBDebugger,
 )
 from nerix_common import (
+    define_category,
     make_add_summary,
     make_add_synthetic,
     numeric_index,
@@ -12,7 +13,7 @@ from typing import Optional
 
 
 def __lldb_init_module(dbg: SBDebugger, internal_dict):
-    dbg.HandleCommand("type category define -e rapidjson -l c++")
+    define_category(dbg, "rapidjson")
 
     add_summary = make_add_summary(dbg, "rapidjson", __name__, include_own=False)
     add_synthetic = make_add_synthetic(dbg, "rapidjson", __name__)
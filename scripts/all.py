@@ -1,17 +1,87 @@
-from lldb import SBDebugger
+import lldb
+from lldb import SBCommandReturnObject, SBDebugger, SBModule, SBTarget
+from dataclasses import dataclass, replace
 from pathlib import Path
+from typing import Optional
+import importlib
+import os
+import re
+import sys
+import time
+
+
+@dataclass
+class Library:
+    directory: str
+    script: str
+    module: Optional[str] = None
+    """Regex for the file name of a shared library that implements the library."""
+    types: tuple[str, ...] = ()
+    """Non-template types that are only available when the library is used."""
+    classes: tuple[str, ...] = ()
+    """Class templates (without arguments) that are only used with the library."""
+    loaded: bool = False
+
+
+LIBRARIES = [
+    Library(
+        "boost-circular-buffer",
+        "boost_circular_buffer",
+        classes=("boost::circular_buffer", "boost::circular_buffer_space_optimized"),
+    ),
+    Library(
+        "boost-json",
+        "boost_json",
+        module=r"^(lib)?boost_json",
+        types=("boost::json::value",),
+    ),
+    Library(
+        "boost-unordered",
+        "boost_unordered",
+        classes=tuple(
+            f"boost::unordered::{prefix}_{kind}"
+            for prefix in (
+                "unordered",
+                "unordered_flat",
+                "unordered_node",
+                "concurrent_flat",
+                "concurrent_node",
+            )
+            for kind in ("map", "set")
+        )
+        + (
+            "boost::unordered::unordered_multimap",
+            "boost::unordered::unordered_multiset",
+        ),
+    ),
+    Library("qt6", "qt6", module=r"^(lib)?Qt6?Core", types=("QObject", "QString")),
+    Library("rapidjson", "rapidjson", types=("rapidjson::Type",)),
+    Library("sol2-lua", "lua", module=r"^(lib)?lua", types=("lua_State",)),
+]
+
+ROOT_DIR = Path(__file__).parent.parent
 
 
 def __lldb_init_module(dbg: SBDebugger, internal_dict):
-    root_dir = Path(__file__).parent.parent
+    start = time.perf_counter()
     # Requrired for all formatters
-    dbg.HandleCommand(f"command script import -- {root_dir}/scripts/nerix_common.py")
+    dbg.HandleCommand(f"command script import -- {ROOT_DIR}/scripts/nerix_common.py")
+    import nerix_common
+
+    if os.environ.get("NERIX_LAZY_LOAD", "") not in ("", "0"):
+        global _loader
+        _loader = _LazyLoader(dbg, internal_dict)
+        _loader.start()
+        nerix_common.record_startup("all", time.perf_counter() - start)
+        return
 
     def import_one(name: str, script_name = None):
         if not script_name:
             script_name = name
 
-        dbg.HandleCommand(f"command script import -- {root_dir}/{name}/scripts/{script_name}.py")
+        script_start = time.perf_counter()
+        dbg.HandleCommand(f"command script import -- {ROOT_DIR}/{name}/scripts/{script_name}.py")
+        nerix_common.record_startup(script_name, time.perf_counter() - script_start)
 
     import_one("boost-circular-buffer", "boost_circular_buffer")
     import_one("boost-json", "boost_json")
@@ -20,3 +90,116 @@ def __lldb_init_module(dbg: SBDebugger, internal_dict):
     import_one("rapidjson")
     import_one("sol2-lua", "lua")
 
+    nerix_common.record_startup("all", time.perf_counter() - start)
+
+
+class _LazyLoader:
+    """Imports a library once a target loads a module that uses it.
+
+    Libraries that are never used don't get imported, so their categories don't
+    exist and LLDB doesn't have to match their types against every value.
+
+    Targets are checked when the script is imported and from a stop hook (before
+    the stop is shown), so libraries are registered on the thread that handles
+    commands and before their values are formatted. Each module is only checked
+    once per target.
+    """
+
+    def __init__(self, dbg: SBDebugger, internal_dict):
+        self._dbg = dbg
+        self._internal_dict = internal_dict
+        self._libraries = [replace(lib) for lib in LIBRARIES]
+
+    def start(self):
+        ci = self._dbg.GetCommandInterpreter()
+        hook = f"target stop-hook add -P {__name__}._LazyLoadHook"
+        targets = [target for target in self._dbg if target]
+        if not targets:
+            # Stop hooks of the dummy target are copied to new targets.
+            ci.HandleCommand(hook, SBCommandReturnObject())
+            return
+        selected = self._dbg.GetSelectedTarget()
+        for target in targets:
+            self.check(target)
+            self._dbg.SetSelectedTarget(target)
+            ci.HandleCommand(hook, SBCommandReturnObject())
+        self._dbg.SetSelectedTarget(selected)
+
+    def check(self, target: SBTarget):
+        if self._all_loaded():
+            return
+        import nerix_common
+
+        seen = nerix_common.target_local(target, "lazy-modules", set)
+        for module in target.module_iter():
+            key = (module.GetUUIDString(), str(module.GetFileSpec()))
+            if key in seen:
+                continue
+            seen.add(key)
+            for lib in self._libraries:
+                if not lib.loaded and _is_used(lib, module):
+                    self._load(lib)
+
+    def _all_loaded(self) -> bool:
+        return all(lib.loaded for lib in self._libraries)
+
+    def _load(self, lib: Library):
+        import nerix_common
+
+        lib.loaded = True
+        start = time.perf_counter()
+        script_dir = str(ROOT_DIR / lib.directory / "scripts")
+        if script_dir not in sys.path:
+            sys.path.append(script_dir)
+        try:
+            module = importlib.import_module(lib.script)
+            # Providers are referenced as <script>.<name> in the session.
+            self._internal_dict[lib.script] = module
+            module.__lldb_init_module(self._dbg, self._internal_dict)
+        except Exception as e:
+            print(f"Failed to load {lib.script}: {e}")
+        nerix_common.record_startup(lib.script, time.perf_counter() - start)
+
+
+_loader: Optional[_LazyLoader] = None
+
+
+class _LazyLoadHook:
+    """Stop hook that imports the libraries used by newly loaded modules."""
+
+    def __init__(self, target: SBTarget, extra_args, internal_dict):
+        self._target = target
+
+    def handle_stop(self, exe_ctx: lldb.SBExecutionContext, stream: lldb.SBStream):
+        if _loader is not None:
+            _loader.check(self._target)
+        return True
+
+
+_TEMPLATE_ARGS = re.compile(r"<[^<>]*>")
+
+
+def _without_template_args(name: str) -> str:
+    prev = None
+    while prev != name:
+        prev, name = name, _TEMPLATE_ARGS.sub("", name)
+    return name
+
+
+def _is_used(lib: Library, module: SBModule) -> bool:
+    filename = module.GetFileSpec().GetFilename() or ""
+    if lib.module and re.search(lib.module, filename):
+        return True
+    for ty in lib.types:
+        if module.FindFirstType(ty):
+            return True
+    for cls in lib.classes:
+        # Constructors are named after the class (without template arguments).
+        base = cls.rsplit("::", 1)[-1]
+        expected = f"{cls}::{base}"
+        for ctx in module.FindFunctions(base, lldb.eFunctionNameTypeAuto):
+            fn = ctx.GetFunction()
+            name = fn.GetName() if fn else ctx.GetSymbol().GetName()
+            if _without_template_args(name or "").split("(", 1)[0] == expected:
+                return True
+    return False
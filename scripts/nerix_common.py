@@ -1,10 +1,77 @@
-from typing import Callable
+from typing import Any, Callable, Hashable, Iterator, NamedTuple, Sequence, TypeVar
+from collections import OrderedDict, namedtuple
+import argparse
+import functools
+import json
+import os
+import re
+import shlex
+import struct
+import sys
+import time
 import lldb
-from lldb import SBDebugger, SBValue, SBTarget, SBType
+from lldb import (
+    SBCommandReturnObject,
+    SBData,
+    SBDebugger,
+    SBError,
+    SBExecutionContext,
+    SBProcess,
+    SBValue,
+    SBTarget,
+    SBType,
+    SBTypeCategory,
+    SBTypeNameSpecifier,
+    SBTypeSummary,
+    SBTypeSynthetic,
+)
 from typing import Union, Optional
 
+T = TypeVar("T")
+
+
+def __lldb_init_module(dbg: SBDebugger, internal_dict):
+    if not dbg.GetCommandInterpreter().CommandExists("nerix"):
+        dbg.HandleCommand('command container add -h "nerix formatter commands" nerix')
+    dbg.HandleCommand(f"command script add -o -c {__name__}.StatsCommand nerix stats")
+    dbg.HandleCommand(f"command script add -o -c {__name__}.SetCommand nerix set")
+    dbg.HandleCommand(f"command script add -o -c {__name__}.ExportCommand nerix export")
+    dbg.HandleCommand(f"command script add -o -c {__name__}.ViewCommand nerix view")
+
+
+def define_category(dbg: SBDebugger, name: str) -> SBTypeCategory:
+    """Get or create the C++ category `name` and enable it."""
+    category = dbg.GetCategory(name)
+    if not category.IsValid():
+        category = dbg.CreateCategory(name)
+        category.AddLanguage(lldb.eLanguageTypeC_plus_plus)
+    category.SetEnabled(True)
+    return category
+
+
+def _name_specifiers(
+    type_names: list[str], regex: Optional[str]
+) -> list[SBTypeNameSpecifier]:
+    if regex:
+        return [SBTypeNameSpecifier(regex, True)]
+    return [SBTypeNameSpecifier(name, False) for name in type_names]
+
+
+def _add_summary(category: SBTypeCategory, spec: SBTypeNameSpecifier, summary):
+    if not category.AddTypeSummary(spec, summary):
+        print(f"Failed to add summary for '{spec.GetName()}' to {category.GetName()}")
+
+
+def _add_synthetic(category: SBTypeCategory, spec: SBTypeNameSpecifier, synthetic):
+    if not category.AddTypeSynthetic(spec, synthetic):
+        print(
+            f"Failed to add synthetic for '{spec.GetName()}' to {category.GetName()}"
+        )
+
 
 def make_add_summary_string(dbg: SBDebugger, category: str):
+    cat = define_category(dbg, category)
+
     def add_summary_string(
         type_names: Union[str, list[str]],
         summary: str,
@@ -14,29 +81,36 @@ def make_add_summary_string(dbg: SBDebugger, category: str):
     ):
         if isinstance(type_names, str):
             type_names = [type_names]
-        cmd = f"type summary add -w {category} --summary-string '{summary}' {'-x' if regex else ''} {'-v' if no_value else ''} "
-        cmd += " ".join(map(lambda it: f'"{it}"', type_names))
-        dbg.HandleCommand(cmd)
+        options = lldb.eTypeOptionCascade
+        if no_value:
+            options |= lldb.eTypeOptionHideValue
+        summary_obj = SBTypeSummary.CreateWithSummaryString(summary, options)
+        for name in type_names:
+            _add_summary(cat, SBTypeNameSpecifier(name, regex), summary_obj)
 
     return add_summary_string
 
 
 def make_add_summary(dbg: SBDebugger, category: str, modname: str, *, include_own=True):
+    cat = define_category(dbg, category)
+
     def add_summary(
         type_name: str, *, regex: Optional[str] = None, other_names: list[str] = []
     ):
         type_names = other_names + ([type_name] if include_own else [])
-        cmd = f"type summary add -w {category} -F {modname}.{type_name}SummaryProvider "
-        if regex:
-            cmd += f' -x "{regex}"'
-        else:
-            cmd += " ".join(map(lambda it: f'"{it}"', type_names))
-        dbg.HandleCommand(cmd)
+        fn_name = _instrument(modname, f"{type_name}SummaryProvider", _timed_summary)
+        summary = SBTypeSummary.CreateWithFunctionName(
+            f"{modname}.{fn_name}", lldb.eTypeOptionCascade
+        )
+        for spec in _name_specifiers(type_names, regex):
+            _add_summary(cat, spec, summary)
 
     return add_summary
 
 
 def make_add_synthetic(dbg: SBDebugger, category: str, modname: str):
+    cat = define_category(dbg, category)
+
     def add_synthetic(
         name: str,
         *,
@@ -44,17 +118,589 @@ def make_add_synthetic(dbg: SBDebugger, category: str, modname: str):
         type_name: Optional[str] = None,
         other_names: list[str] = [],
     ):
-        cmd = f"type synthetic add -w {category} -l {modname}.{name}SyntheticProvider"
-        if regex:
-            cmd += f' -x "{regex}"'
-        else:
-            type_name = type_name if type_name else name
-            cmd += f' "{type_name}" ' + " ".join(map(lambda it: f'"{it}"', other_names))
-        dbg.HandleCommand(cmd)
+        cls_name = _instrument(modname, f"{name}SyntheticProvider", _timed_synthetic)
+        synthetic = SBTypeSynthetic.CreateWithClassName(
+            f"{modname}.{cls_name}", lldb.eTypeOptionCascade
+        )
+        type_names = [type_name if type_name else name] + other_names
+        for spec in _name_specifiers(type_names, regex):
+            _add_synthetic(cat, spec, synthetic)
 
     return add_synthetic
 
 
+class ProviderStats:
+    __slots__ = ("calls", "total_time", "max_time", "exceptions", "reads", "bytes_read")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.exceptions = 0
+        self.reads = 0
+        self.bytes_read = 0
+
+
+stats_enabled = os.environ.get("NERIX_STATS", "") not in ("", "0")
+"""Whether provider calls are counted (see `nerix stats`)."""
+
+_provider_stats: dict[tuple[str, str], ProviderStats] = {}
+_active_stats: Optional[ProviderStats] = None
+"""Stats of the provider call that's currently running (reads are attributed to it)."""
+
+
+def _instrument(modname: str, name: str, wrap: Callable[[Any, str], Any]) -> str:
+    """Publish an instrumented version of `modname.name` in `modname` and return its name."""
+    module = sys.modules.get(modname)
+    provider = getattr(module, name, None)
+    if provider is None:
+        return name
+    wrapped_name = f"_{name}_stats"
+    setattr(module, wrapped_name, wrap(provider, f"{modname}.{name}"))
+    return wrapped_name
+
+
+def _call_timed(key: tuple[str, str], fn: Callable, *args):
+    global _active_stats
+    stats = _provider_stats.get(key)
+    if stats is None:
+        stats = _provider_stats[key] = ProviderStats()
+    outer = _active_stats
+    _active_stats = stats
+    start = time.perf_counter()
+    try:
+        return fn(*args)
+    except BaseException:
+        # LLDB swallows exceptions from providers.
+        stats.exceptions += 1
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        _active_stats = outer
+        stats.calls += 1
+        stats.total_time += elapsed
+        if elapsed > stats.max_time:
+            stats.max_time = elapsed
+
+
+def _timed_summary(fn: Callable, label: str):
+    key = (label, "summary")
+
+    # LLDB checks the number of arguments, so they're spelled out here.
+    @functools.wraps(fn)
+    def summary(valobj: SBValue, internal_dict: dict, options):
+        if not stats_enabled:
+            return fn(valobj, internal_dict, options)
+        return _call_timed(key, fn, valobj, internal_dict, options)
+
+    return summary
+
+
+_SYNTHETIC_METHODS = (
+    "__init__",
+    "update",
+    "num_children",
+    "get_child_index",
+    "get_child_at_index",
+    "has_children",
+    "get_value",
+)
+
+
+def _timed_synthetic(cls: type, label: str):
+    def timed(method: str):
+        fn = getattr(cls, method)
+        key = (label, method)
+
+        @functools.wraps(fn)
+        def wrapper(self, *args):
+            if not stats_enabled:
+                return fn(self, *args)
+            return _call_timed(key, fn, self, *args)
+
+        return wrapper
+
+    methods = {m: timed(m) for m in _SYNTHETIC_METHODS if hasattr(cls, m)}
+    return type(cls.__name__, (cls,), methods)
+
+
+def record_startup(name: str, seconds: float):
+    """Record how long it took to import the script `name` (shown in `nerix stats`)."""
+    stats = _provider_stats.get((name, "import"))
+    if stats is None:
+        stats = _provider_stats[(name, "import")] = ProviderStats()
+    stats.calls += 1
+    stats.total_time += seconds
+    stats.max_time = max(stats.max_time, seconds)
+
+
+def provider_stats() -> dict[tuple[str, str], ProviderStats]:
+    """Counters per `(provider, method)` collected while `stats_enabled` was set."""
+    return _provider_stats
+
+
+class CommandParser(argparse.ArgumentParser):
+    """Argument parser for LLDB commands that raises `ValueError` instead of exiting.
+
+    Use `help <command>` instead of `-h`.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(add_help=False, **kwargs)
+
+    def error(self, message: str):
+        raise ValueError(f"{message}\n{self.format_usage()}")
+
+
+class StatsCommand:
+    def __init__(self, debugger: SBDebugger, internal_dict):
+        self._parser = CommandParser(
+            prog="nerix stats",
+            description="Print how much time the formatters spent in each provider.",
+        )
+        self._parser.add_argument(
+            "--reset", action="store_true", help="clear all counters after printing"
+        )
+        self._parser.add_argument(
+            "--json", action="store_true", help="print the counters as JSON"
+        )
+        toggle = self._parser.add_mutually_exclusive_group()
+        toggle.add_argument(
+            "--enable", action="store_true", help="start collecting counters"
+        )
+        toggle.add_argument(
+            "--disable", action="store_true", help="stop collecting counters"
+        )
+
+    def get_short_help(self):
+        return "Show per-provider performance counters."
+
+    def get_long_help(self):
+        return self._parser.format_help()
+
+    def __call__(
+        self,
+        debugger: SBDebugger,
+        command: str,
+        exe_ctx: SBExecutionContext,
+        result: SBCommandReturnObject,
+    ):
+        global stats_enabled
+        try:
+            args = self._parser.parse_args(shlex.split(command))
+        except ValueError as e:
+            result.SetError(str(e))
+            return
+
+        if args.enable or args.disable:
+            stats_enabled = bool(args.enable)
+            result.AppendMessage(
+                f"Statistics {'enabled' if stats_enabled else 'disabled'}."
+            )
+            return
+
+        rows = sorted(
+            _provider_stats.items(), key=lambda it: it[1].total_time, reverse=True
+        )
+        if args.json:
+            result.AppendMessage(
+                json.dumps(
+                    [
+                        {
+                            "provider": provider,
+                            "method": method,
+                            "calls": s.calls,
+                            "total_ms": round(s.total_time * 1000, 3),
+                            "max_ms": round(s.max_time * 1000, 3),
+                            "reads": s.reads,
+                            "bytes_read": s.bytes_read,
+                            "exceptions": s.exceptions,
+                        }
+                        for (provider, method), s in rows
+                    ],
+                    indent=2,
+                )
+            )
+        elif not rows:
+            if stats_enabled:
+                result.AppendMessage("No provider was called yet.")
+            else:
+                result.AppendMessage(
+                    "Statistics are disabled. "
+                    "Use 'nerix stats --enable' or set NERIX_STATS=1."
+                )
+        else:
+            result.AppendMessage(_format_stats_table(rows))
+
+        if args.reset:
+            _provider_stats.clear()
+
+
+class SetCommand:
+    def __init__(self, debugger: SBDebugger, internal_dict):
+        self._parser = CommandParser(
+            prog="nerix set", description="Change a setting of the formatters."
+        )
+        self._parser.add_argument("setting", choices=["group-threshold"])
+        self._parser.add_argument("value", type=int)
+
+    def get_short_help(self):
+        return "Change a formatter setting."
+
+    def get_long_help(self):
+        return (
+            self._parser.format_help()
+            + "\ngroup-threshold: split arrays with more elements into ranges"
+            + " (0 disables grouping)."
+        )
+
+    def __call__(
+        self,
+        debugger: SBDebugger,
+        command: str,
+        exe_ctx: SBExecutionContext,
+        result: SBCommandReturnObject,
+    ):
+        global group_threshold
+        try:
+            args = self._parser.parse_args(shlex.split(command))
+        except ValueError as e:
+            result.SetError(str(e))
+            return
+
+        if args.value < 0:
+            result.SetError(f"{args.setting} must not be negative")
+            return
+        group_threshold = args.value
+        result.AppendMessage(f"{args.setting} = {args.value}")
+
+
+class ViewCommand:
+    def __init__(self, debugger: SBDebugger, internal_dict):
+        self._parser = CommandParser(
+            prog="nerix view",
+            description=(
+                "Switch a byte buffer between one child per element and hexdump rows. "
+                "Supported for QByteArray, QSpan and boost::circular_buffer "
+                "of bytes."
+            ),
+        )
+        self._parser.add_argument("view", choices=["elements", "hexdump"])
+        self._parser.add_argument(
+            "expression", nargs="+", help="variable path or expression of the buffer"
+        )
+
+    def get_short_help(self):
+        return "Show a byte buffer as elements or as a hexdump."
+
+    def get_long_help(self):
+        return self._parser.format_help()
+
+    def __call__(
+        self,
+        debugger: SBDebugger,
+        command: str,
+        exe_ctx: SBExecutionContext,
+        result: SBCommandReturnObject,
+    ):
+        try:
+            args = self._parser.parse_args(shlex.split(command))
+        except ValueError as e:
+            result.SetError(str(e))
+            return
+
+        expression = " ".join(args.expression)
+        try:
+            value = evaluate_value(exe_ctx, expression)
+        except ValueError as e:
+            result.SetError(str(e))
+            return
+
+        key = _view_key(value.GetNonSyntheticValue())
+        if key is None:
+            result.SetError(f"'{expression}' isn't stored in memory")
+            return
+        views = _hexdump_views(value.GetTarget())
+        if args.view == "hexdump":
+            views.add(key)
+        else:
+            views.discard(key)
+        # Enabling or disabling a category bumps the revision of LLDB's format
+        # manager, which makes values that were already formatted update their
+        # children. Toggle the category that provides the children of `value`.
+        category = _synthetic_category(debugger, value)
+        if category is not None:
+            category.SetEnabled(False)
+            category.SetEnabled(True)
+        result.AppendMessage(f"'{expression}' is shown as {args.view}")
+
+
+def _synthetic_category(
+    debugger: SBDebugger, value: SBValue
+) -> Optional[SBTypeCategory]:
+    """Find the enabled category that holds the synthetic provider of `value`."""
+    synthetic = value.GetTypeSynthetic()
+    if not synthetic.IsValid():
+        return None
+    for i in range(debugger.GetNumCategories()):
+        category = debugger.GetCategoryAtIndex(i)
+        if not category.GetEnabled():
+            continue
+        for j in range(category.GetNumSynthetics()):
+            if category.GetSyntheticAtIndex(j).IsEqualTo(synthetic):
+                return category
+    return None
+
+
+class ExportCommand:
+    PROGRESS_INTERVAL = 1000
+    """Number of values between progress updates."""
+
+    def __init__(self, debugger: SBDebugger, internal_dict):
+        self._parser = CommandParser(
+            prog="nerix export",
+            description=(
+                "Write a value and its (synthetic) children to a file. "
+                "The file is written while the children are walked, "
+                "so large containers can be exported."
+            ),
+        )
+        self._parser.add_argument(
+            "-o", "--output", required=True, help="file to write to"
+        )
+        self._parser.add_argument(
+            "-f",
+            "--format",
+            choices=["jsonl", "json"],
+            default="jsonl",
+            help="one JSON object per value (jsonl) or a nested JSON document (json)",
+        )
+        self._parser.add_argument(
+            "-d",
+            "--max-depth",
+            type=int,
+            default=64,
+            help="don't export children deeper than this (default: 64)",
+        )
+        self._parser.add_argument(
+            "-c",
+            "--max-count",
+            type=int,
+            default=0,
+            help="stop after this many values (default: unlimited)",
+        )
+        self._parser.add_argument(
+            "-b",
+            "--max-bytes",
+            type=int,
+            default=0,
+            help="stop once the file is this large (default: unlimited)",
+        )
+        self._parser.add_argument(
+            "expression", nargs="+", help="variable path or expression to export"
+        )
+
+    def get_short_help(self):
+        return "Export a formatted value to a JSON or JSON Lines file."
+
+    def get_long_help(self):
+        return self._parser.format_help()
+
+    def __call__(
+        self,
+        debugger: SBDebugger,
+        command: str,
+        exe_ctx: SBExecutionContext,
+        result: SBCommandReturnObject,
+    ):
+        try:
+            args = self._parser.parse_args(shlex.split(command))
+        except ValueError as e:
+            result.SetError(str(e))
+            return
+
+        expression = " ".join(args.expression)
+        try:
+            value = evaluate_value(exe_ctx, expression)
+        except ValueError as e:
+            result.SetError(str(e))
+            return
+
+        try:
+            file = open(args.output, "w", encoding="utf-8", newline="\n")
+        except OSError as e:
+            result.SetError(str(e))
+            return
+
+        writer = _JsonWriter(file) if args.format == "json" else _JsonLinesWriter(file)
+        progress = lldb.SBProgress("nerix export", expression, debugger)
+        count = 0
+        stopped = None
+        with file:
+            for event in _walk_value(value, expression, 0, args.max_depth):
+                if event is None:
+                    writer.leave()
+                    continue
+                if args.max_count and count >= args.max_count:
+                    stopped = f"reached --max-count {args.max_count}"
+                    break
+                if args.max_bytes and writer.bytes_written >= args.max_bytes:
+                    stopped = f"reached --max-bytes {args.max_bytes}"
+                    break
+                if debugger.InterruptRequested():
+                    stopped = "interrupted"
+                    break
+                child, path, depth = event
+                writer.enter(_export_record(child), path, depth)
+                count += 1
+                if count % self.PROGRESS_INTERVAL == 0:
+                    progress.Increment(self.PROGRESS_INTERVAL, f"{count} values")
+            writer.finish()
+
+        message = f"Wrote {count} values ({writer.bytes_written} bytes) to {args.output}"
+        if stopped:
+            message += f" (stopped: {stopped})"
+        result.AppendMessage(message)
+
+
+def evaluate_value(exe_ctx: SBExecutionContext, expression: str) -> SBValue:
+    """Get the (synthetic) value of a variable path or, failing that, an expression.
+
+    Raises `ValueError` if neither can be evaluated.
+    """
+    frame = exe_ctx.GetFrame()
+    if not frame.IsValid():
+        raise ValueError("no frame selected")
+    value = frame.GetValueForVariablePath(expression)
+    if not value.IsValid() or value.GetError().Fail():
+        value = frame.EvaluateExpression(expression)
+    if value.GetError().Fail():
+        raise ValueError(f"can't evaluate '{expression}': {value.GetError()}")
+    value.SetPreferSyntheticValue(True)
+    return value
+
+
+def _walk_value(
+    value: SBValue, path: str, depth: int, max_depth: int
+) -> Iterator[Optional[tuple[SBValue, str, int]]]:
+    """Yield `(value, path, depth)` when entering a value and `None` when leaving it."""
+    yield value, path, depth
+    if depth < max_depth:
+        for child in _export_children(value):
+            name = child.GetName() or ""
+            child_path = path + name if name.startswith("[") else f"{path}.{name}"
+            yield from _walk_value(child, child_path, depth + 1, max_depth)
+    yield None
+
+
+def _export_children(value: SBValue) -> Iterator[SBValue]:
+    for i in range(value.GetNumChildren()):
+        child = value.GetChildAtIndex(i)
+        if not child.IsValid():
+            continue
+        child.SetPreferSyntheticValue(True)
+        # Range nodes (see `ChildGroups`) are only there for the UI.
+        if _RANGE_NAME.match(child.GetName() or ""):
+            yield from _export_children(child)
+        else:
+            yield child
+
+
+def _export_record(value: SBValue) -> dict[str, str]:
+    record = {"name": value.GetName() or "", "type": value.GetDisplayTypeName() or ""}
+    val = value.GetValue()
+    if val is not None:
+        record["value"] = val
+    summary = value.GetSummary()
+    if summary is not None:
+        record["summary"] = summary
+    return record
+
+
+class _JsonLinesWriter:
+    """Writes one JSON object per value."""
+
+    def __init__(self, file):
+        self._file = file
+        self.bytes_written = 0
+
+    def enter(self, record: dict[str, str], path: str, depth: int):
+        line = json.dumps({"path": path, "depth": depth, **record}) + "\n"
+        self._file.write(line)
+        self.bytes_written += len(line.encode("utf-8"))
+
+    def leave(self):
+        pass
+
+    def finish(self):
+        pass
+
+
+class _JsonWriter:
+    """Writes a single JSON object where each value has a list of `children`."""
+
+    def __init__(self, file):
+        self._file = file
+        self.bytes_written = 0
+        self._open: list[bool] = []
+        """For each value that wasn't closed yet, whether its children list was started."""
+
+    def enter(self, record: dict[str, str], path: str, depth: int):
+        if self._open:
+            self._write(", " if self._open[-1] else ', "children": [')
+            self._open[-1] = True
+        # Leave the object open for the children.
+        self._write(json.dumps(record)[:-1])
+        self._open.append(False)
+
+    def leave(self):
+        self._write("]}" if self._open.pop() else "}")
+
+    def finish(self):
+        while self._open:
+            self.leave()
+        self._write("\n")
+
+    def _write(self, text: str):
+        self._file.write(text)
+        self.bytes_written += len(text.encode("utf-8"))
+
+
+def _format_stats_table(rows: list[tuple[tuple[str, str], ProviderStats]]) -> str:
+    header = (
+        "Provider",
+        "Method",
+        "Calls",
+        "Total (ms)",
+        "Max (ms)",
+        "Reads",
+        "Bytes",
+        "Exceptions",
+    )
+    table = [header] + [
+        (
+            provider,
+            method,
+            str(s.calls),
+            f"{s.total_time * 1000:.3f}",
+            f"{s.max_time * 1000:.3f}",
+            str(s.reads),
+            str(s.bytes_read),
+            str(s.exceptions),
+        )
+        for (provider, method), s in rows
+    ]
+    widths = [max(len(row[i]) for row in table) for i in range(len(header))]
+    lines = []
+    for row in table:
+        cells = [
+            cell.ljust(w) if i < 2 else cell.rjust(w)
+            for i, (cell, w) in enumerate(zip(row, widths))
+        ]
+        lines.append("  ".join(cells).rstrip())
+    return "\n".join(lines)
+
+
 def numeric_index(name: str) -> Optional[int]:
     name = name.removeprefix("[").removesuffix("]")
     try:
@@ -63,6 +709,235 @@ def numeric_index(name: str) -> Optional[int]:
         return None
 
 
+group_threshold = int(os.environ.get("NERIX_GROUP_THRESHOLD", "") or 0)
+"""Containers with more elements are shown as ranges (0 disables grouping)."""
+
+_RANGE_NAME = re.compile(r"^\[(\d+)\.\.(\d+)\]$")
+
+
+class ChildGroups:
+    """Splits the children of large arrays into ranges.
+
+    Above `group_threshold` elements, an array shows range nodes (`[0..9999]`,
+    `[10000..19999]`, ...) instead of its elements. A range node is a copy of
+    the array named after its range, so the array's provider expands it into
+    the elements (or into smaller ranges). Elements keep their absolute index as
+    their name.
+    """
+
+    SIZE_INDEX = (1 << 32) - 1
+    """Child index of the number of elements in the current range."""
+    ELEMENT_INDEX = 1 << 31
+    """Children at and above this index are elements by their absolute index.
+
+    These are used to look up elements by name (`[5]`) while they're grouped.
+    """
+
+    def __init__(self, valobj: SBValue):
+        self._valobj = valobj
+        self.start = 0
+        self.count = 0
+        self.stride = 1
+
+    def update(self, size: int):
+        m = _RANGE_NAME.match(self._valobj.GetName() or "")
+        if m:
+            self.start = min(int(m[1]), size)
+            self.count = min(int(m[2]) + 1, size) - self.start
+        else:
+            self.start = 0
+            self.count = size
+        self.stride = 1
+        if group_threshold > 1:
+            while self.count > self.stride * group_threshold:
+                self.stride *= group_threshold
+
+    def num_children(self) -> int:
+        return -(-self.count // self.stride)
+
+    def child_index(self, name: str) -> Optional[int]:
+        m = _RANGE_NAME.match(name)
+        if m:
+            offset = int(m[1]) - self.start
+            if self.stride == 1 or offset < 0 or offset % self.stride != 0:
+                return None
+            idx = offset // self.stride
+        else:
+            idx = numeric_index(name)
+            if idx is None:
+                return None
+            if self.stride != 1:
+                in_range = self.start <= idx < self.start + self.count
+                if not in_range or self.ELEMENT_INDEX + idx >= self.SIZE_INDEX:
+                    return None
+                return self.ELEMENT_INDEX + idx
+            idx -= self.start
+        return idx if 0 <= idx < self.num_children() else None
+
+    def child_at_index(
+        self, idx: int, element: Callable[[int], Optional[SBValue]]
+    ) -> Optional[SBValue]:
+        """Get child `idx`, using `element` to create the element at an absolute index."""
+        if idx == self.SIZE_INDEX:
+            return self._size_value()
+        if idx >= self.ELEMENT_INDEX:
+            idx -= self.ELEMENT_INDEX
+            in_range = self.start <= idx < self.start + self.count
+            return element(idx) if in_range else None
+        if idx < 0 or idx >= self.num_children():
+            return None
+        if self.stride == 1:
+            return element(self.start + idx)
+        first = self.start + idx * self.stride
+        last = min(first + self.stride, self.start + self.count) - 1
+        return self._range_node(f"[{first}..{last}]")
+
+    def _range_node(self, name: str) -> SBValue:
+        ty = self._valobj.GetType()
+        addr = self._valobj.GetLoadAddress()
+        if addr != lldb.LLDB_INVALID_ADDRESS:
+            return self._valobj.CreateValueFromAddress(name, addr, ty)
+        return self._valobj.CreateValueFromData(name, self._valobj.GetData(), ty)
+
+    def _size_value(self) -> SBValue:
+        return _size_value(self._valobj, self.count)
+
+
+def _size_value(valobj: SBValue, count: int) -> SBValue:
+    target = valobj.GetTarget()
+    data = SBData.CreateDataFromUInt64Array(
+        target.GetByteOrder(), target.GetAddressByteSize(), [count]
+    )
+    ty = target.GetBasicType(lldb.eBasicTypeUnsignedLongLong)
+    return valobj.CreateValueFromData("size", data, ty)
+
+
+_HEXDUMP_ROW_NAME = re.compile(r"^\[0x([0-9a-fA-F]+)\]$")
+
+
+class Hexdump:
+    """Shows a byte buffer as hexdump rows instead of one child per byte.
+
+    A row is named after its offset (`[0x00000010]`) and shows up to 16 bytes
+    as hex and ASCII. Rows are created on demand from a window of
+    max-children-count rows that is read at once. The view is enabled per value
+    with `nerix view hexdump <value>`.
+    """
+
+    ROW_SIZE = 16
+
+    def __init__(self, valobj: SBValue):
+        self._valobj = valobj
+        self.enabled = False
+        self._size = 0
+        self._read: Optional[Callable[[int, int], Optional[bytes]]] = None
+        self._window: Optional[tuple[int, Optional[bytes]]] = None
+        """Index of the first row in the window and its bytes."""
+
+    def update(self, size: int, read: Callable[[int, int], Optional[bytes]]):
+        """Show `size` bytes, where `read(offset, n)` reads `n` bytes at `offset`."""
+        self.enabled = _view_key(self._valobj) in _hexdump_views(
+            self._valobj.GetTarget()
+        )
+        self._size = size
+        self._read = read
+        self._window = None
+
+    def num_children(self) -> int:
+        return -(-self._size // self.ROW_SIZE)
+
+    def child_index(self, name: str) -> Optional[int]:
+        m = _HEXDUMP_ROW_NAME.match(name)
+        if not m:
+            return None
+        offset = int(m[1], 16)
+        if offset % self.ROW_SIZE != 0 or offset >= self._size:
+            return None
+        return offset // self.ROW_SIZE
+
+    def child_at_index(self, idx: int) -> Optional[SBValue]:
+        if idx == ChildGroups.SIZE_INDEX:
+            return _size_value(self._valobj, self._size)
+        if idx < 0 or idx >= self.num_children():
+            return None
+        row = self._row(idx)
+        if row is None:
+            return None
+        text = hexdump_row(row).encode("ascii")
+        data = SBData()
+        data.SetData(SBError(), text, lldb.eByteOrderLittle, 8)
+        ty = self._valobj.GetTarget().GetBasicType(lldb.eBasicTypeChar)
+        return self._valobj.CreateValueFromData(
+            f"[0x{idx * self.ROW_SIZE:08x}]", data, ty.GetArrayType(len(text))
+        )
+
+    def _row(self, idx: int) -> Optional[bytes]:
+        assert self._read is not None
+        window_len = max(self._valobj.target.GetMaximumNumberOfChildrenToDisplay(), 1)
+        start = idx - idx % window_len
+        if self._window is None or self._window[0] != start:
+            offset = start * self.ROW_SIZE
+            n_bytes = min(window_len * self.ROW_SIZE, self._size - offset)
+            data = self._read(offset, n_bytes)
+            if data is not None and len(data) != n_bytes:
+                data = None
+            self._window = (start, data)
+        data = self._window[1]
+        if data is None:
+            return None
+        offset = (idx - start) * self.ROW_SIZE
+        return data[offset : offset + self.ROW_SIZE]
+
+
+def hexdump_row(data: bytes) -> str:
+    """Format up to `Hexdump.ROW_SIZE` bytes as `48 65 6c ... 0a  |Hel..|`."""
+    half = Hexdump.ROW_SIZE // 2
+    hex_bytes = [f"{b:02x}" for b in data]
+    hex_bytes += ["  "] * (Hexdump.ROW_SIZE - len(data))
+    text = "".join(chr(b) if 0x20 <= b < 0x7F else "." for b in data)
+    return f"{' '.join(hex_bytes[:half])}  {' '.join(hex_bytes[half:])}  |{text}|"
+
+
+def is_byte_type(ty: SBType) -> bool:
+    """Whether `ty` is a (signed/unsigned) `char` or `std::byte`."""
+    ty = ty.GetUnqualifiedType().GetCanonicalType()
+    if ty.GetByteSize() != 1:
+        return False
+    return bool(ty.GetTypeFlags() & (lldb.eTypeIsScalar | lldb.eTypeIsEnumeration))
+
+
+def _hexdump_views(target: SBTarget) -> set[tuple[int, str]]:
+    """Values (see `_view_key`) that are shown as a hexdump."""
+    return target_local(target, "hexdump-views", set)
+
+
+def _view_key(valobj: SBValue) -> Optional[tuple[int, str]]:
+    addr = valobj.GetLoadAddress()
+    if addr == lldb.LLDB_INVALID_ADDRESS:
+        return None
+    return (addr, valobj.GetType().GetUnqualifiedType().GetCanonicalType().GetName())
+
+
+def element_count(valobj: SBValue) -> int:
+    """Number of elements of a (possibly grouped) array."""
+    size = valobj.GetChildAtIndex(ChildGroups.SIZE_INDEX)
+    if size.IsValid():
+        return size.GetValueAsUnsigned()
+    return valobj.GetNumChildren()
+
+
+def SizeSummaryProvider(
+    valobj: SBValue, internal_dict: dict, options: lldb.SBTypeSummaryOptions
+) -> str:
+    return f"size={element_count(valobj)}"
+
+
+def ArraySizeSummaryProvider(
+    valobj: SBValue, internal_dict: dict, options: lldb.SBTypeSummaryOptions
+) -> str:
+    return f"[ size={element_count(valobj)} ]"
+
+
 class ExpandingSyntheticProvider:
     def __init__(self, valobj: SBValue, internal_dict):
         self._backend = valobj
@@ -137,22 +1012,37 @@ class DispatchedSynthetic:
 
 
 class ArraySyntheticProvider:
+    grouped = True
+    """Whether large arrays are split into ranges (see `ChildGroups`)."""
+
     def __init__(self, valobj: SBValue, internal_dict):
         self._backend = valobj
         self._size = 0
         self._base_addr = 0
         self._resolved_type = None
         self._offset = 0
+        self._groups = ChildGroups(valobj)
 
     def num_children(self):
+        if self.grouped:
+            return self._groups.num_children()
         return self._size
 
     def get_child_index(self, name: str):
+        if self.grouped:
+            return self._groups.child_index(name)
         return numeric_index(name)
 
     def get_child_at_index(self, idx: int):
-        if idx < 0 or idx >= self._size or self._resolved_type is None:
+        if self._resolved_type is None:
+            return None
+        if self.grouped:
+            return self._groups.child_at_index(idx, self._element)
+        if idx < 0 or idx >= self._size:
             return None
+        return self._element(idx)
+
+    def _element(self, idx: int) -> SBValue:
         return self._backend.CreateValueFromAddress(
             f"[{idx}]", self._base_addr + self._offset * idx, self._resolved_type
         )
@@ -173,6 +1063,7 @@ class ArraySyntheticProvider:
             else:
                 self._base_addr = ptr.GetLoadAddress()
         self._offset = self._resolved_type.GetByteSize()
+        self._groups.update(size)
         return False
 
     def _pointer_and_size(self, valobj: SBValue) -> tuple[Union[SBValue, int], int]:
@@ -182,16 +1073,591 @@ class ArraySyntheticProvider:
         raise NotImplementedError()
 
 
-class LazyType:
-    def __init__(self, tgt: SBTarget, names: Union[str, tuple[str, ...]]):
-        self.tgt = tgt
-        self.names = (names,) if isinstance(names, str) else names
-        self.ty = None
+TypeSpec = Union[str, tuple[str, ...], int]
+"""A type name, alternative spellings of a type name, or a basic type (`lldb.eBasicType*`)."""
 
-    def __call__(self) -> SBType:
-        if self.ty is None:
-            for n in self.names:
-                self.ty = self.tgt.FindFirstType(n)
-                if self.ty:
-                    break
-        return self.ty  # type: ignore
+
+class TypeRegistry:
+    """Memoized type lookups for a single target.
+
+    Use `target_types()` to get the registry of a target. Failed lookups are
+    remembered until new modules are added to the target.
+    """
+
+    MAX_DERIVED = 4096
+
+    def __init__(self, target: SBTarget):
+        self._target = target
+        self._n_modules = target.GetNumModules()
+        self._types: dict[TypeSpec, SBType] = {}
+        self._derived: dict[tuple, SBType] = {}
+        self._sizes: dict[TypeSpec, int] = {}
+
+    def find(self, spec: TypeSpec) -> SBType:
+        ty = self._types.get(spec)
+        if ty is not None and (ty or not self._modules_changed()):
+            return ty
+        ty = self._lookup(spec)
+        self._types[spec] = ty
+        return ty
+
+    def pointer(self, spec: TypeSpec) -> SBType:
+        return self._derive(("*", spec), lambda: self.find(spec).GetPointerType())
+
+    def array(self, spec: TypeSpec, n: int) -> SBType:
+        return self._derive(("[]", spec, n), lambda: self.find(spec).GetArrayType(n))
+
+    def byte_size(self, spec: TypeSpec) -> int:
+        size = self._sizes.get(spec)
+        if size is None:
+            size = self.find(spec).GetByteSize()
+            if size:
+                self._sizes[spec] = size
+        return size
+
+    def _derive(self, key: tuple, make: Callable[[], SBType]) -> SBType:
+        ty = self._derived.get(key)
+        if ty is not None and (ty or not self._modules_changed()):
+            return ty
+        ty = make()
+        if len(self._derived) >= self.MAX_DERIVED:
+            self._derived.clear()
+        self._derived[key] = ty
+        return ty
+
+    def _lookup(self, spec: TypeSpec) -> SBType:
+        if isinstance(spec, int):
+            return self._target.GetBasicType(spec)
+        if isinstance(spec, str):
+            return self._target.FindFirstType(spec)
+        for name in spec:
+            ty = self._target.FindFirstType(name)
+            if ty:
+                return ty
+        return SBType()
+
+    def _modules_changed(self) -> bool:
+        n = self._target.GetNumModules()
+        if n == self._n_modules:
+            return False
+        self._n_modules = n
+        # Types that weren't found before might be available now.
+        self._types = {k: v for k, v in self._types.items() if v}
+        self._derived = {k: v for k, v in self._derived.items() if v}
+        return True
+
+
+def target_types(target: SBTarget) -> TypeRegistry:
+    return target_local(target, "types", lambda: TypeRegistry(target))
+
+
+_target_local: dict[Any, tuple[SBTarget, dict[Hashable, Any]]] = {}
+_target_count: Optional[tuple[int, int]] = None
+"""Debugger ID and number of targets when `_target_local` was last pruned."""
+
+
+def _target_key(target: SBTarget):
+    get_id = getattr(target, "GetGloballyUniqueID", None)
+    if get_id is not None:
+        return get_id()
+    dbg = target.GetDebugger()
+    return (dbg.GetID(), dbg.GetIndexOfTarget(target))
+
+
+def _target_locals(target: SBTarget) -> dict[Hashable, Any]:
+    global _target_count
+    dbg = target.GetDebugger()
+    count = (dbg.GetID(), dbg.GetNumTargets())
+    if count != _target_count:
+        _target_count = count
+        _prune_target_locals()
+
+    key = _target_key(target)
+    existing = _target_local.get(key)
+    # Target indices are reused, so make sure it's still the same target.
+    if existing is not None and existing[0] == target:
+        return existing[1]
+    values: dict[Hashable, Any] = {}
+    _target_local[key] = (target, values)
+    return values
+
+
+def _prune_target_locals():
+    """Drop the objects of targets that were deleted (or whose debugger was)."""
+    for key, (target, _) in list(_target_local.items()):
+        dbg = target.GetDebugger()
+        if not target.IsValid() or dbg.GetIndexOfTarget(target) >= dbg.GetNumTargets():
+            del _target_local[key]
+
+
+def target_local(target: SBTarget, key: Hashable, factory: Callable[[], T]) -> T:
+    """Get an object that lives as long as `target`."""
+    values = _target_locals(target)
+    if key in values:
+        return values[key]
+    value = factory()
+    values[key] = value
+    return value
+
+
+def process_local(process: SBProcess, key: Hashable, factory: Callable[[], T]) -> T:
+    """Get an object that lives as long as `process`.
+
+    There is one object per target and key, which is replaced once the target
+    runs a new process.
+    """
+    slot = target_local(
+        process.GetTarget(), ("process-local", key), lambda: [None, None]
+    )
+    process_id = process.GetUniqueID()
+    if slot[0] != process_id:
+        slot[0] = process_id
+        slot[1] = factory()
+    return slot[1]
+
+
+def enum_values(
+    target: SBTarget, type_name: str, defaults: dict[str, int]
+) -> dict[str, int]:
+    """Get the values of the enumerators of `type_name` by their name.
+
+    The values are read from the debug info once per target. Enumerators that
+    aren't found keep their value from `defaults`.
+    """
+    ty = target_types(target).find(type_name)
+    # Once the type shows up (e.g. after loading symbols), the key changes.
+    key = ("enum", type_name, bool(ty))
+
+    def build() -> dict[str, int]:
+        values = dict(defaults)
+        if ty:
+            for member in ty.GetEnumMembers():
+                values[member.GetName()] = member.GetValueAsUnsigned()
+        return values
+
+    return target_local(target, key, build)
+
+
+def enum_table(
+    target: SBTarget,
+    type_name: str,
+    defaults: dict[str, int],
+    entries: dict[str, T],
+) -> dict[int, T]:
+    """Map the values of the enumerators of `type_name` to `entries[name]`.
+
+    Like `enum_values()`, the table is built once per target.
+    """
+    ty = target_types(target).find(type_name)
+    key = ("enum-table", type_name, id(entries), bool(ty))
+
+    def build() -> dict[int, T]:
+        values = enum_values(target, type_name, defaults)
+        return {values[name]: entry for name, entry in entries.items() if name in values}
+
+    return target_local(target, key, build)
+
+
+_stop_local: dict[tuple[int, str], tuple[int, Any]] = {}
+
+
+def stop_local(process: SBProcess, key: str, factory: Callable[[], T]) -> T:
+    """Get an object that lives until `process` resumes (or evaluates an expression)."""
+    stop_id = process.GetStopID(True)
+    slot = (process.GetUniqueID(), key)
+    existing = _stop_local.get(slot)
+    if existing is not None and existing[0] == stop_id:
+        return existing[1]
+    value = factory()
+    _stop_local[slot] = (stop_id, value)
+    return value
+
+
+class MemoryCache:
+    """Page-granular cache for memory reads of a stopped process.
+
+    Use `memory_cache()` to get the instance for the current stop.
+    """
+
+    PAGE_SIZE = 4096
+    MAX_PAGES = 4096
+    """Upper bound for the number of cached pages (16 MiB)."""
+    MAX_CACHED_READ = 1 << 20
+    """Reads larger than this bypass the cache."""
+
+    def __init__(self, process: SBProcess):
+        self._process = process
+        self._pages: dict[int, Optional[bytes]] = {}
+        self.byte_order = (
+            "big" if process.GetByteOrder() == lldb.eByteOrderBig else "little"
+        )
+        self.pointer_size = process.GetAddressByteSize()
+
+    def read(self, addr: int, size: int) -> Optional[bytes]:
+        if size <= 0:
+            return bytes()
+        if size > self.MAX_CACHED_READ:
+            return self._read_direct(addr, size)
+
+        first = addr // self.PAGE_SIZE
+        last = (addr + size - 1) // self.PAGE_SIZE
+        pages = self._pages
+        missing = [p for p in range(first, last + 1) if p not in pages]
+        if missing:
+            self._fill(missing[0], missing[-1])
+
+        offset = addr - first * self.PAGE_SIZE
+        if first == last:
+            page = pages.get(first)
+            if page is None:
+                return self._read_direct(addr, size)
+            return page[offset : offset + size]
+
+        chunks = []
+        for p in range(first, last + 1):
+            page = pages.get(p)
+            if page is None:
+                return self._read_direct(addr, size)
+            chunks.append(page)
+        return b"".join(chunks)[offset : offset + size]
+
+    def read_unsigned(self, addr: int, size: int) -> Optional[int]:
+        buf = self.read(addr, size)
+        if buf is None or len(buf) != size:
+            return None
+        return int.from_bytes(buf, self.byte_order)  # type: ignore
+
+    def read_signed(self, addr: int, size: int) -> Optional[int]:
+        buf = self.read(addr, size)
+        if buf is None or len(buf) != size:
+            return None
+        return int.from_bytes(buf, self.byte_order, signed=True)  # type: ignore
+
+    def read_pointer(self, addr: int) -> Optional[int]:
+        return self.read_unsigned(addr, self.pointer_size)
+
+    def _fill(self, first: int, last: int):
+        if len(self._pages) + (last - first + 1) > self.MAX_PAGES:
+            self._pages.clear()
+        n_bytes = (last - first + 1) * self.PAGE_SIZE
+        buf = self._read_direct(first * self.PAGE_SIZE, n_bytes)
+        if buf is not None and len(buf) == n_bytes:
+            for i, p in enumerate(range(first, last + 1)):
+                self._pages[p] = buf[i * self.PAGE_SIZE : (i + 1) * self.PAGE_SIZE]
+            return
+        # Part of the range isn't readable - find out which pages are.
+        for p in range(first, last + 1):
+            if p in self._pages:
+                continue
+            page = self._read_direct(p * self.PAGE_SIZE, self.PAGE_SIZE)
+            if page is not None and len(page) != self.PAGE_SIZE:
+                page = None
+            self._pages[p] = page
+
+    def _read_direct(self, addr: int, size: int) -> Optional[bytes]:
+        stats = _active_stats
+        if stats is not None:
+            stats.reads += 1
+            stats.bytes_read += size
+        err = SBError()
+        buf = self._process.ReadMemory(addr, size, err)
+        if err.Fail():
+            return None
+        return buf
+
+
+def memory_cache(process: SBProcess) -> MemoryCache:
+    return stop_local(process, "memory", lambda: MemoryCache(process))
+
+
+class StringCache:
+    """LRU cache for strings decoded from the memory of a stopped process.
+
+    Strings are keyed by their address, size in bytes and encoding, so
+    implicitly shared strings are only read and decoded once per stop.
+    Use `string_cache()` to get the instance for the current stop.
+    """
+
+    MAX_ENTRIES = 4096
+    MAX_CHARS = 1 << 22
+    """Upper bound for the total length of all cached strings."""
+    CHUNK_SIZE = 1 << 16
+    """Long strings are read in chunks of this size."""
+
+    def __init__(self, process: SBProcess):
+        self._memory = memory_cache(process)
+        self._entries: OrderedDict[tuple[int, int, str], str] = OrderedDict()
+        self._chars = 0
+
+    def get(self, addr: int, size: int, encoding: str) -> Optional[str]:
+        """Decode `size` bytes at `addr`. Returns `None` if the memory can't be read."""
+        key = (addr, size, encoding)
+        text = self._entries.get(key)
+        if text is not None:
+            self._entries.move_to_end(key)
+            return text
+
+        data = self._read(addr, size)
+        if data is None:
+            return None
+        text = data.decode(encoding, errors="replace")
+        if len(text) > self.MAX_CHARS:
+            return text
+        self._entries[key] = text
+        self._chars += len(text)
+        while self._chars > self.MAX_CHARS or len(self._entries) > self.MAX_ENTRIES:
+            _, evicted = self._entries.popitem(last=False)
+            self._chars -= len(evicted)
+        return text
+
+    def _read(self, addr: int, size: int) -> Optional[bytes]:
+        if size <= self.CHUNK_SIZE:
+            return self._memory.read(addr, size)
+        chunks = []
+        for off in range(0, size, self.CHUNK_SIZE):
+            chunk = self._memory.read(addr + off, min(self.CHUNK_SIZE, size - off))
+            if chunk is None:
+                return None
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+
+def string_cache(process: SBProcess) -> StringCache:
+    return stop_local(process, "strings", lambda: StringCache(process))
+
+
+def string_summary_limit(target: SBTarget) -> int:
+    """The maximum number of characters shown in a string summary."""
+    limit = target.GetDebugger().GetSetting("target.max-string-summary-length")
+    if not limit:
+        return 1024
+    return limit.GetUnsignedIntegerValue()
+
+
+def utf8_prefix_length(data: bytes) -> int:
+    """Length of `data` without an incomplete UTF-8 sequence at its end."""
+    for i in range(1, min(4, len(data)) + 1):
+        c = data[-i]
+        if c & 0xC0 == 0x80:
+            continue  # continuation byte
+        if c >= 0xF0:
+            needed = 4
+        elif c >= 0xE0:
+            needed = 3
+        elif c >= 0xC0:
+            needed = 2
+        else:
+            needed = 1
+        return len(data) if i >= needed else len(data) - i
+    return len(data)
+
+
+def char_array_value(
+    source: SBValue, addr: int, size: int
+) -> Optional[tuple[SBValue, bool]]:
+    """Create a `char` array from a string of `size` bytes at `addr`.
+
+    At most `string_summary_limit()` bytes are read, without cutting a UTF-8
+    sequence in half. Also returns whether the string was truncated.
+    """
+    n = min(size, string_summary_limit(source.GetTarget()))
+    # Latin-1 maps every byte to one character, so the bytes are kept as they are.
+    text = string_cache(source.GetProcess()).get(addr, n, "latin-1")
+    if text is None:
+        return None
+    buf = text.encode("latin-1")
+    if n < size:
+        buf = buf[: utf8_prefix_length(buf)]
+    ty = source.GetTarget().GetBasicType(lldb.eBasicTypeChar).GetArrayType(len(buf))
+    data = SBData()
+    # An empty array needs a terminator. Otherwise, LLDB would look for one.
+    data.SetData(SBError(), buf or b"\0", lldb.eByteOrderLittle, 8)
+    return source.CreateValueFromData("", data, ty), n < size
+
+
+def char_array_summary(source: SBValue, addr: int, size: int) -> Optional[str]:
+    """Summary of a string of `size` bytes at `addr`, with its size if truncated."""
+    made = char_array_value(source, addr, size)
+    if made is None:
+        return None
+    value, truncated = made
+    summary = value.GetSummary()
+    if summary is not None and truncated:
+        summary += f"... (size={size})"
+    return summary
+
+
+LayoutField = tuple[str, str, str]
+"""`(name, member path, format)` of a field in a `StructLayout`.
+
+The member path is a dot-separated path to the member in the debug info (base
+classes are searched as well). The format is a single `struct` format
+character (optionally with a count, like `128s` for a byte array), `P` for
+pointer-sized unsigned integers or `n` for pointer-sized signed integers
+(`qsizetype`, `ptrdiff_t`).
+"""
+
+
+class StructLayout:
+    """Decoder for the fixed-size header of a struct.
+
+    The header is read with a single (cached) memory read and decoded with a
+    precompiled `struct.Struct` into a named tuple with one entry per field.
+    Use `struct_layout()` to get a layout.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fields: Sequence[tuple[str, int, str]],
+        byte_order: str,
+        pointer_size: int,
+    ):
+        fields = sorted(
+            [(n, off, _field_format(f, pointer_size)) for n, off, f in fields],
+            key=lambda it: it[1],
+        )
+        fmt = "<" if byte_order == "little" else ">"
+        pos = 0
+        for _, off, f in fields:
+            if off < pos:
+                raise ValueError(f"Overlapping fields in {name}")
+            fmt += "x" * (off - pos) + f
+            pos = off + struct.calcsize("<" + f)
+
+        self._struct = struct.Struct(fmt)
+        self._record = namedtuple(name, [n for n, _, _ in fields])
+        self._byte_order = (
+            lldb.eByteOrderLittle if byte_order == "little" else lldb.eByteOrderBig
+        )
+        self._pointer_size = pointer_size
+        self.size = self._struct.size
+        self.offsets = {n: off for n, off, _ in fields}
+        self.sizes = {n: struct.calcsize("<" + f) for n, _, f in fields}
+
+    def unpack(self, data: bytes) -> NamedTuple:
+        return self._record._make(self._struct.unpack_from(data))
+
+    def unpack_array(self, data: bytes, stride: int) -> Iterator[NamedTuple]:
+        """Decode consecutive structs that start `stride` bytes apart in `data`."""
+        make = self._record._make
+        unpack_from = self._struct.unpack_from
+        view = memoryview(data)
+        for off in range(0, len(data) - self.size + 1, stride):
+            yield make(unpack_from(view, off))
+
+    def read_bytes(self, process: SBProcess, addr: int) -> Optional[bytes]:
+        data = memory_cache(process).read(addr, self.size)
+        if data is None or len(data) != self.size:
+            return None
+        return data
+
+    def read(self, process: SBProcess, addr: int) -> Optional[NamedTuple]:
+        data = self.read_bytes(process, addr)
+        if data is None:
+            return None
+        return self.unpack(data)
+
+    def value(
+        self, source: SBValue, data: bytes, field: str, name: str, ty: SBType
+    ) -> SBValue:
+        """Create a value of type `ty` from the bytes of `field` in `data`."""
+        off = self.offsets[field]
+        sb_data = lldb.SBData()
+        sb_data.SetData(
+            SBError(),
+            data[off : off + self.sizes[field]],
+            self._byte_order,
+            self._pointer_size,
+        )
+        return source.CreateValueFromData(name, sb_data, ty)
+
+
+def struct_layout(
+    target: SBTarget,
+    type_name: str,
+    fields: tuple[LayoutField, ...],
+    fallback: dict[int, tuple[int, ...]],
+) -> Optional[StructLayout]:
+    """Get the layout of `fields` in `type_name`.
+
+    Offsets are taken from the debug info if `type_name` can be found.
+    Otherwise, `fallback` maps the pointer size of the target to the offsets of
+    the fields (in the same order as `fields`). Returns `None` if neither is
+    available.
+    """
+    ty = target_types(target).find(type_name)
+    # Once the type shows up (e.g. after loading symbols), the key changes.
+    key = ("layout", type_name, fields, bool(ty))
+    return target_local(
+        target, key, lambda: _build_layout(target, ty, type_name, fields, fallback)
+    )
+
+
+def _build_layout(
+    target: SBTarget,
+    ty: SBType,
+    type_name: str,
+    fields: tuple[LayoutField, ...],
+    fallback: dict[int, tuple[int, ...]],
+) -> Optional[StructLayout]:
+    ptr_size = target.GetAddressByteSize()
+    byte_order = "big" if target.GetByteOrder() == lldb.eByteOrderBig else "little"
+    # Template arguments would make this an invalid name for the record.
+    name = re.sub(r"\W", "_", type_name)
+    if ty:
+        resolved = []
+        for field, path, fmt in fields:
+            member = _member_offset(ty, path)
+            if member is None:
+                break
+            off, size = member
+            if size != struct.calcsize("<" + _field_format(fmt, ptr_size)):
+                break
+            resolved.append((field, off, fmt))
+        else:
+            return StructLayout(name, resolved, byte_order, ptr_size)
+
+    offsets = fallback.get(ptr_size)
+    if offsets is None:
+        return None
+    return StructLayout(
+        name,
+        [(field, off, fmt) for (field, _, fmt), off in zip(fields, offsets)],
+        byte_order,
+        ptr_size,
+    )
+
+
+def _field_format(fmt: str, pointer_size: int) -> str:
+    if fmt == "P":
+        return "Q" if pointer_size == 8 else "I"
+    if fmt == "n":
+        return "q" if pointer_size == 8 else "i"
+    return fmt
+
+
+def _member_offset(ty: SBType, path: str) -> Optional[tuple[int, int]]:
+    """Get the offset and size of the member at `path` in `ty`."""
+    offset = 0
+    for part in path.split("."):
+        member = _find_member(ty, part)
+        if member is None:
+            return None
+        off, ty = member
+        offset += off
+    return offset, ty.GetByteSize()
+
+
+def _find_member(ty: SBType, name: str) -> Optional[tuple[int, SBType]]:
+    ty = ty.GetCanonicalType()
+    for i in range(ty.GetNumberOfFields()):
+        field = ty.GetFieldAtIndex(i)
+        if field.GetName() == name:
+            return field.GetOffsetInBytes(), field.GetType()
+    for i in range(ty.GetNumberOfDirectBaseClasses()):
+        base = ty.GetDirectBaseClassAtIndex(i)
+        member = _find_member(base.GetType(), name)
+        if member is not None:
+            return base.GetOffsetInBytes() + member[0], member[1]
+    return None
@@ -0,0 +1,22 @@
+#include <sol/forward.hpp>
+#include <sol/sol.hpp>
+
+int main()
+{
+    sol::state lua;
+    lua.open_libraries(sol::lib::base);
+    lua.script(R"(
+        array = {}
+        for i = 1, 100000 do
+            array[i] = i
+        end
+        named = {}
+        for i = 1, 10000 do
+            named["key" .. i] = i
+        end
+    )");
+    sol::table array = lua["array"];
+    sol::table named = lua["named"];
+
+    return 0;  // break here
+}
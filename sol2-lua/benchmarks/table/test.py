@@ -0,0 +1,19 @@
+import testlib
+
+
+class BenchTable(testlib.BenchmarkCase):
+    def runTest(self):
+        self.runToRegex("// break here")
+        # Tables have extra children (e.g. the metatable), so the size isn't checked.
+        self.benchContainer(
+            "array",
+            enumerate_budget=30,
+            random_budget=2,
+            summary_budget=1,
+        )
+        self.benchContainer(
+            "named",
+            enumerate_budget=10,
+            random_budget=2,
+            summary_budget=1,
+        )
@@ -9,6 +9,7 @@ from lldb import (
     LLDB_INVALID_ADDRESS,
 )
 from nerix_common import (
+    define_category,
     ArraySyntheticProvider,
     make_add_summary,
     make_add_summary_string,
@@ -16,13 +17,14 @@ from nerix_common import (
     numeric_index,
     ExpandingSyntheticProvider,
     DispatchedSynthetic,
+    target_types,
 )
 import lua_constants
 from typing import Optional
 
 
 def __lldb_init_module(dbg: SBDebugger, internal_dict):
-    dbg.HandleCommand("type category define -e lua -l c++")
+    define_category(dbg, "lua")
 
     add_summary = make_add_summary(dbg, "lua", __name__)
     add_summary_string = make_add_summary_string(dbg, "lua")
@@ -81,6 +83,8 @@ def TStringSummaryProvider(
 
 
 class TStringSyntheticProvider(ArraySyntheticProvider):
+    grouped = False  # The summary uses the number of children as the length.
+
     def _pointer_and_size(self, valobj: SBValue) -> tuple[SBValue, int]:
         len = valobj.GetChildMemberWithName("shrlen").GetValueAsUnsigned()
         if len == 0xFF:
@@ -107,14 +111,11 @@ class TableSyntheticProvider:
         self._named_children: list[SBValue] = []
 
         # common types
-        self._ty_tvalue: SBType = valobj.GetTarget().FindFirstType("TValue")
-        self._ty_node: SBType = valobj.GetTarget().FindFirstType("Node")
-        self._ty_tstring_ptr: SBType = (
-            valobj.GetTarget().FindFirstType("TString").GetPointerType()
-        )
-        self._ty_char_arr: SBType = (
-            valobj.GetTarget().GetBasicType(lldb.eBasicTypeChar).GetArrayType(0)
-        )
+        types = target_types(valobj.GetTarget())
+        self._ty_tvalue: SBType = types.find("TValue")
+        self._ty_node: SBType = types.find("Node")
+        self._ty_tstring_ptr: SBType = types.pointer("TString")
+        self._ty_char_arr: SBType = types.array(lldb.eBasicTypeChar, 0)
         self._tvalue_size = self._ty_tvalue.GetByteSize()
         self._node_size = self._ty_node.GetByteSize()
 
@@ -209,7 +210,7 @@ class TValueSyntheticProvider:
 
     def _inner_ptr(self, name: str) -> SBType:
         if self._ty_ptr is None or self._ty_name != name:
-            self._ty_ptr = self._valobj.GetTarget().FindFirstType(name).GetPointerType()
+            self._ty_ptr = target_types(self._valobj.GetTarget()).pointer(name)
             self._ty_name = name
         return self._ty_ptr
 
@@ -319,9 +320,9 @@ class LuaStateSyntheticProvider:
         self._n_stack = 0
         self._stack_begin: Optional[SBValue] = None
         self._global_state = None
-        self._ty_tvalue = valobj.GetTarget().FindFirstType("TValue")
-        ty_stack_value = valobj.GetTarget().FindFirstType("StackValue")
-        self._stack_value_size = ty_stack_value.GetByteSize()
+        types = target_types(valobj.GetTarget())
+        self._ty_tvalue = types.find("TValue")
+        self._stack_value_size = types.byte_size("StackValue")
 
     def num_children(self):
         return 1 + self._n_stack
@@ -374,10 +375,11 @@ class UdataSyntheticProvider:
     def __init__(self, valobj: SBValue, internal_dict):
         self._valobj = valobj
         tgt: SBTarget = valobj.GetTarget()
-        self._ty_udata0: SBType = tgt.FindFirstType("Udata0")
-        self._ty_tvalue: SBType = tgt.FindFirstType("TValue")
+        types = target_types(tgt)
+        self._ty_udata0: SBType = types.find("Udata0")
+        self._ty_tvalue: SBType = types.find("TValue")
         self._tvalue_size = self._ty_tvalue.GetByteSize()
-        self._ty_void: SBType = tgt.GetBasicType(lldb.eBasicTypeVoid).GetPointerType()
+        self._ty_void: SBType = types.pointer(lldb.eBasicTypeVoid)
         self._byte_order = tgt.GetByteOrder()
         self._ptr_byte_size = tgt.GetAddressByteSize()
         self._metatable: Optional[SBValue] = None
@@ -461,7 +463,7 @@ def _value_summary(
     elif tt == lua_constants.LUA_VSHRSTR or tt == lua_constants.LUA_VLNGSTR:
         gc = value.GetChildMemberWithName("gc")
         if tstring is None:
-            tstring = value.GetTarget().FindFirstType("TString").GetPointerType()
+            tstring = target_types(value.GetTarget()).pointer("TString")
         return gc.Cast(tstring).GetSummary()
     elif tt == lua_constants.LUA_VLIGHTUSERDATA:
         value.GetChildMemberWithName("p").GetSummary()
@@ -527,8 +529,9 @@ class SolBasicReferenceSyntheticProvider(ExpandingSyntheticProvider):
     def __init__(self, valobj: SBValue, internal_dict):
         self._valobj = valobj
         self._val: Optional[SBValue] = None
-        self._ty_table = valobj.GetTarget().FindFirstType("Table").GetPointerType()
-        self._ty_tvalue: SBType = valobj.GetTarget().FindFirstType("TValue")
+        types = target_types(valobj.GetTarget())
+        self._ty_table = types.pointer("Table")
+        self._ty_tvalue: SBType = types.find("TValue")
         self._tvalue_size = self._ty_tvalue.GetByteSize()
 
     def update(self):
@@ -1,3 +1,4 @@
 scripts: list[str] = []
 binary_path: str = ""
 test_path: str = ""
+results_path: str = ""
@@ -26,6 +26,7 @@ def main():
     parser.add_argument("--lldb-py", required=True)
     parser.add_argument("--script", "-s", nargs="*")
     parser.add_argument("--verbose", "-v", action="store_true")
+    parser.add_argument("--results", help="write benchmark results to this file")
     parser.add_argument("test")
     args = parser.parse_args()
 
@@ -37,6 +38,7 @@ def main():
     configuration.binary_path = args.binary
     configuration.scripts = args.script or []
     configuration.test_path = os.path.abspath(args.test)
+    configuration.results_path = args.results or ""
 
     test_dir = os.path.dirname(args.test)
     test_name = os.path.splitext(os.path.basename(args.test))[0]
@@ -18,9 +18,12 @@ from lldb import (
 import gc
 import re
 import os
+import json
+import random
+import time
 import configuration
 from pathlib import Path
-from typing import Any, Union, Optional
+from typing import Any, Callable, Union, Optional
 
 
 class TestCase(unittest.TestCase):
@@ -145,6 +148,89 @@ class TestCase(unittest.TestCase):
         return tgt, thread, breakpoint
 
 
+class BenchmarkCase(TestCase):
+    """A test that measures how long the formatters take for large values.
+
+    Every measurement has a budget in seconds. The budgets are multiplied by
+    `NERIX_BENCH_BUDGET_SCALE` (default: 1) to account for slower machines.
+    Results are written as JSON to the file passed to `runtest.py --results`.
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        self._results: list[dict[str, Any]] = []
+        self._budget_scale = float(os.environ.get("NERIX_BENCH_BUDGET_SCALE", "1"))
+
+    def tearDown(self) -> None:
+        if configuration.results_path:
+            os.makedirs(os.path.dirname(configuration.results_path), exist_ok=True)
+            with open(configuration.results_path, "w") as f:
+                json.dump(
+                    {
+                        "test": os.path.basename(self._test_dir),
+                        "budget_scale": self._budget_scale,
+                        "results": self._results,
+                    },
+                    f,
+                    indent=2,
+                )
+        super().tearDown()
+
+    def measure(self, name: str, budget: float, fn: Callable[[], Any]):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        budget *= self._budget_scale
+        self._results.append({"name": name, "seconds": elapsed, "budget": budget})
+        with self.subTest(name):
+            self.assertLessEqual(
+                elapsed, budget, f"{name} took {elapsed:.3f}s (budget: {budget:.3f}s)"
+            )
+
+    def freshValue(self, path: str) -> SBValue:
+        """Create a new value for `path` so no synthetic children are cached."""
+        val = self.frame().GetValueForVariablePath(path)
+        self.assertSuccess(val.GetError(), f"Evaluating '{path}'")
+        return self.target().CreateValueFromAddress(
+            val.GetName(), val.GetAddress(), val.GetType()
+        )
+
+    def benchContainer(
+        self,
+        path: str,
+        *,
+        size: Optional[int] = None,
+        enumerate_budget: float,
+        random_budget: float,
+        summary_budget: float,
+        n_random=1000,
+    ):
+        """Measure child enumeration, random access and the summary of `path`."""
+        n_children = self.freshValue(path).GetNumChildren()
+        if size is not None:
+            self.assertEqual(n_children, size, f"Number of children of '{path}'")
+        rng = random.Random(0)
+        indices = [rng.randrange(n_children) for _ in range(n_random)]
+
+        def enumerate_children():
+            val = self.freshValue(path)
+            for i in range(val.GetNumChildren()):
+                val.GetChildAtIndex(i).GetValue()
+
+        def random_access():
+            val = self.freshValue(path)
+            for i in indices:
+                val.GetChildAtIndex(i).GetValue()
+
+        self.measure(f"{path}: enumerate", enumerate_budget, enumerate_children)
+        self.measure(f"{path}: random access", random_budget, random_access)
+        self.measure(
+            f"{path}: summary",
+            summary_budget,
+            lambda: self.freshValue(path).GetSummary(),
+        )
+
+
 class ChildCheck:
     def check(self, test: TestCase, val: SBValue, start: int, msg: str) -> int:
         raise NotImplementedError()